@@ -47,6 +47,16 @@ class SecurityConfig(BaseSettings):
         default=None,
     )
 
+    RSA_KEY_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a tenant's parsed private key is reused for decryption in a process",
+        default=120,
+    )
+
+    RSA_KEY_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of tenants whose parsed private keys are cached per process",
+        default=1024,
+    )
+
 
 class AppExecutionConfig(BaseSettings):
     """
@@ -61,6 +71,15 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of concurrent active requests per app (0 for unlimited)",
         default=0,
     )
+    APP_MAX_ACTIVE_REQUESTS_QUEUE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of requests per app waiting for an active request slot when the app is at"
+        " its concurrency limit, 0 to reject them immediately",
+        default=0,
+    )
+    APP_MAX_ACTIVE_REQUESTS_QUEUE_TIMEOUT: PositiveFloat = Field(
+        description="Maximum time in seconds a request waits for an active request slot before it is rejected",
+        default=10.0,
+    )
     APP_DAILY_RATE_LIMIT: NonNegativeInt = Field(
         description="Maximum number of requests per app per day",
         default=5000,
@@ -175,6 +194,43 @@ class PluginConfig(BaseSettings):
         default=15728640 * 12,
     )
 
+    PLUGIN_DAEMON_POOL_MAXSIZE: PositiveInt = Field(
+        description="Maximum number of keep-alive connections to the plugin daemon per process",
+        default=100,
+    )
+
+    PLUGIN_DAEMON_CONNECT_RETRIES: NonNegativeInt = Field(
+        description="Number of retries when connecting to the plugin daemon fails",
+        default=3,
+    )
+
+    PLUGIN_DAEMON_CONNECT_TIMEOUT: PositiveFloat = Field(
+        description="Connect timeout in seconds for plugin daemon requests",
+        default=10.0,
+    )
+
+    PLUGIN_DAEMON_READ_TIMEOUT: Optional[PositiveFloat] = Field(
+        description="Read timeout in seconds for plugin daemon requests, no limit if not set",
+        default=None,
+    )
+
+    PLUGIN_MODEL_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds plugin model provider declarations and model schemas are cached across"
+        " requests, 0 to disable",
+        default=600,
+    )
+
+    PLUGIN_MODEL_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of plugin model provider lists and model schemas cached in memory per process",
+        default=1024,
+    )
+
+    PLUGIN_DAEMON_UNIX_SOCKET_PATH: Optional[str] = Field(
+        description="Path of a Unix socket to reach a co-located plugin daemon through instead of TCP,"
+        " PLUGIN_DAEMON_URL is still used to build request URLs",
+        default=None,
+    )
+
 
 class MarketplaceConfig(BaseSettings):
     """
@@ -381,6 +437,26 @@ class HttpConfig(BaseSettings):
         default=5,
     )
 
+    HTTP_CLIENT_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of connections of each pooled HTTP client (SSRF proxy, code execution sandbox)",
+        default=100,
+    )
+
+    HTTP_CLIENT_POOL_MAX_KEEPALIVE_CONNECTIONS: NonNegativeInt = Field(
+        description="Maximum number of idle keep-alive connections of each pooled HTTP client",
+        default=20,
+    )
+
+    HTTP_CLIENT_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Time in seconds an idle keep-alive connection of a pooled HTTP client is kept open",
+        default=30.0,
+    )
+
+    HTTP_CLIENT_POOL_HTTP2_ENABLED: bool = Field(
+        description="Enable HTTP/2 for pooled HTTP clients, only effective when the h2 package is installed",
+        default=True,
+    )
+
     RESPECT_XFORWARD_HEADERS_ENABLED: bool = Field(
         description="Enable handling of X-Forwarded-For, X-Forwarded-Proto, and X-Forwarded-Port headers"
         " when the app is behind a single trusted reverse proxy.",
@@ -451,6 +527,24 @@ class ModelLoadBalanceConfig(BaseSettings):
     )
 
 
+class ModelProviderConfig(BaseSettings):
+    """
+    Configuration for workspace model provider configurations
+    """
+
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds a workspace's model provider configurations are reused across requests in a"
+        " process, 0 to disable. Writes through the console invalidate them immediately. Hosted quota deductions only"
+        " invalidate them once the quota runs out, so the quota usage they show may lag by up to this long",
+        default=300,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of workspaces whose model provider configurations are cached per process",
+        default=1024,
+    )
+
+
 class BillingConfig(BaseSettings):
     """
     Configuration for platform billing features
@@ -503,6 +597,17 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_GRAPH_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled workflow graphs kept in memory per process, 0 to disable",
+        default=128,
+    )
+
+    WORKFLOW_VARIABLES_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of published workflows whose environment and conversation variables are kept"
+        " materialized in memory per process, 0 to disable",
+        default=256,
+    )
+
 
 class WorkflowNodeExecutionConfig(BaseSettings):
     """
@@ -514,6 +619,22 @@ class WorkflowNodeExecutionConfig(BaseSettings):
         default=100,
     )
 
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED: bool = Field(
+        description="Buffer workflow node execution records during streaming and write them in batches"
+        " instead of committing every node start and finish",
+        default=False,
+    )
+
+    WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE: PositiveInt = Field(
+        description="Number of buffered workflow node execution records that triggers a flush",
+        default=50,
+    )
+
+    WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Maximum time in seconds a buffered workflow node execution record waits before being flushed",
+        default=1.0,
+    )
+
 
 class AuthConfig(BaseSettings):
     """
@@ -566,6 +687,23 @@ class AuthConfig(BaseSettings):
     )
 
 
+class OpsTraceConfig(BaseSettings):
+    """
+    Configuration for shipping app traces to external tracing services
+    """
+
+    OPS_TRACE_CONFIG_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds an app's tracing config and client are reused across requests in a process,"
+        " 0 to disable. Writes through the console invalidate them immediately",
+        default=300,
+    )
+
+    OPS_TRACE_CONFIG_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of apps whose tracing config is cached per process",
+        default=1024,
+    )
+
+
 class ModerationConfig(BaseSettings):
     """
     Configuration for content moderation
@@ -587,6 +725,18 @@ class ToolConfig(BaseSettings):
         default=3600,
     )
 
+    AGENT_TOOL_CALL_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of tool calls from one function calling agent round invoked at the same time,"
+        " 1 invokes them one after another",
+        default=1,
+    )
+
+    AGENT_TOOL_CALL_TIMEOUT: NonNegativeInt = Field(
+        description="Maximum time in seconds an agent waits for a tool call when tool calls are invoked"
+        " concurrently, 0 for no limit",
+        default=0,
+    )
+
 
 class MailConfig(BaseSettings):
     """
@@ -662,8 +812,19 @@ class RagEtlConfig(BaseSettings):
 
     KEYWORD_DATA_SOURCE_TYPE: str = Field(
         description="Data source type for keyword extraction"
-        " ('database' or other supported types), default to 'database'",
-        default="database",
+        " ('postings', 'database' or other supported types), default to 'postings'."
+        " Keyword tables of existing datasets are moved into postings on their next write when set to 'postings'",
+        default="postings",
+    )
+
+    PDF_EXTRACT_PROCESS_WORKERS: NonNegativeInt = Field(
+        description="Number of worker processes extracting large PDF files by page ranges, 0 to extract in process",
+        default=0,
+    )
+
+    PDF_EXTRACT_PAGES_PER_TASK: PositiveInt = Field(
+        description="Number of PDF pages extracted by each worker process task",
+        default=50,
     )
 
     UNSTRUCTURED_API_URL: Optional[str] = Field(
@@ -717,6 +878,33 @@ class DataSetConfig(BaseSettings):
         default=30,
     )
 
+    QUERY_EMBEDDING_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of query embeddings kept in the process-local cache, 0 to disable",
+        default=1024,
+    )
+
+    QUERY_EMBEDDING_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds for query embeddings in the process-local cache",
+        default=600,
+    )
+
+    DATASET_AVAILABILITY_CACHE_TTL: NonNegativeInt = Field(
+        description="Time-to-live in seconds for cached available document and segment counts of a dataset,"
+        " checked before every retrieval, 0 to disable",
+        default=60,
+    )
+
+    RETRIEVAL_WRITE_BEHIND_ENABLED: bool = Field(
+        description="Buffer segment hit counts and dataset queries in Redis and write them in batches"
+        " from a Celery beat task instead of on the request path",
+        default=False,
+    )
+
+    RETRIEVAL_WRITE_BEHIND_FLUSH_INTERVAL: PositiveInt = Field(
+        description="Interval in seconds between flushes of buffered retrieval records",
+        default=10,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -739,6 +927,69 @@ class IndexingConfig(BaseSettings):
         default=4000,
     )
 
+    INDEXING_STREAMING_EXTRACT_ENABLED: bool = Field(
+        description="Stream the pages or sections of uploaded files through cleaning and splitting in batches"
+        " instead of extracting the whole file first",
+        default=True,
+    )
+
+    INDEXING_EXTRACT_BATCH_SIZE: PositiveInt = Field(
+        description="Number of extracted pages or sections cleaned and split together when streaming extraction",
+        default=50,
+    )
+
+    INDEXING_SPLIT_RECOUNT_ENABLED: bool = Field(
+        description="Recount the tokens of custom segmentation chunks with the embedding model in one batch after"
+        " splitting with the local GPT-2 tokenizer, and split chunks over the limit again",
+        default=False,
+    )
+
+    INDEXING_LOAD_BATCH_SIZE: PositiveInt = Field(
+        description="Number of chunks embedded and upserted into the vector store together when loading a document",
+        default=100,
+    )
+
+    INDEXING_LOAD_QUEUE_SIZE: PositiveInt = Field(
+        description="Maximum number of chunk batches waiting between two stages of the loading pipeline",
+        default=4,
+    )
+
+    INDEXING_DEDUPE_WORKERS: PositiveInt = Field(
+        description="Number of threads looking up chunk batches in the embedding cache per document",
+        default=1,
+    )
+
+    INDEXING_EMBEDDING_WORKERS: PositiveInt = Field(
+        description="Number of threads embedding chunk batches per document",
+        default=4,
+    )
+
+    INDEXING_VECTOR_WORKERS: PositiveInt = Field(
+        description="Number of threads upserting chunk batches into the vector store per document",
+        default=2,
+    )
+
+    INDEXING_EMBEDDING_PROVIDER_CONCURRENCY: NonNegativeInt = Field(
+        description="Maximum number of chunk batches embedded at the same time with one provider in the process,"
+        " 0 means unlimited",
+        default=0,
+    )
+
+    INDEXING_EMBEDDING_PROVIDER_CONCURRENCY_OVERRIDES: str = Field(
+        description="Comma-separated provider=limit pairs overriding INDEXING_EMBEDDING_PROVIDER_CONCURRENCY,"
+        " e.g. langgenius/openai/openai=8",
+        default="",
+    )
+
+    @property
+    def INDEXING_EMBEDDING_PROVIDER_CONCURRENCY_DICT(self) -> dict[str, int]:
+        concurrency = {}
+        for item in self.INDEXING_EMBEDDING_PROVIDER_CONCURRENCY_OVERRIDES.split(","):
+            provider, _, limit = item.strip().rpartition("=")
+            if provider and limit.strip().isdigit():
+                concurrency[provider.strip()] = int(limit)
+        return concurrency
+
     CHILD_CHUNKS_PREVIEW_NUMBER: PositiveInt = Field(
         description="Maximum number of child chunks to preview",
         default=50,
@@ -872,8 +1123,10 @@ class FeatureConfig(
     LoggingConfig,
     MailConfig,
     ModelLoadBalanceConfig,
+    ModelProviderConfig,
     ModerationConfig,
     MultiModalTransferConfig,
+    OpsTraceConfig,
     PositionConfig,
     RagEtlConfig,
     SecurityConfig,
@@ -82,6 +82,12 @@ class VectorStoreConfig(BaseSettings):
         default=False,
     )
 
+    VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL: NonNegativeInt = Field(
+        description="Interval in seconds between health checks of shared vector store clients, an unhealthy client"
+        " is replaced on its next use. 0 to disable",
+        default=30,
+    )
+
 
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
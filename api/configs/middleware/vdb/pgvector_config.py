@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import Field, PositiveInt
+from pydantic import Field, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings
 
 
@@ -40,10 +40,17 @@ class PGVectorConfig(BaseSettings):
     )
 
     PGVECTOR_MAX_CONNECTION: PositiveInt = Field(
-        description="Max connection of the PostgreSQL database",
+        description="Max connection of the PostgreSQL database per process, connections are shared by all requests of"
+        " a process, so the database sees up to this many connections from every API and worker process",
         default=5,
     )
 
+    PGVECTOR_POOL_TIMEOUT: PositiveFloat = Field(
+        description="Time in seconds to wait for a free connection when all PGVECTOR_MAX_CONNECTION connections are"
+        " in use, before failing the request",
+        default=30,
+    )
+
     PGVECTOR_PG_BIGM: bool = Field(
         description="Whether to use pg_bigm module for full text search",
         default=False,
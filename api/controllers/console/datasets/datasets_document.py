@@ -643,6 +643,7 @@ class DocumentDetailApi(DocumentResource):
                 "completed_at": int(document.completed_at.timestamp()) if document.completed_at else None,
                 "updated_at": int(document.updated_at.timestamp()) if document.updated_at else None,
                 "indexing_latency": document.indexing_latency,
+                "indexing_stage_latencies": document.indexing_stage_latencies,
                 "error": document.error,
                 "enabled": document.enabled,
                 "disabled_at": int(document.disabled_at.timestamp()) if document.disabled_at else None,
@@ -676,6 +677,7 @@ class DocumentDetailApi(DocumentResource):
                 "completed_at": int(document.completed_at.timestamp()) if document.completed_at else None,
                 "updated_at": int(document.updated_at.timestamp()) if document.updated_at else None,
                 "indexing_latency": document.indexing_latency,
+                "indexing_stage_latencies": document.indexing_stage_latencies,
                 "error": document.error,
                 "enabled": document.enabled,
                 "disabled_at": int(document.disabled_at.timestamp()) if document.disabled_at else None,
@@ -1,9 +1,15 @@
+import contextvars
 import json
 import logging
+import time
 from collections.abc import Generator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from copy import deepcopy
 from typing import Any, Optional, Union
 
+from flask import current_app
+
+from configs import dify_config
 from core.agent.base_agent_runner import BaseAgentRunner
 from core.app.apps.base_app_queue_manager import PublishFrom
 from core.app.entities.queue_entities import QueueAgentThoughtEvent, QueueMessageEndEvent, QueueMessageFileEvent
@@ -23,7 +29,9 @@ from core.model_runtime.entities import (
     UserPromptMessage,
 )
 from core.model_runtime.entities.message_entities import ImagePromptMessageContent
+from core.ops.ops_trace_manager import TraceQueueManager
 from core.prompt.agent_history_prompt_transform import AgentHistoryPromptTransform
+from core.tools.__base.tool import Tool
 from core.tools.entities.tool_entities import ToolInvokeMeta
 from core.tools.tool_engine import ToolEngine
 from models.model import Message
@@ -223,45 +231,24 @@ class FunctionCallAgentRunner(BaseAgentRunner):
 
             # call tools
             tool_responses = []
-            for tool_call_id, tool_call_name, tool_call_args in tool_calls:
-                tool_instance = tool_instances.get(tool_call_name)
-                if not tool_instance:
-                    tool_response = {
-                        "tool_call_id": tool_call_id,
-                        "tool_call_name": tool_call_name,
-                        "tool_response": f"there is not a tool named {tool_call_name}",
-                        "meta": ToolInvokeMeta.error_instance(f"there is not a tool named {tool_call_name}").to_dict(),
-                    }
-                else:
-                    # invoke tool
-                    tool_invoke_response, message_files, tool_invoke_meta = ToolEngine.agent_invoke(
-                        tool=tool_instance,
-                        tool_parameters=tool_call_args,
-                        user_id=self.user_id,
-                        tenant_id=self.tenant_id,
-                        message=self.message,
-                        invoke_from=self.application_generate_entity.invoke_from,
-                        agent_tool_callback=self.agent_callback,
-                        trace_manager=trace_manager,
-                        app_id=self.application_generate_entity.app_config.app_id,
-                        message_id=self.message.id,
-                        conversation_id=self.conversation.id,
+            for (tool_call_id, tool_call_name, _), (tool_invoke_response, message_files, tool_invoke_meta) in zip(
+                tool_calls, self._invoke_tool_calls(tool_instances, tool_calls, trace_manager)
+            ):
+                # publish files
+                for message_file_id in message_files:
+                    # publish message file
+                    self.queue_manager.publish(
+                        QueueMessageFileEvent(message_file_id=message_file_id), PublishFrom.APPLICATION_MANAGER
                     )
-                    # publish files
-                    for message_file_id in message_files:
-                        # publish message file
-                        self.queue_manager.publish(
-                            QueueMessageFileEvent(message_file_id=message_file_id), PublishFrom.APPLICATION_MANAGER
-                        )
-                        # add message file ids
-                        message_file_ids.append(message_file_id)
+                    # add message file ids
+                    message_file_ids.append(message_file_id)
 
-                    tool_response = {
-                        "tool_call_id": tool_call_id,
-                        "tool_call_name": tool_call_name,
-                        "tool_response": tool_invoke_response,
-                        "meta": tool_invoke_meta.to_dict(),
-                    }
+                tool_response = {
+                    "tool_call_id": tool_call_id,
+                    "tool_call_name": tool_call_name,
+                    "tool_response": tool_invoke_response,
+                    "meta": tool_invoke_meta.to_dict(),
+                }
 
                 tool_responses.append(tool_response)
                 if tool_response["tool_response"] is not None:
@@ -314,6 +301,105 @@ class FunctionCallAgentRunner(BaseAgentRunner):
             PublishFrom.APPLICATION_MANAGER,
         )
 
+    def _invoke_tool_calls(
+        self,
+        tool_instances: dict[str, Tool],
+        tool_calls: list[tuple[str, str, dict[str, Any]]],
+        trace_manager: Optional[TraceQueueManager] = None,
+    ) -> list[tuple[str, list[str], ToolInvokeMeta]]:
+        """
+        Invoke the tool calls of one round and return their responses, message file ids and meta in call order.
+
+        Calls are invoked on a thread pool of AGENT_TOOL_CALL_MAX_WORKERS threads when it is above 1, and a call
+        still running AGENT_TOOL_CALL_TIMEOUT seconds after it started is answered with a timeout error.
+        """
+        max_workers = min(dify_config.AGENT_TOOL_CALL_MAX_WORKERS, len(tool_calls))
+        if max_workers <= 1:
+            return [
+                self._invoke_tool_call(tool_instances, tool_call_name, tool_call_args, trace_manager)
+                for _, tool_call_name, tool_call_args in tool_calls
+            ]
+
+        # load the message and conversation before the workers read them, the workers must not refresh them through
+        # the session of this thread after the agent thought commits expired them
+        _ = self.message.conversation_id, self.conversation.id
+
+        flask_app = current_app._get_current_object()  # type: ignore
+        started_at: dict[int, float] = {}
+
+        def invoke(index: int, tool_call_name: str, tool_call_args: dict[str, Any]):
+            started_at[index] = time.perf_counter()
+            with flask_app.app_context():
+                return self._invoke_tool_call(tool_instances, tool_call_name, tool_call_args, trace_manager)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent_tool_call")
+        try:
+            # every call runs in its own copy of this thread's context, so nothing it sets leaks into the pooled thread
+            futures = [
+                executor.submit(contextvars.copy_context().run, invoke, index, tool_call_name, tool_call_args)
+                for index, (_, tool_call_name, tool_call_args) in enumerate(tool_calls)
+            ]
+            timeout = dify_config.AGENT_TOOL_CALL_TIMEOUT
+            timed_out: set[int] = set()
+            pending = {future: index for index, future in enumerate(futures)}
+            while pending:
+                now = time.perf_counter()
+                if timeout:
+                    for future, index in list(pending.items()):
+                        if index in started_at and now - started_at[index] >= timeout:
+                            timed_out.add(index)
+                            del pending[future]
+                    if not pending:
+                        break
+                deadlines = [started_at[index] + timeout for index in pending.values() if index in started_at]
+                done, _ = wait(
+                    pending,
+                    timeout=max(min(deadlines, default=now + timeout) - now, 0) if timeout else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    del pending[future]
+
+            results: list[tuple[str, list[str], ToolInvokeMeta]] = []
+            for index, (future, (_, tool_call_name, _)) in enumerate(zip(futures, tool_calls)):
+                if index in timed_out:
+                    error_response = f"tool invoke error: {tool_call_name} timed out after {timeout} seconds"
+                    logger.warning("Agent tool call %s timed out after %s seconds", tool_call_name, timeout)
+                    results.append((error_response, [], ToolInvokeMeta.error_instance(error_response)))
+                else:
+                    results.append(future.result())
+            return results
+        finally:
+            # do not wait for timed out calls, their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _invoke_tool_call(
+        self,
+        tool_instances: dict[str, Tool],
+        tool_call_name: str,
+        tool_call_args: dict[str, Any],
+        trace_manager: Optional[TraceQueueManager] = None,
+    ) -> tuple[str, list[str], ToolInvokeMeta]:
+        tool_instance = tool_instances.get(tool_call_name)
+        if not tool_instance:
+            error_response = f"there is not a tool named {tool_call_name}"
+            return error_response, [], ToolInvokeMeta.error_instance(error_response)
+
+        # invoke tool
+        return ToolEngine.agent_invoke(
+            tool=tool_instance,
+            tool_parameters=tool_call_args,
+            user_id=self.user_id,
+            tenant_id=self.tenant_id,
+            message=self.message,
+            invoke_from=self.application_generate_entity.invoke_from,
+            agent_tool_callback=self.agent_callback,
+            trace_manager=trace_manager,
+            app_id=self.application_generate_entity.app_config.app_id,
+            message_id=self.message.id,
+            conversation_id=self.conversation.id,
+        )
+
     def check_tool_calls(self, llm_result_chunk: LLMResultChunk) -> bool:
         """
         Check if there is any tool call in llm result chunk
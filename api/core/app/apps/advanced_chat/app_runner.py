@@ -152,7 +152,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             )
 
             # init graph
-            graph = self._init_graph(graph_config=workflow.graph_dict)
+            graph = self._init_graph(graph_config=workflow.graph_dict, workflow=workflow)
 
         db.session.close()
 
@@ -228,14 +228,20 @@ class AdvancedChatAppGenerateTaskPipeline:
                 tenant_id, features_dict["text_to_speech"].get("voice"), features_dict["text_to_speech"].get("language")
             )
 
-        for response in self._process_stream_response(tts_publisher=tts_publisher, trace_manager=trace_manager):
-            while True:
-                audio_response = self._listen_audio_msg(publisher=tts_publisher, task_id=task_id)
-                if audio_response:
-                    yield audio_response
-                else:
-                    break
-            yield response
+        try:
+            for response in self._process_stream_response(tts_publisher=tts_publisher, trace_manager=trace_manager):
+                while True:
+                    audio_response = self._listen_audio_msg(publisher=tts_publisher, task_id=task_id)
+                    if audio_response:
+                        yield audio_response
+                    else:
+                        break
+                yield response
+        finally:
+            # runs on error events and client disconnects too, which end the stream before the workflow finishes
+            with Session(db.engine, expire_on_commit=False) as session:
+                self._workflow_cycle_manager.flush_pending_node_executions(session=session)
+                session.commit()
 
         start_listener_time = time.time()
         # timeout
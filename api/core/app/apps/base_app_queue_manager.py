@@ -11,9 +11,12 @@ from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
     MessageQueueMessage,
+    QueueAgentMessageEvent,
     QueueErrorEvent,
+    QueueLLMChunkEvent,
     QueuePingEvent,
     QueueStopEvent,
+    QueueTextChunkEvent,
     WorkflowQueueMessage,
 )
 from extensions.ext_redis import redis_client
@@ -25,6 +28,12 @@ class PublishFrom(Enum):
 
 
 class AppQueueManager:
+    # seconds between two reads of the redis stop flag, which is otherwise checked for every queued chunk
+    STOP_CHECK_INTERVAL = 0.5
+
+    # high-frequency events whose fields are fully typed and can never hold SQLAlchemy model instances
+    _SQLALCHEMY_MODEL_FREE_EVENTS = (QueueLLMChunkEvent, QueueTextChunkEvent, QueueAgentMessageEvent, QueuePingEvent)
+
     def __init__(self, task_id: str, user_id: str, invoke_from: InvokeFrom) -> None:
         if not user_id:
             raise ValueError("user is required")
@@ -41,6 +50,8 @@ class AppQueueManager:
         q: queue.Queue[WorkflowQueueMessage | MessageQueueMessage | None] = queue.Queue()
 
         self._q = q
+        self._stopped = False
+        self._last_stop_check_time: float = 0
 
     def listen(self):
         """
@@ -96,7 +107,8 @@ class AppQueueManager:
         :param pub_from:
         :return:
         """
-        self._check_for_sqlalchemy_models(event.model_dump())
+        if not isinstance(event, self._SQLALCHEMY_MODEL_FREE_EVENTS):
+            self._check_for_sqlalchemy_models(event.model_dump())
         self._publish(event, pub_from)
 
     @abstractmethod
@@ -128,12 +140,21 @@ class AppQueueManager:
 
     def _is_stopped(self) -> bool:
         """
-        Check if task is stopped
+        Check if task is stopped, reading the stop flag from redis at most once per STOP_CHECK_INTERVAL
         :return:
         """
+        if self._stopped:
+            return True
+
+        now = time.monotonic()
+        if now - self._last_stop_check_time < self.STOP_CHECK_INTERVAL:
+            return False
+        self._last_stop_check_time = now
+
         stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
         result = redis_client.get(stopped_cache_key)
         if result is not None:
+            self._stopped = True
             return True
 
         return False
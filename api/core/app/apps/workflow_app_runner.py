@@ -72,9 +72,9 @@ class WorkflowBasedAppRunner(AppRunner):
     def __init__(self, queue_manager: AppQueueManager):
         self.queue_manager = queue_manager
 
-    def _init_graph(self, graph_config: Mapping[str, Any]) -> Graph:
+    def _init_graph(self, graph_config: Mapping[str, Any], workflow: Optional[Workflow] = None) -> Graph:
         """
-        Init graph
+        Init graph, reusing the compiled graph of the workflow version if given
         """
         if "nodes" not in graph_config or "edges" not in graph_config:
             raise ValueError("nodes or edges not found in workflow graph")
@@ -85,7 +85,8 @@ class WorkflowBasedAppRunner(AppRunner):
         if not isinstance(graph_config.get("edges"), list):
             raise ValueError("edges in workflow graph must be a list")
         # init graph
-        graph = Graph.init(graph_config=graph_config)
+        cache_key = f"{workflow.id}:{workflow.unique_hash}" if workflow else None
+        graph = Graph.init(graph_config=graph_config, cache_key=cache_key)
 
         if not graph:
             raise ValueError("graph not found in workflow")
@@ -5,19 +5,111 @@ from collections.abc import Generator, Mapping
 from datetime import timedelta
 from typing import Any, Optional, Union
 
+from redis.commands.core import Script
+
+from configs import dify_config
 from core.errors.error import AppInvokeQuotaExceededError
 from extensions.ext_redis import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Admits requests while the app has a free active request slot, otherwise queues them in a bounded wait queue.
+# Waiting requests are ordered by how many requests their user already has waiting, then by arrival, so one user
+# sending a burst can't hold back everyone else. A queued request is admitted once it is within the free slots.
+# KEYS: active requests (hash), wait queue (zset), queue deadlines (zset), ticket users (hash), waiting per user (hash)
+# ARGV: action (enter / poll / leave), request id, now, max active requests, max alive time, user, queue size, deadline
+# Returns 1 when admitted, 0 when waiting and -1 when rejected or the wait timed out.
+_ADMISSION_SCRIPT = """
+local active_key, queue_key, deadlines_key, ticket_users_key, user_waiting_key = unpack(KEYS)
+local action, request_id = ARGV[1], ARGV[2]
+local now, max_active, max_alive = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+
+local function remove_ticket(ticket)
+    local user = redis.call('HGET', ticket_users_key, ticket)
+    redis.call('ZREM', queue_key, ticket)
+    redis.call('ZREM', deadlines_key, ticket)
+    redis.call('HDEL', ticket_users_key, ticket)
+    if user and redis.call('HINCRBY', user_waiting_key, user, -1) <= 0 then
+        redis.call('HDEL', user_waiting_key, user)
+    end
+end
+
+local function admit()
+    redis.call('HSET', active_key, request_id, ARGV[3])
+    redis.call('EXPIRE', active_key, 86400)
+    return 1
+end
+
+if action == 'leave' then
+    remove_ticket(request_id)
+    return 0
+end
+
+for _, ticket in ipairs(redis.call('ZRANGEBYSCORE', deadlines_key, '-inf', now)) do
+    remove_ticket(ticket)
+end
+
+local active = redis.call('HLEN', active_key)
+if active >= max_active then
+    -- drop requests that never exited
+    local requests = redis.call('HGETALL', active_key)
+    for i = 1, #requests, 2 do
+        if now - tonumber(requests[i + 1]) > max_alive then
+            redis.call('HDEL', active_key, requests[i])
+            active = active - 1
+        end
+    end
+end
+
+if action == 'poll' then
+    local rank = redis.call('ZRANK', queue_key, request_id)
+    if not rank then
+        return -1
+    end
+    if rank < max_active - active then
+        remove_ticket(request_id)
+        return admit()
+    end
+    return 0
+end
+
+local queued = redis.call('ZCARD', queue_key)
+if queued == 0 and active < max_active then
+    return admit()
+end
+if queued >= tonumber(ARGV[7]) then
+    return -1
+end
+
+local user = ARGV[6]
+local waiting = redis.call('HINCRBY', user_waiting_key, user, 1) - 1
+redis.call('ZADD', queue_key, waiting * 1e10 + now, request_id)
+redis.call('ZADD', deadlines_key, tonumber(ARGV[8]), request_id)
+redis.call('HSET', ticket_users_key, request_id, user)
+for _, key in ipairs({queue_key, deadlines_key, ticket_users_key, user_waiting_key}) do
+    redis.call('EXPIRE', key, 86400)
+end
+return 0
+"""
+
 
 class RateLimit:
     _MAX_ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:max_active_requests"
-    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:active_requests"
+    # keys used together by the admission script share a hash tag to stay in one cluster slot
+    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{{{}}}:active_requests"
+    _QUEUE_KEYS = (
+        "dify:rate_limit:{{{}}}:queue",
+        "dify:rate_limit:{{{}}}:queue_deadlines",
+        "dify:rate_limit:{{{}}}:queue_users",
+        "dify:rate_limit:{{{}}}:user_waiting",
+    )
     _UNLIMITED_REQUEST_ID = "unlimited_request_id"
     _REQUEST_MAX_ALIVE_TIME = 10 * 60  # 10 minutes
     _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # recalculate request_count from request_detail every 5 minutes
+    _QUEUE_POLL_INTERVAL = 0.1
+    _ADMITTED, _WAITING = 1, 0
     _instance_dict: dict[str, "RateLimit"] = {}
+    _admission_script: Optional[Script] = None
 
     def __new__(cls: type["RateLimit"], client_id: str, max_active_requests: int):
         if client_id not in cls._instance_dict:
@@ -36,6 +128,7 @@ class RateLimit:
         self.client_id = client_id
         self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
         self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
+        self.admission_keys = [self.active_requests_key, *(key.format(client_id) for key in self._QUEUE_KEYS)]
         self.last_recalculate_time = float("-inf")
         self.flush_cache(use_local_value=True)
 
@@ -63,7 +156,15 @@ class RateLimit:
         if timeout_requests:
             redis_client.hdel(self.active_requests_key, *timeout_requests)
 
-    def enter(self, request_id: Optional[str] = None) -> str:
+    def enter(self, request_id: Optional[str] = None, user_id: Optional[str] = None) -> str:
+        """
+        Take an active request slot, waiting in the app's queue for up to APP_MAX_ACTIVE_REQUESTS_QUEUE_TIMEOUT
+        seconds when the queue is enabled and the app is at its limit.
+
+        :param request_id: request id, generated when not given
+        :param user_id: the user sending the request, waiting requests are shared fairly between users
+        :return: request id to exit with
+        """
         if self.disabled():
             return RateLimit._UNLIMITED_REQUEST_ID
         if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
@@ -71,15 +172,43 @@ class RateLimit:
         if not request_id:
             request_id = RateLimit.gen_request_key()
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
+        result = self._admit(
+            "enter",
+            request_id,
+            user_id or request_id,
+            dify_config.APP_MAX_ACTIVE_REQUESTS_QUEUE_SIZE,
+            time.time() + dify_config.APP_MAX_ACTIVE_REQUESTS_QUEUE_TIMEOUT,
+        )
+        if result == RateLimit._WAITING:
+            try:
+                while result == RateLimit._WAITING:
+                    time.sleep(RateLimit._QUEUE_POLL_INTERVAL)
+                    result = self._admit("poll", request_id)
+            except BaseException:
+                self._admit("leave", request_id)
+                raise
+
+        if result != RateLimit._ADMITTED:
             raise AppInvokeQuotaExceededError(
                 f"Too many requests. Please try again later. The current maximum concurrent requests allowed "
                 f"for {self.client_id} is {self.max_active_requests}."
             )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
         return request_id
 
+    def _admit(self, action: str, request_id: str, *args: Union[str, float]) -> int:
+        script = RateLimit._admission_script
+        if script is None:
+            script = RateLimit._admission_script = redis_client.register_script(_ADMISSION_SCRIPT)
+        script_args: list[Union[str, float]] = [
+            action,
+            request_id,
+            time.time(),
+            self.max_active_requests,
+            RateLimit._REQUEST_MAX_ALIVE_TIME,
+            *args,
+        ]
+        return int(script(keys=self.admission_keys, args=script_args))
+
     def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
@@ -5,9 +5,11 @@ from datetime import UTC, datetime
 from typing import Any, Optional, Union, cast
 from uuid import uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from configs import dify_config
 from core.app.entities.app_invoke_entities import AdvancedChatAppGenerateEntity, InvokeFrom, WorkflowAppGenerateEntity
 from core.app.entities.queue_entities import (
     QueueAgentLogEvent,
@@ -79,6 +81,10 @@ class WorkflowCycleManage:
         self._workflow_node_executions: dict[str, WorkflowNodeExecution] = {}
         self._application_generate_entity = application_generate_entity
         self._workflow_system_variables = workflow_system_variables
+        # in write-behind mode node executions stay detached from the session and are upserted in batches
+        self._write_behind = dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED
+        self._pending_node_executions: dict[str, WorkflowNodeExecution] = {}
+        self._last_node_execution_flush_at = time.monotonic()
 
     def _handle_workflow_run_start(
         self,
@@ -136,6 +142,7 @@ class WorkflowCycleManage:
         workflow_run.created_at = datetime.now(UTC).replace(tzinfo=None)
 
         session.add(workflow_run)
+        self._workflow_run = workflow_run
 
         return workflow_run
 
@@ -171,6 +178,7 @@ class WorkflowCycleManage:
         workflow_run.total_tokens = total_tokens
         workflow_run.total_steps = total_steps
         workflow_run.finished_at = datetime.now(UTC).replace(tzinfo=None)
+        self._flush_node_executions(session=session, force=True)
 
         if trace_manager:
             trace_manager.add_trace_task(
@@ -207,6 +215,7 @@ class WorkflowCycleManage:
         workflow_run.total_steps = total_steps
         workflow_run.finished_at = datetime.now(UTC).replace(tzinfo=None)
         workflow_run.exceptions_count = exceptions_count
+        self._flush_node_executions(session=session, force=True)
 
         if trace_manager:
             trace_manager.add_trace_task(
@@ -254,19 +263,27 @@ class WorkflowCycleManage:
         workflow_run.finished_at = datetime.now(UTC).replace(tzinfo=None)
         workflow_run.exceptions_count = exceptions_count
 
-        stmt = select(WorkflowNodeExecution.node_execution_id).where(
-            WorkflowNodeExecution.tenant_id == workflow_run.tenant_id,
-            WorkflowNodeExecution.app_id == workflow_run.app_id,
-            WorkflowNodeExecution.workflow_id == workflow_run.workflow_id,
-            WorkflowNodeExecution.triggered_from == WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN.value,
-            WorkflowNodeExecution.workflow_run_id == workflow_run.id,
-            WorkflowNodeExecution.status == WorkflowNodeExecutionStatus.RUNNING.value,
-        )
-        ids = session.scalars(stmt).all()
-        # Use self._get_workflow_node_execution here to make sure the cache is updated
-        running_workflow_node_executions = [
-            self._get_workflow_node_execution(session=session, node_execution_id=id) for id in ids if id
-        ]
+        if self._write_behind:
+            # every node execution of this run is held in memory, so there is no need to query for running ones
+            running_workflow_node_executions = [
+                workflow_node_execution
+                for workflow_node_execution in self._workflow_node_executions.values()
+                if workflow_node_execution.status == WorkflowNodeExecutionStatus.RUNNING.value
+            ]
+        else:
+            stmt = select(WorkflowNodeExecution.node_execution_id).where(
+                WorkflowNodeExecution.tenant_id == workflow_run.tenant_id,
+                WorkflowNodeExecution.app_id == workflow_run.app_id,
+                WorkflowNodeExecution.workflow_id == workflow_run.workflow_id,
+                WorkflowNodeExecution.triggered_from == WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN.value,
+                WorkflowNodeExecution.workflow_run_id == workflow_run.id,
+                WorkflowNodeExecution.status == WorkflowNodeExecutionStatus.RUNNING.value,
+            )
+            ids = session.scalars(stmt).all()
+            # Use self._get_workflow_node_execution here to make sure the cache is updated
+            running_workflow_node_executions = [
+                self._get_workflow_node_execution(session=session, node_execution_id=id) for id in ids if id
+            ]
 
         for workflow_node_execution in running_workflow_node_executions:
             now = datetime.now(UTC).replace(tzinfo=None)
@@ -274,6 +291,10 @@ class WorkflowCycleManage:
             workflow_node_execution.error = error
             workflow_node_execution.finished_at = now
             workflow_node_execution.elapsed_time = (now - workflow_node_execution.created_at).total_seconds()
+            if self._write_behind:
+                self._pending_node_executions[str(workflow_node_execution.id)] = workflow_node_execution
+
+        self._flush_node_executions(session=session, force=True)
 
         if trace_manager:
             trace_manager.add_trace_task(
@@ -315,9 +336,10 @@ class WorkflowCycleManage:
         )
         workflow_node_execution.created_at = datetime.now(UTC).replace(tzinfo=None)
 
-        session.add(workflow_node_execution)
-
         self._workflow_node_executions[event.node_execution_id] = workflow_node_execution
+        self._save_workflow_node_execution(
+            session=session, workflow_node_execution=workflow_node_execution, is_new=True
+        )
         return workflow_node_execution
 
     def _handle_workflow_node_execution_success(
@@ -344,8 +366,7 @@ class WorkflowCycleManage:
         workflow_node_execution.finished_at = finished_at
         workflow_node_execution.elapsed_time = elapsed_time
 
-        workflow_node_execution = session.merge(workflow_node_execution)
-        return workflow_node_execution
+        return self._save_workflow_node_execution(session=session, workflow_node_execution=workflow_node_execution)
 
     def _handle_workflow_node_execution_failed(
         self,
@@ -387,8 +408,7 @@ class WorkflowCycleManage:
         workflow_node_execution.elapsed_time = elapsed_time
         workflow_node_execution.execution_metadata = execution_metadata
 
-        workflow_node_execution = session.merge(workflow_node_execution)
-        return workflow_node_execution
+        return self._save_workflow_node_execution(session=session, workflow_node_execution=workflow_node_execution)
 
     def _handle_workflow_node_execution_retried(
         self, *, session: Session, workflow_run: WorkflowRun, event: QueueNodeRetryEvent
@@ -439,9 +459,10 @@ class WorkflowCycleManage:
         workflow_node_execution.execution_metadata = execution_metadata
         workflow_node_execution.index = event.node_run_index
 
-        session.add(workflow_node_execution)
-
         self._workflow_node_executions[event.node_execution_id] = workflow_node_execution
+        self._save_workflow_node_execution(
+            session=session, workflow_node_execution=workflow_node_execution, is_new=True
+        )
         return workflow_node_execution
 
     #################################################
@@ -924,7 +945,8 @@ class WorkflowCycleManage:
     def _get_workflow_run(self, *, session: Session, workflow_run_id: str) -> WorkflowRun:
         if self._workflow_run and self._workflow_run.id == workflow_run_id:
             cached_workflow_run = self._workflow_run
-            cached_workflow_run = session.merge(cached_workflow_run)
+            # the cached run is committed and unchanged between events, so it can be attached without a SELECT
+            cached_workflow_run = session.merge(cached_workflow_run, load=not self._write_behind)
             return cached_workflow_run
         stmt = select(WorkflowRun).where(WorkflowRun.id == workflow_run_id)
         workflow_run = session.scalar(stmt)
@@ -938,8 +960,60 @@ class WorkflowCycleManage:
         if node_execution_id not in self._workflow_node_executions:
             raise ValueError(f"Workflow node execution not found: {node_execution_id}")
         cached_workflow_node_execution = self._workflow_node_executions[node_execution_id]
+        if self._write_behind:
+            return cached_workflow_node_execution
         return session.merge(cached_workflow_node_execution)
 
+    def _save_workflow_node_execution(
+        self, *, session: Session, workflow_node_execution: WorkflowNodeExecution, is_new: bool = False
+    ) -> WorkflowNodeExecution:
+        if not self._write_behind:
+            if is_new:
+                session.add(workflow_node_execution)
+                return workflow_node_execution
+            return session.merge(workflow_node_execution)
+        self._pending_node_executions[str(workflow_node_execution.id)] = workflow_node_execution
+        self._flush_node_executions(session=session)
+        return workflow_node_execution
+
+    def flush_pending_node_executions(self, *, session: Session) -> None:
+        """
+        Write node executions still buffered by write-behind, call it when the stream ends. The caller commits.
+        """
+        self._flush_node_executions(session=session, force=True)
+
+    def _flush_node_executions(self, *, session: Session, force: bool = False) -> None:
+        """
+        Upsert buffered node executions once enough of them are pending or the flush interval has passed.
+        The caller commits the session.
+        """
+        if not self._write_behind or not self._pending_node_executions:
+            return
+        if (
+            not force
+            and len(self._pending_node_executions) < dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE
+            and time.monotonic() - self._last_node_execution_flush_at
+            < dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL
+        ):
+            return
+
+        column_keys = [column_attr.key for column_attr in inspect(WorkflowNodeExecution).column_attrs]
+        rows = []
+        for workflow_node_execution in self._pending_node_executions.values():
+            row = {key: getattr(workflow_node_execution, key) for key in column_keys}
+            # elapsed_time is not nullable and only falls back to its server default when omitted
+            row["elapsed_time"] = row["elapsed_time"] or 0
+            rows.append(row)
+
+        stmt = insert(WorkflowNodeExecution).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WorkflowNodeExecution.id],
+            set_={key: stmt.excluded[key] for key in column_keys if key != "id"},
+        )
+        session.execute(stmt)
+        self._pending_node_executions.clear()
+        self._last_node_execution_flush_at = time.monotonic()
+
     def _handle_agent_log(self, task_id: str, event: QueueAgentLogEvent) -> AgentLogStreamResponse:
         """
         Handle agent log
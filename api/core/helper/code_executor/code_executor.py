@@ -4,7 +4,7 @@ from enum import StrEnum
 from threading import Lock
 from typing import Any, Optional
 
-from httpx import Timeout, post
+import httpx
 from pydantic import BaseModel
 from yarl import URL
 
@@ -13,6 +13,7 @@ from core.helper.code_executor.javascript.javascript_transformer import NodeJsTe
 from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
 from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
 from core.helper.code_executor.template_transformer import TemplateTransformer
+from core.helper.http_client_pool import get_limits, get_pooled_client, http2_enabled, no_cookie_jar
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +56,10 @@ class CodeExecutor:
 
     supported_dependencies_languages: set[CodeLanguage] = {CodeLanguage.PYTHON3}
 
+    @classmethod
+    def _create_client(cls, **kwargs) -> httpx.Client:
+        return httpx.Client(limits=get_limits(), http2=http2_enabled(), cookies=no_cookie_jar(), **kwargs)
+
     @classmethod
     def execute_code(cls, language: CodeLanguage, preload: str, code: str) -> str:
         """
@@ -76,11 +81,12 @@ class CodeExecutor:
         }
 
         try:
-            response = post(
+            client = get_pooled_client("code_executor", cls._create_client)
+            response = client.post(
                 str(url),
                 json=data,
                 headers=headers,
-                timeout=Timeout(
+                timeout=httpx.Timeout(
                     connect=dify_config.CODE_EXECUTION_CONNECT_TIMEOUT,
                     read=dify_config.CODE_EXECUTION_READ_TIMEOUT,
                     write=dify_config.CODE_EXECUTION_WRITE_TIMEOUT,
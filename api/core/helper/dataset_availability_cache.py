@@ -0,0 +1,52 @@
+import json
+from json import JSONDecodeError
+from typing import Optional
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+
+class DatasetAvailabilityCache:
+    def __init__(self, dataset_id: str):
+        self.cache_key = f"dataset_availability:dataset_id:{dataset_id}"
+
+    def get(self) -> Optional[tuple[int, int]]:
+        """
+        Get cached available document and segment counts.
+
+        :return:
+        """
+        cached_counts = redis_client.get(self.cache_key)
+        if cached_counts:
+            try:
+                counts = json.loads(cached_counts.decode("utf-8"))
+            except JSONDecodeError:
+                return None
+
+            return int(counts["document_count"]), int(counts["segment_count"])
+        else:
+            return None
+
+    def set(self, document_count: int, segment_count: int) -> None:
+        """
+        Cache available document and segment counts.
+
+        :param document_count: available document count
+        :param segment_count: available segment count
+        :return:
+        """
+        if not dify_config.DATASET_AVAILABILITY_CACHE_TTL:
+            return
+        redis_client.setex(
+            self.cache_key,
+            dify_config.DATASET_AVAILABILITY_CACHE_TTL,
+            json.dumps({"document_count": document_count, "segment_count": segment_count}),
+        )
+
+    def delete(self) -> None:
+        """
+        Delete cached available document and segment counts.
+
+        :return:
+        """
+        redis_client.delete(self.cache_key)
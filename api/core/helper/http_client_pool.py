@@ -0,0 +1,97 @@
+"""
+Process-wide pooled httpx clients, so repeated requests to the same host reuse keep-alive connections
+"""
+
+import importlib.util
+import os
+import threading
+from collections.abc import Callable
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any
+
+import httpx
+
+from configs import dify_config
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_clients: dict[str, httpx.Client] = {}
+_request_counts: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def get_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=dify_config.HTTP_CLIENT_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=dify_config.HTTP_CLIENT_POOL_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=dify_config.HTTP_CLIENT_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def http2_enabled() -> bool:
+    return dify_config.HTTP_CLIENT_POOL_HTTP2_ENABLED and HTTP2_AVAILABLE
+
+
+def no_cookie_jar() -> CookieJar:
+    """
+    A cookie jar that never stores cookies, shared clients must not leak cookies from one caller to another
+    """
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+def get_pooled_client(name: str, factory: Callable[..., httpx.Client]) -> httpx.Client:
+    """
+    Get the shared client registered under name, creating it with factory on first use.
+
+    :param name: pool name, one per client configuration (e.g. proxy settings)
+    :param factory: called with the event hooks to install on the new client
+    :return: the shared client
+    """
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            _request_counts[name] = 0
+            client = factory(event_hooks={"request": [_request_counter(name)]})
+            _clients[name] = client
+        return client
+
+
+def get_pool_stats() -> dict[str, dict[str, Any]]:
+    """
+    Usage of every pooled client: requests sent, open connections and idle keep-alive connections
+    """
+    stats: dict[str, dict[str, Any]] = {}
+    for name, client in list(_clients.items()):
+        connections: list[Any] = []
+        for transport in [client._transport, *client._mounts.values()]:
+            pool = getattr(transport, "_pool", None)
+            connections.extend(getattr(pool, "connections", []))
+        stats[name] = {
+            "requests": _request_counts.get(name, 0),
+            "connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+        }
+    return stats
+
+
+def _request_counter(name: str) -> Callable[[httpx.Request], None]:
+    def count(request: httpx.Request) -> None:
+        with _lock:
+            _request_counts[name] += 1
+
+    return count
+
+
+def _reset_after_fork() -> None:
+    # connections must not be shared with the parent process
+    global _lock
+    _clients.clear()
+    _request_counts.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from typing import Optional, TypeVar, cast
+
+from cachetools import TTLCache  # type: ignore
+from pydantic import TypeAdapter
+
+from configs import dify_config
+from core.model_runtime.entities.model_entities import AIModelEntity
+from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_provider_list_adapter = TypeAdapter(list[PluginModelProviderEntity])
+
+_local_cache: TTLCache = TTLCache(
+    maxsize=max(dify_config.PLUGIN_MODEL_CACHE_SIZE, 1), ttl=max(dify_config.PLUGIN_MODEL_CACHE_TTL, 1)
+)
+_local_cache_lock = threading.Lock()
+
+
+class PluginModelCache:
+    """
+    Tenant-scoped cache of plugin model provider declarations and model schemas shared between requests.
+
+    Values live in a process-local LRU in front of Redis. Every key embeds a per-tenant version counter kept in
+    Redis, so `invalidate` drops all entries of a tenant in every process by bumping the counter.
+    Cached objects are shared between requests and must not be modified.
+    """
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+
+    @property
+    def enabled(self) -> bool:
+        return dify_config.PLUGIN_MODEL_CACHE_TTL > 0
+
+    def get_providers(self) -> Optional[list[PluginModelProviderEntity]]:
+        if not self.enabled:
+            return None
+        cache_key = f"plugin_model_providers:tenant_id:{self.tenant_id}:version:{self._get_version()}"
+        return self._get(cache_key, _provider_list_adapter.validate_json)
+
+    def set_providers(self, providers: Sequence[PluginModelProviderEntity]) -> None:
+        if not self.enabled:
+            return
+        cache_key = f"plugin_model_providers:tenant_id:{self.tenant_id}:version:{self._get_version()}"
+        self._set(cache_key, list(providers), _provider_list_adapter.dump_json(list(providers)))
+
+    def get_model_schema(
+        self, plugin_id: str, provider: str, model_type: str, model: str, credentials: Optional[dict]
+    ) -> Optional[AIModelEntity]:
+        if not self.enabled:
+            return None
+        cache_key = self._get_model_schema_key(plugin_id, provider, model_type, model, credentials)
+        return self._get(cache_key, AIModelEntity.model_validate_json)
+
+    def set_model_schema(
+        self,
+        plugin_id: str,
+        provider: str,
+        model_type: str,
+        model: str,
+        credentials: Optional[dict],
+        schema: AIModelEntity,
+    ) -> None:
+        if not self.enabled:
+            return
+        cache_key = self._get_model_schema_key(plugin_id, provider, model_type, model, credentials)
+        self._set(cache_key, schema, schema.model_dump_json())
+
+    @classmethod
+    def invalidate(cls, tenant_id: str) -> None:
+        """
+        Drop every cached provider list and model schema of the tenant.
+        """
+        redis_client.incr(cls._get_version_key(tenant_id))
+
+    @staticmethod
+    def _get_version_key(tenant_id: str) -> str:
+        return f"plugin_model_cache:version:tenant_id:{tenant_id}"
+
+    def _get_version(self) -> str:
+        version = redis_client.get(self._get_version_key(self.tenant_id))
+        return version.decode() if version else "0"
+
+    def _get_model_schema_key(
+        self, plugin_id: str, provider: str, model_type: str, model: str, credentials: Optional[dict]
+    ) -> str:
+        credentials_hash = hashlib.sha256(
+            json.dumps(credentials or {}, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return (
+            f"plugin_model_schema:tenant_id:{self.tenant_id}:version:{self._get_version()}"
+            f":{plugin_id}:{provider}:{model_type}:{model}:{credentials_hash}"
+        )
+
+    def _get(self, cache_key: str, loads: Callable[[bytes], T]) -> Optional[T]:
+        with _local_cache_lock:
+            cached_value = _local_cache.get(cache_key)
+        if cached_value is not None:
+            return cast(T, cached_value)
+
+        cached = redis_client.get(cache_key)
+        if not cached:
+            return None
+        try:
+            value = loads(cached)
+        except Exception:
+            logger.warning("Invalid plugin model cache entry %s", cache_key)
+            return None
+        with _local_cache_lock:
+            _local_cache[cache_key] = value
+        return value
+
+    def _set(self, cache_key: str, value, serialized: bytes | str) -> None:
+        redis_client.setex(cache_key, dify_config.PLUGIN_MODEL_CACHE_TTL, serialized)
+        with _local_cache_lock:
+            _local_cache[cache_key] = value
@@ -0,0 +1,65 @@
+import threading
+from typing import TYPE_CHECKING, Optional, cast
+
+from cachetools import TTLCache  # type: ignore
+
+from configs import dify_config
+from core.helper.plugin_model_cache import PluginModelCache
+from extensions.ext_redis import redis_client
+
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+
+_local_cache: TTLCache = TTLCache(
+    maxsize=dify_config.PROVIDER_CONFIGURATIONS_CACHE_SIZE,
+    ttl=max(dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL, 1),
+)
+_local_cache_lock = threading.Lock()
+
+
+class ProviderConfigurationsCache:
+    """
+    Process-local snapshot of a tenant's model provider configurations.
+
+    Snapshots hold decrypted credentials and never leave the process. They are tagged with the tenant's version
+    counter kept in Redis, and with the plugin model cache version so plugin installs are picked up too, so
+    `invalidate` drops the snapshot in every process. Snapshots are shared between requests and must not be modified.
+    """
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+
+    @property
+    def enabled(self) -> bool:
+        return dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL > 0
+
+    def get_version(self) -> str:
+        """
+        Get the current version of the tenant's configurations, read it before loading a snapshot to `set`.
+        """
+        versions = redis_client.mget(
+            [self._get_version_key(self.tenant_id), PluginModelCache._get_version_key(self.tenant_id)]
+        )
+        return ":".join(version.decode() if version else "0" for version in versions)
+
+    def get(self, version: str) -> Optional["ProviderConfigurations"]:
+        with _local_cache_lock:
+            cached = _local_cache.get(self.tenant_id)
+        if cached is None or cached[0] != version:
+            return None
+        return cast("ProviderConfigurations", cached[1])
+
+    def set(self, version: str, provider_configurations: "ProviderConfigurations") -> None:
+        with _local_cache_lock:
+            _local_cache[self.tenant_id] = (version, provider_configurations)
+
+    @classmethod
+    def invalidate(cls, tenant_id: str) -> None:
+        """
+        Drop the tenant's snapshot in every process, call it after any provider, credential or model setting write.
+        """
+        redis_client.incr(cls._get_version_key(tenant_id))
+
+    @staticmethod
+    def _get_version_key(tenant_id: str) -> str:
+        return f"provider_configurations:version:tenant_id:{tenant_id}"
@@ -8,6 +8,7 @@ import time
 import httpx
 
 from configs import dify_config
+from core.helper.http_client_pool import get_limits, get_pooled_client, http2_enabled, no_cookie_jar
 
 SSRF_DEFAULT_MAX_RETRIES = dify_config.SSRF_DEFAULT_MAX_RETRIES
 
@@ -34,6 +35,33 @@ class MaxRetriesExceededError(ValueError):
     pass
 
 
+def _create_client(**kwargs) -> httpx.Client:
+    if dify_config.SSRF_PROXY_ALL_URL:
+        kwargs["proxy"] = dify_config.SSRF_PROXY_ALL_URL
+    elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
+        kwargs["mounts"] = {
+            "http://": httpx.HTTPTransport(
+                proxy=dify_config.SSRF_PROXY_HTTP_URL,
+                verify=HTTP_REQUEST_NODE_SSL_VERIFY,
+                limits=get_limits(),
+                http2=http2_enabled(),
+            ),
+            "https://": httpx.HTTPTransport(
+                proxy=dify_config.SSRF_PROXY_HTTPS_URL,
+                verify=HTTP_REQUEST_NODE_SSL_VERIFY,
+                limits=get_limits(),
+                http2=http2_enabled(),
+            ),
+        }
+    return httpx.Client(
+        verify=HTTP_REQUEST_NODE_SSL_VERIFY,
+        limits=get_limits(),
+        http2=http2_enabled(),
+        cookies=no_cookie_jar(),
+        **kwargs,
+    )
+
+
 def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
@@ -51,19 +79,8 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     retries = 0
     while retries <= max_retries:
         try:
-            if dify_config.SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL, verify=HTTP_REQUEST_NODE_SSL_VERIFY) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            elif dify_config.SSRF_PROXY_HTTP_URL and dify_config.SSRF_PROXY_HTTPS_URL:
-                proxy_mounts = {
-                    "http://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTP_URL),
-                    "https://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTPS_URL),
-                }
-                with httpx.Client(mounts=proxy_mounts, verify=HTTP_REQUEST_NODE_SSL_VERIFY) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            else:
-                with httpx.Client(verify=HTTP_REQUEST_NODE_SSL_VERIFY) as client:
-                    response = client.request(method=method, url=url, **kwargs)
+            client = get_pooled_client("ssrf_proxy", _create_client)
+            response = client.request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+from flask import Flask
+
+from configs import dify_config
+
+_DONE = object()
+
+_provider_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_provider_semaphores_lock = threading.Lock()
+
+
+def get_provider_limiter(provider: str) -> AbstractContextManager:
+    """
+    Get the process-wide limiter of concurrent embedding batches for a model provider.
+    """
+    limit = dify_config.INDEXING_EMBEDDING_PROVIDER_CONCURRENCY_DICT.get(
+        provider, dify_config.INDEXING_EMBEDDING_PROVIDER_CONCURRENCY
+    )
+    if limit <= 0:
+        return nullcontext()
+    with _provider_semaphores_lock:
+        semaphore = _provider_semaphores.get(provider)
+        if semaphore is None:
+            semaphore = _provider_semaphores[provider] = threading.BoundedSemaphore(limit)
+    return semaphore
+
+
+class PipelineStage:
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = workers
+
+
+class StagedPipeline:
+    """
+    Run items through stages connected by bounded queues, each stage with its own worker threads.
+
+    A full queue blocks the stage in front of it, so the slowest stage throttles the ones feeding it instead of
+    letting work pile up in memory. A stage drops an item by returning None. The first error stops every stage
+    and is raised from `run`.
+    """
+
+    def __init__(self, flask_app: Flask, stages: list[PipelineStage], queue_size: int):
+        self._flask_app = flask_app
+        self._stages = stages
+        self._queue_size = queue_size
+
+    def run(self, items: Iterable[Any]) -> dict[str, float]:
+        """
+        Run the items through all stages and return the busy time of each stage in seconds, summed over its workers.
+        """
+        queues: list[queue.Queue] = [queue.Queue(maxsize=self._queue_size) for _ in self._stages]
+        stop = threading.Event()
+        lock = threading.Lock()
+        errors: list[Exception] = []
+        latencies = {stage.name: 0.0 for stage in self._stages}
+        running = [stage.workers for stage in self._stages]
+
+        def put(index: int, item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    queues[index].put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def work(index: int) -> None:
+            stage = self._stages[index]
+            try:
+                with self._flask_app.app_context():
+                    while not stop.is_set():
+                        try:
+                            item = queues[index].get(timeout=0.1)
+                        except queue.Empty:
+                            continue
+                        if item is _DONE:
+                            break
+                        started_at = time.perf_counter()
+                        result = stage.func(item)
+                        with lock:
+                            latencies[stage.name] += time.perf_counter() - started_at
+                        if result is not None and index + 1 < len(self._stages):
+                            put(index + 1, result)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                stop.set()
+            finally:
+                with lock:
+                    running[index] -= 1
+                    last = running[index] == 0
+                # the last worker of a stage tells every worker of the next stage that no more items will come
+                if last and index + 1 < len(self._stages):
+                    for _ in range(self._stages[index + 1].workers):
+                        put(index + 1, _DONE)
+
+        threads = [
+            threading.Thread(target=work, args=(index,), daemon=True)
+            for index, stage in enumerate(self._stages)
+            for _ in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                put(0, item)
+            for _ in range(self._stages[0].workers):
+                put(0, _DONE)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+        return latencies
@@ -1,4 +1,3 @@
-import concurrent.futures
 import datetime
 import json
 import logging
@@ -6,20 +5,25 @@ import re
 import threading
 import time
 import uuid
+from itertools import islice
 from typing import Any, Optional, cast
 
-from flask import current_app
+from flask import Flask, current_app
 from flask_login import current_user  # type: ignore
 from sqlalchemy.orm.exc import ObjectDeletedError
 
 from configs import dify_config
 from core.entities.knowledge_entities import IndexingEstimate, PreviewDetail, QAPreviewDetail
 from core.errors.error import ProviderTokenNotInitError
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
+from core.indexing_pipeline import PipelineStage, StagedPipeline, get_provider_limiter
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.rag.cleaner.clean_processor import CleanProcessor
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.docstore.dataset_docstore import DatasetDocumentStore
+from core.rag.embedding.cached_embedding import CacheEmbedding
 from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.index_processor.constant.index_type import IndexType
 from core.rag.index_processor.index_processor_base import BaseIndexProcessor
@@ -66,12 +70,9 @@ class IndexingRunner:
                     raise ValueError("no process rule found")
                 index_type = dataset_document.doc_form
                 index_processor = IndexProcessorFactory(index_type).init_index_processor()
-                # extract
-                text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
-
-                # transform
-                documents = self._transform(
-                    index_processor, dataset, text_docs, dataset_document.doc_language, processing_rule.to_dict()
+                # extract and transform
+                documents = self._extract_and_transform(
+                    index_processor, dataset, dataset_document, processing_rule.to_dict()
                 )
                 # save segment
                 self._load_segments(dataset, dataset_document, documents)
@@ -130,12 +131,9 @@ class IndexingRunner:
 
             index_type = dataset_document.doc_form
             index_processor = IndexProcessorFactory(index_type).init_index_processor()
-            # extract
-            text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
-
-            # transform
-            documents = self._transform(
-                index_processor, dataset, text_docs, dataset_document.doc_language, processing_rule.to_dict()
+            # extract and transform
+            documents = self._extract_and_transform(
+                index_processor, dataset, dataset_document, processing_rule.to_dict()
             )
             # save segment
             self._load_segments(dataset, dataset_document, documents)
@@ -408,6 +406,65 @@ class IndexingRunner:
 
         return text_docs
 
+    def _extract_and_transform(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        process_rule: dict,
+    ) -> list[Document]:
+        """
+        Extract and transform the document.
+        Uploaded files are streamed through cleaning and splitting in batches of pages, so only the split documents
+        are kept instead of the whole extracted text as well. Parent-child documents are transformed as a whole.
+        """
+        if (
+            not dify_config.INDEXING_STREAMING_EXTRACT_ENABLED
+            or dataset_document.data_source_type != "upload_file"
+            or dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX
+        ):
+            text_docs = self._extract(index_processor, dataset_document, process_rule)
+            return self._transform(index_processor, dataset, text_docs, dataset_document.doc_language, process_rule)
+
+        data_source_info = dataset_document.data_source_info_dict
+        if not data_source_info or "upload_file_id" not in data_source_info:
+            raise ValueError("no upload file found")
+
+        file_detail = (
+            db.session.query(UploadFile).filter(UploadFile.id == data_source_info["upload_file_id"]).one_or_none()
+        )
+
+        documents: list[Document] = []
+        word_count = 0
+        if file_detail:
+            extract_setting = ExtractSetting(
+                datasource_type="upload_file", upload_file=file_detail, document_model=dataset_document.doc_form
+            )
+            text_docs_iter = index_processor.extract_iter(extract_setting, process_rule_mode=process_rule["mode"])
+            while text_docs := list(islice(text_docs_iter, dify_config.INDEXING_EXTRACT_BATCH_SIZE)):
+                self._check_document_paused_status(dataset_document.id)
+                word_count += sum(len(text_doc.page_content) for text_doc in text_docs)
+                # replace doc id to document model id
+                for text_doc in text_docs:
+                    if text_doc.metadata is not None:
+                        text_doc.metadata["document_id"] = dataset_document.id
+                        text_doc.metadata["dataset_id"] = dataset_document.dataset_id
+                documents.extend(
+                    self._transform(index_processor, dataset, text_docs, dataset_document.doc_language, process_rule)
+                )
+
+        # update document status to splitting
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="splitting",
+            extra_update_params={
+                DatasetDocument.word_count: word_count,
+                DatasetDocument.parsing_completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+            },
+        )
+
+        return documents
+
     @staticmethod
     def filter_string(text):
         text = re.sub(r"<\|", "<", text)
@@ -538,36 +595,16 @@ class IndexingRunner:
             )
             create_keyword_thread.start()
 
-        max_workers = 10
-        if dataset.indexing_technique == "high_quality":
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = []
-
-                # Distribute documents into multiple groups based on the hash values of page_content
-                # This is done to prevent multiple threads from processing the same document,
-                # Thereby avoiding potential database insertion deadlocks
-                document_groups: list[list[Document]] = [[] for _ in range(max_workers)]
-                for document in documents:
-                    hash = helper.generate_text_hash(document.page_content)
-                    group_index = int(hash, 16) % max_workers
-                    document_groups[group_index].append(document)
-                for chunk_documents in document_groups:
-                    if len(chunk_documents) == 0:
-                        continue
-                    futures.append(
-                        executor.submit(
-                            self._process_chunk,
-                            current_app._get_current_object(),  # type: ignore
-                            index_processor,
-                            chunk_documents,
-                            dataset,
-                            dataset_document,
-                            embedding_model_instance,
-                        )
-                    )
-
-                for future in futures:
-                    tokens += future.result()
+        stage_latencies: dict[str, float] = {}
+        if embedding_model_instance:
+            tokens, stage_latencies = self._load_vector_index(
+                current_app._get_current_object(),  # type: ignore
+                index_processor,
+                dataset,
+                dataset_document,
+                documents,
+                embedding_model_instance,
+            )
         if dataset_document.doc_form != IndexType.PARENT_CHILD_INDEX:
             create_keyword_thread.join()
         indexing_end_at = time.perf_counter()
@@ -580,9 +617,11 @@ class IndexingRunner:
                 DatasetDocument.tokens: tokens,
                 DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
                 DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.indexing_stage_latencies: stage_latencies or None,
                 DatasetDocument.error: None,
             },
         )
+        DatasetAvailabilityCache(dataset.id).delete()
 
     @staticmethod
     def _process_keyword_index(flask_app, dataset_id, document_id, documents):
@@ -609,21 +648,64 @@ class IndexingRunner:
 
                 db.session.commit()
 
-    def _process_chunk(
-        self, flask_app, index_processor, chunk_documents, dataset, dataset_document, embedding_model_instance
-    ):
-        with flask_app.app_context():
+    def _load_vector_index(
+        self,
+        flask_app: Flask,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        documents: list[Document],
+        embedding_model_instance: ModelInstance,
+    ) -> tuple[int, dict[str, float]]:
+        """
+        Embed and upsert the documents into the vector index in batches through a staged pipeline, and mark their
+        segments completed. Return the tokens of the documents and the busy time of each stage.
+        """
+        embeddings = CacheEmbedding(embedding_model_instance)
+        vector = Vector(dataset)
+        provider_limiter = get_provider_limiter(embedding_model_instance.provider)
+        tokens = 0
+
+        def dedupe(chunk_documents: list[Document]):
             # check document is paused
             self._check_document_paused_status(dataset_document.id)
-
-            tokens = 0
-            if embedding_model_instance:
-                page_content_list = [document.page_content for document in chunk_documents]
-                tokens += sum(embedding_model_instance.get_text_embedding_num_tokens(page_content_list))
-
-            # load index
-            index_processor.load(dataset, chunk_documents, with_keywords=False)
-
+            vector_documents = index_processor.get_vector_documents(chunk_documents)
+            text_embeddings = embeddings.get_cached_document_embeddings(
+                [document.page_content for document in vector_documents]
+            )
+            return chunk_documents, vector_documents, text_embeddings
+
+        def embed(batch):
+            chunk_documents, vector_documents, text_embeddings = batch
+            page_content_list = [document.page_content for document in chunk_documents]
+            chunk_tokens = sum(embedding_model_instance.get_text_embedding_num_tokens(page_content_list))
+
+            # embed every missing text once, even when it is repeated in the batch
+            missing_texts = list(
+                dict.fromkeys(
+                    document.page_content
+                    for document, embedding in zip(vector_documents, text_embeddings)
+                    if embedding is None
+                )
+            )
+            if missing_texts:
+                with provider_limiter:
+                    new_embeddings = dict(zip(missing_texts, embeddings.embed_new_documents(missing_texts)))
+                text_embeddings = [
+                    embedding if embedding is not None else new_embeddings.get(document.page_content)
+                    for document, embedding in zip(vector_documents, text_embeddings)
+                ]
+            return chunk_documents, vector_documents, text_embeddings, chunk_tokens
+
+        def upsert(batch):
+            chunk_documents, vector_documents, text_embeddings, chunk_tokens = batch
+            vector.create_with_embeddings(vector_documents, text_embeddings)
+            return chunk_documents, chunk_tokens
+
+        def update_segments(batch):
+            nonlocal tokens
+            chunk_documents, chunk_tokens = batch
+            tokens += chunk_tokens
             document_ids = [document.metadata["doc_id"] for document in chunk_documents]
             db.session.query(DocumentSegment).filter(
                 DocumentSegment.document_id == dataset_document.id,
@@ -640,7 +722,22 @@ class IndexingRunner:
 
             db.session.commit()
 
-            return tokens
+        pipeline = StagedPipeline(
+            flask_app,
+            [
+                PipelineStage("dedupe", dedupe, dify_config.INDEXING_DEDUPE_WORKERS),
+                PipelineStage("embedding", embed, dify_config.INDEXING_EMBEDDING_WORKERS),
+                PipelineStage("vector", upsert, dify_config.INDEXING_VECTOR_WORKERS),
+                # a single worker, so the token count needs no lock
+                PipelineStage("segment_status", update_segments),
+            ],
+            queue_size=dify_config.INDEXING_LOAD_QUEUE_SIZE,
+        )
+        document_iter = iter(documents)
+        stage_latencies = pipeline.run(
+            iter(lambda: list(islice(document_iter, dify_config.INDEXING_LOAD_BATCH_SIZE)), [])
+        )
+        return tokens, stage_latencies
 
     @staticmethod
     def _check_document_paused_status(document_id: str):
@@ -1,8 +1,9 @@
+from collections import defaultdict
 from collections.abc import Sequence
 from typing import Optional
 
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
-from core.file import file_manager
+from core.file import FileUploadConfig, file_manager
 from core.model_manager import ModelInstance
 from core.model_runtime.entities import (
     AssistantPromptMessage,
@@ -17,7 +18,7 @@ from core.prompt.utils.extract_thread_messages import extract_thread_messages
 from extensions.ext_database import db
 from factories import file_factory
 from models.model import AppMode, Conversation, Message, MessageFile
-from models.workflow import WorkflowRun
+from models.workflow import Workflow, WorkflowRun
 
 
 class TokenBufferMemory:
@@ -68,23 +69,25 @@ class TokenBufferMemory:
 
         messages = list(reversed(thread_messages))
 
+        # load the files of all messages at once
+        message_files: dict[str, list[MessageFile]] = defaultdict(list)
+        if messages:
+            for message_file in (
+                db.session.query(MessageFile)
+                .filter(MessageFile.message_id.in_([message.id for message in messages]))
+                .all()
+            ):
+                message_files[str(message_file.message_id)].append(message_file)
+
+        file_extra_configs = self._get_file_extra_configs(
+            [message.workflow_run_id for message in messages if message.id in message_files]
+        )
+
         prompt_messages: list[PromptMessage] = []
         for message in messages:
-            files = db.session.query(MessageFile).filter(MessageFile.message_id == message.id).all()
+            files = message_files.get(message.id)
             if files:
-                file_extra_config = None
-                if self.conversation.mode not in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
-                    file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
-                else:
-                    if message.workflow_run_id:
-                        workflow_run = (
-                            db.session.query(WorkflowRun).filter(WorkflowRun.id == message.workflow_run_id).first()
-                        )
-
-                        if workflow_run and workflow_run.workflow:
-                            file_extra_config = FileUploadConfigManager.convert(
-                                workflow_run.workflow.features_dict, is_vision=False
-                            )
+                file_extra_config = file_extra_configs.get(message.workflow_run_id)
 
                 detail = ImagePromptMessageContent.DETAIL.LOW
                 if file_extra_config and app_record:
@@ -122,13 +125,58 @@ class TokenBufferMemory:
         curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
 
         if curr_message_tokens > max_token_limit:
-            pruned_memory = []
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
-                pruned_memory.append(prompt_messages.pop(0))
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+            prompt_messages = prompt_messages[self._get_prune_index(prompt_messages, max_token_limit) :]
 
         return prompt_messages
 
+    def _get_file_extra_configs(
+        self, workflow_run_ids: Sequence[Optional[str]]
+    ) -> dict[Optional[str], FileUploadConfig | None]:
+        """
+        Get the file upload config of messages with files, keyed by the workflow run id of the message.
+        """
+        if not workflow_run_ids:
+            return {}
+
+        if self.conversation.mode not in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
+            file_extra_config = FileUploadConfigManager.convert(self.conversation.model_config)
+            return dict.fromkeys(workflow_run_ids, file_extra_config)
+
+        run_ids = {workflow_run_id for workflow_run_id in workflow_run_ids if workflow_run_id}
+        if not run_ids:
+            return {}
+
+        run_workflow_ids = dict(
+            db.session.query(WorkflowRun.id, WorkflowRun.workflow_id).filter(WorkflowRun.id.in_(run_ids)).all()
+        )
+        workflows = (
+            db.session.query(Workflow).filter(Workflow.id.in_(set(run_workflow_ids.values()))).all()
+            if run_workflow_ids
+            else []
+        )
+        workflow_configs: dict[str, FileUploadConfig | None] = {
+            str(workflow.id): FileUploadConfigManager.convert(workflow.features_dict, is_vision=False)
+            for workflow in workflows
+        }
+        return {run_id: workflow_configs.get(workflow_id) for run_id, workflow_id in run_workflow_ids.items()}
+
+    def _get_prune_index(self, prompt_messages: Sequence[PromptMessage], max_token_limit: int) -> int:
+        """
+        Get the index of the oldest prompt message to keep, at least the last message is kept.
+
+        The token count of a suffix shrinks as it starts later, so the first suffix within the limit is found by
+        binary search, counting tokens O(log n) times instead of once per pruned message.
+        """
+        low, high = 1, len(prompt_messages) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.model_instance.get_llm_num_tokens(list(prompt_messages[middle:])) > max_token_limit:
+                low = middle + 1
+            else:
+                high = middle
+
+        return high
+
     def get_history_prompt_text(
         self,
         human_prefix: str = "Human",
@@ -6,6 +6,7 @@ from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 import contexts
+from core.helper.plugin_model_cache import PluginModelCache
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.defaults import PARAMETER_RULE_TEMPLATE
 from core.model_runtime.entities.model_entities import (
@@ -157,15 +158,24 @@ class AIModel(BaseModel):
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
-            schema = plugin_model_manager.get_model_schema(
-                tenant_id=self.tenant_id,
-                user_id="unknown",
-                plugin_id=self.plugin_id,
-                provider=self.provider_name,
-                model_type=self.model_type.value,
-                model=model,
-                credentials=credentials or {},
+            plugin_model_cache = PluginModelCache(self.tenant_id)
+            schema = plugin_model_cache.get_model_schema(
+                self.plugin_id, self.provider_name, self.model_type.value, model, credentials
             )
+            if not schema:
+                schema = plugin_model_manager.get_model_schema(
+                    tenant_id=self.tenant_id,
+                    user_id="unknown",
+                    plugin_id=self.plugin_id,
+                    provider=self.provider_name,
+                    model_type=self.model_type.value,
+                    model=model,
+                    credentials=credentials or {},
+                )
+                if schema:
+                    plugin_model_cache.set_model_schema(
+                        self.plugin_id, self.provider_name, self.model_type.value, model, credentials, schema
+                    )
 
             if schema:
                 contexts.plugin_model_schemas.get()[cache_key] = schema
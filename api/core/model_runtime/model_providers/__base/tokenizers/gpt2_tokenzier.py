@@ -1,4 +1,5 @@
 import logging
+from bisect import bisect_right
 from threading import Lock
 from typing import Any
 
@@ -27,6 +28,37 @@ class GPT2Tokenizer:
         # return cast(int, result)
         return GPT2Tokenizer._get_num_tokens_by_gpt2(text)
 
+    @staticmethod
+    def get_token_offsets(text: str) -> list[int]:
+        """
+        use gpt2 tokenizer to tokenize text once and get the character offset where each token starts
+        """
+        _tokenizer = GPT2Tokenizer.get_encoder()
+        if hasattr(_tokenizer, "decode_single_token_bytes"):
+            token_byte_lengths = [
+                len(_tokenizer.decode_single_token_bytes(token)) for token in _tokenizer.encode_ordinary(text)
+            ]
+        else:
+            token_byte_lengths = [
+                len(bytearray(_tokenizer.byte_decoder[c] for c in token)) for token in _tokenizer.tokenize(text)
+            ]
+
+        token_byte_offsets = []
+        byte_offset = 0
+        for token_byte_length in token_byte_lengths:
+            token_byte_offsets.append(byte_offset)
+            byte_offset += token_byte_length
+        if text.isascii():
+            return token_byte_offsets
+
+        # map byte offsets to the characters they fall in, tokens may start in the middle of a multibyte character
+        char_byte_offsets = []
+        byte_offset = 0
+        for char in text:
+            char_byte_offsets.append(byte_offset)
+            byte_offset += len(char.encode("utf-8"))
+        return [bisect_right(char_byte_offsets, offset) - 1 for offset in token_byte_offsets]
+
     @staticmethod
     def get_encoder() -> Any:
         global _tokenizer, _lock
@@ -1,8 +1,12 @@
+import logging
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 from core.ops.entities.config_entity import BaseTracingConfig
 from core.ops.entities.trace_entity import BaseTraceInfo
 
+logger = logging.getLogger(__name__)
+
 
 class BaseTraceInstance(ABC):
     """
@@ -24,3 +28,17 @@ class BaseTraceInstance(ABC):
         Subclasses must implement specific tracing logic for activities.
         """
         ...
+
+    def trace_batch(self, trace_infos: Sequence[BaseTraceInfo]) -> int:
+        """
+        Trace a batch of activities and return how many of them failed.
+        Subclasses may override it to deliver the batch in fewer requests.
+        """
+        failed = 0
+        for trace_info in trace_infos:
+            try:
+                self.trace(trace_info)
+            except Exception:
+                logger.exception("Failed to trace %s", type(trace_info).__name__)
+                failed += 1
+        return failed
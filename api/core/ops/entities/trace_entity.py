@@ -112,6 +112,10 @@ class TaskData(BaseModel):
     trace_info: Any
 
 
+class TaskDataBatch(BaseModel):
+    tasks: list[TaskData]
+
+
 trace_info_info_map = {
     "WorkflowTraceInfo": WorkflowTraceInfo,
     "MessageTraceInfo": MessageTraceInfo,
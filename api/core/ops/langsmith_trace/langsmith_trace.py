@@ -1,7 +1,9 @@
 import json
 import logging
 import os
+import threading
 import uuid
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from typing import Optional, cast
 
@@ -45,6 +47,8 @@ class LangSmithDataTrace(BaseTraceInstance):
         self.project_id = None
         self.langsmith_client = Client(api_key=langsmith_config.api_key, api_url=langsmith_config.endpoint)
         self.file_base_url = os.getenv("FILES_URL", "http://127.0.0.1:5001")
+        # runs collected by `trace_batch` of the current thread, the instance is shared between tasks
+        self._batch = threading.local()
 
     def trace(self, trace_info: BaseTraceInfo):
         if isinstance(trace_info, WorkflowTraceInfo):
@@ -62,6 +66,37 @@ class LangSmithDataTrace(BaseTraceInstance):
         if isinstance(trace_info, GenerateNameTraceInfo):
             self.generate_name_trace(trace_info)
 
+    def trace_batch(self, trace_infos: Sequence[BaseTraceInfo]) -> int:
+        """
+        Trace a batch of activities, runs that can be ingested in batches are sent with one request at the end.
+        """
+        self._batch.runs = []
+        failed = 0
+        batched_traces = 0
+        try:
+            for trace_info in trace_infos:
+                run_count = len(self._batch.runs)
+                try:
+                    self.trace(trace_info)
+                except Exception:
+                    logger.exception("LangSmith failed to trace %s", type(trace_info).__name__)
+                    failed += 1
+                else:
+                    if len(self._batch.runs) > run_count:
+                        batched_traces += 1
+            runs = self._batch.runs
+        finally:
+            self._batch.runs = None
+
+        if runs:
+            try:
+                self.langsmith_client.batch_ingest_runs(create=runs)
+                logger.debug("LangSmith %s runs created successfully.", len(runs))
+            except Exception:
+                logger.exception("LangSmith failed to create %s runs", len(runs))
+                failed += batched_traces
+        return failed
+
     def workflow_trace(self, trace_info: WorkflowTraceInfo):
         trace_id = trace_info.message_id or trace_info.workflow_run_id
         if trace_info.start_time is None:
@@ -479,6 +514,11 @@ class LangSmithDataTrace(BaseTraceInstance):
             data["session_name"] = self.project_name
 
         data = filter_none_values(data)
+        # batch ingestion only accepts runs placed in a trace
+        batch_runs = getattr(self._batch, "runs", None)
+        if batch_runs is not None and data.get("trace_id") and data.get("dotted_order"):
+            batch_runs.append(data)
+            return
         try:
             self.langsmith_client.create_run(**data)
             logger.debug("LangSmith Run created successfully.")
@@ -1,3 +1,4 @@
+import gzip
 import json
 import logging
 import os
@@ -8,11 +9,12 @@ from datetime import timedelta
 from typing import Any, Optional, Union
 from uuid import UUID, uuid4
 
-from cachetools import LRUCache
+from cachetools import LRUCache, TTLCache
 from flask import current_app
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from configs import dify_config
 from core.helper.encrypter import decrypt_token, encrypt_token, obfuscated_token
 from core.ops.entities.config_entity import (
     OPS_FILE_PATH,
@@ -28,6 +30,7 @@ from core.ops.entities.trace_entity import (
     ModerationTraceInfo,
     SuggestedQuestionTraceInfo,
     TaskData,
+    TaskDataBatch,
     ToolTraceInfo,
     TraceTaskName,
     WorkflowTraceInfo,
@@ -36,10 +39,11 @@ from core.ops.langfuse_trace.langfuse_trace import LangFuseDataTrace
 from core.ops.langsmith_trace.langsmith_trace import LangSmithDataTrace
 from core.ops.utils import get_message_data
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from models.model import App, AppModelConfig, Conversation, Message, MessageFile, TraceAppConfig
 from models.workflow import WorkflowAppLog, WorkflowRun
-from tasks.ops_trace_task import process_trace_tasks
+from tasks.ops_trace_task import process_trace_task_batch
 
 
 def build_opik_trace_instance(config: OpikConfig):
@@ -72,6 +76,11 @@ provider_config_map: dict[str, dict[str, Any]] = {
 
 class OpsTraceManager:
     ops_trace_instances_cache: LRUCache = LRUCache(maxsize=128)
+    # app id -> (tracing config version, trace instance or None when tracing is off), shared between requests
+    app_ops_trace_instances_cache: TTLCache = TTLCache(
+        maxsize=dify_config.OPS_TRACE_CONFIG_CACHE_SIZE, ttl=max(dify_config.OPS_TRACE_CONFIG_CACHE_TTL, 1)
+    )
+    app_ops_trace_instances_lock = threading.Lock()
 
     @classmethod
     def encrypt_tracing_config(
@@ -201,6 +210,33 @@ class OpsTraceManager:
         if app_id is None:
             return None
 
+        if dify_config.OPS_TRACE_CONFIG_CACHE_TTL <= 0:
+            return cls._get_ops_trace_instance(app_id)
+
+        version = redis_client.get(cls._get_app_tracing_version_key(app_id))
+        with cls.app_ops_trace_instances_lock:
+            cached = cls.app_ops_trace_instances_cache.get(app_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        tracing_instance = cls._get_ops_trace_instance(app_id)
+        with cls.app_ops_trace_instances_lock:
+            cls.app_ops_trace_instances_cache[app_id] = (version, tracing_instance)
+        return tracing_instance
+
+    @classmethod
+    def invalidate_app_tracing_config(cls, app_id: str):
+        """
+        Drop the cached trace instance of the app in every process, call it after any tracing config write.
+        """
+        redis_client.incr(cls._get_app_tracing_version_key(app_id))
+
+    @staticmethod
+    def _get_app_tracing_version_key(app_id: str) -> str:
+        return f"ops_trace:version:app_id:{app_id}"
+
+    @classmethod
+    def _get_ops_trace_instance(cls, app_id: str):
         app: Optional[App] = db.session.query(App).filter(App.id == app_id).first()
 
         if app is None:
@@ -279,6 +315,7 @@ class OpsTraceManager:
             }
         )
         db.session.commit()
+        cls.invalidate_app_tracing_config(app_id)
 
     @classmethod
     def get_app_tracing_config(cls, app_id: str):
@@ -807,20 +844,27 @@ class TraceQueueManager:
 
     def send_to_celery(self, tasks: list[TraceTask]):
         with self.flask_app.app_context():
+            task_data_list: list[TaskData] = []
             for task in tasks:
                 if task.app_id is None:
                     continue
-                file_id = uuid4().hex
                 trace_info = task.execute()
-                task_data = TaskData(
-                    app_id=task.app_id,
-                    trace_info_type=type(trace_info).__name__,
-                    trace_info=trace_info.model_dump() if trace_info else None,
+                if trace_info is None:
+                    continue
+                task_data_list.append(
+                    TaskData(
+                        app_id=task.app_id,
+                        trace_info_type=type(trace_info).__name__,
+                        trace_info=trace_info.model_dump(),
+                    )
                 )
-                file_path = f"{OPS_FILE_PATH}{task.app_id}/{file_id}.json"
-                storage.save(file_path, task_data.model_dump_json().encode("utf-8"))
-                file_info = {
-                    "file_id": file_id,
-                    "app_id": task.app_id,
-                }
-                process_trace_tasks.delay(file_info)
+            if not task_data_list:
+                return
+
+            # ship the whole flush as one compressed storage object and one celery message
+            file_id = uuid4().hex
+            file_path = f"{OPS_FILE_PATH}batches/{file_id}.json.gz"
+            storage.save(
+                file_path, gzip.compress(TaskDataBatch(tasks=task_data_list).model_dump_json().encode("utf-8"))
+            )
+            process_trace_task_batch.delay({"file_id": file_id})
@@ -2,10 +2,11 @@ import inspect
 import json
 import logging
 from collections.abc import Callable, Generator
-from typing import TypeVar
+from functools import cache
+from typing import Any, TypeVar
 
 import requests
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from yarl import URL
 
 from configs import dify_config
@@ -28,6 +29,7 @@ from core.plugin.manager.exc import (
     PluginPermissionDeniedError,
     PluginUniqueIdentifierError,
 )
+from core.plugin.manager.transport import get_session, get_timeout
 
 plugin_daemon_inner_api_baseurl = dify_config.PLUGIN_DAEMON_URL
 plugin_daemon_inner_api_key = dify_config.PLUGIN_DAEMON_KEY
@@ -37,6 +39,11 @@ T = TypeVar("T", bound=(BaseModel | dict | list | bool | str))
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _get_type_adapter(type: Any) -> TypeAdapter:
+    return TypeAdapter(type)
+
+
 class BasePluginManager:
     def _request(
         self,
@@ -60,10 +67,17 @@ class BasePluginManager:
             data = json.dumps(data)
 
         try:
-            response = requests.request(
-                method=method, url=str(url), headers=headers, data=data, params=params, stream=stream, files=files
+            response = get_session().request(
+                method=method,
+                url=str(url),
+                headers=headers,
+                data=data,
+                params=params,
+                stream=stream,
+                files=files,
+                timeout=get_timeout(),
             )
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             logger.exception("Request to Plugin Daemon Service failed")
             raise PluginDaemonInnerError(code=-500, message="Request to Plugin Daemon Service failed")
 
@@ -77,17 +91,17 @@ class BasePluginManager:
         headers: dict | None = None,
         data: bytes | dict | None = None,
         files: dict | None = None,
-    ) -> Generator[bytes, None, None]:
+    ) -> Generator[str, None, None]:
         """
         Make a stream request to the plugin daemon inner API
         """
         response = self._request(method, path, headers, data, params, files, stream=True)
-        for line in response.iter_lines():
-            line = line.decode("utf-8").strip()
-            if line.startswith("data:"):
-                line = line[5:].strip()
+        for raw_line in response.iter_lines():
+            if raw_line.startswith(b"data:"):
+                raw_line = raw_line[5:]
+            line = raw_line.strip()
             if line:
-                yield line
+                yield line.decode("utf-8")
 
     def _stream_request_with_model(
         self,
@@ -167,31 +181,39 @@ class BasePluginManager:
         """
         Make a stream request to the plugin daemon inner API and yield the response as a model.
         """
+        # only the data of each line is validated, the envelope is checked by hand to keep per-chunk overhead low
+        type_adapter = _get_type_adapter(type)  # type: ignore[arg-type]
         for line in self._stream_request(method, path, params, headers, data, files):
             line_data = None
             try:
                 line_data = json.loads(line)
-                rep = PluginDaemonBasicResponse[type](**line_data)  # type: ignore
+                code = line_data["code"]
+                message = line_data["message"]
+                if not isinstance(code, int) or not isinstance(message, str):
+                    raise ValueError("invalid plugin daemon response")
+                rep_data = line_data.get("data")
+                if code == 0 and rep_data is not None:
+                    rep_data = type_adapter.validate_python(rep_data)
             except Exception:
                 # TODO modify this when line_data has code and message
-                if line_data and "error" in line_data:
+                if isinstance(line_data, dict) and "error" in line_data:
                     raise ValueError(line_data["error"])
                 else:
                     raise ValueError(line)
 
-            if rep.code != 0:
-                if rep.code == -500:
+            if code != 0:
+                if code == -500:
                     try:
-                        error = PluginDaemonError(**json.loads(rep.message))
+                        error = PluginDaemonError(**json.loads(message))
                     except Exception:
-                        raise PluginDaemonInnerError(code=rep.code, message=rep.message)
+                        raise PluginDaemonInnerError(code=code, message=message)
 
                     self._handle_plugin_daemon_error(error.error_type, error.message)
-                raise ValueError(f"plugin daemon: {rep.message}, code: {rep.code}")
-            if rep.data is None:
+                raise ValueError(f"plugin daemon: {message}, code: {code}")
+            if rep_data is None:
                 frame = inspect.currentframe()
                 raise ValueError(f"got empty data from plugin daemon: {frame.f_lineno if frame else 'unknown'}")
-            yield rep.data
+            yield rep_data
 
     def _handle_plugin_daemon_error(self, error_type: str, message: str):
         """
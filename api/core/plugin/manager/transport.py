@@ -0,0 +1,114 @@
+import os
+import socket
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+from configs import dify_config
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class UnixSocketHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__("localhost", **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, int | float):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class UnixSocketHTTPConnectionPool(HTTPConnectionPool):
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__("localhost", **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> HTTPConnection:
+        self.num_connections += 1
+        return UnixSocketHTTPConnection(self.socket_path, timeout=self.timeout.connect_timeout)
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """
+    Sends every request mounted on this adapter over a single Unix socket connection pool.
+    """
+
+    def __init__(self, socket_path: str, pool_maxsize: int, **kwargs):
+        self._unix_pool = UnixSocketHTTPConnectionPool(socket_path, maxsize=pool_maxsize, block=False)
+        super().__init__(pool_maxsize=pool_maxsize, **kwargs)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._unix_pool
+
+    def get_connection(self, url, proxies=None):
+        return self._unix_pool
+
+    def close(self):
+        self._unix_pool.close()
+        super().close()
+
+
+def create_session() -> requests.Session:
+    """
+    Create a session with a bounded keep-alive pool for the plugin daemon.
+    Only connection errors are retried, a request that reached the daemon is never sent twice.
+    """
+    retries = Retry(
+        total=dify_config.PLUGIN_DAEMON_CONNECT_RETRIES,
+        connect=dify_config.PLUGIN_DAEMON_CONNECT_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=0.1,
+        raise_on_status=False,
+    )
+    adapter: HTTPAdapter
+    if dify_config.PLUGIN_DAEMON_UNIX_SOCKET_PATH:
+        adapter = UnixSocketAdapter(
+            dify_config.PLUGIN_DAEMON_UNIX_SOCKET_PATH,
+            pool_maxsize=dify_config.PLUGIN_DAEMON_POOL_MAXSIZE,
+            max_retries=retries,
+        )
+    else:
+        adapter = HTTPAdapter(pool_maxsize=dify_config.PLUGIN_DAEMON_POOL_MAXSIZE, max_retries=retries)
+
+    session = requests.Session()
+    session.mount(str(dify_config.PLUGIN_DAEMON_URL).rstrip("/") + "/", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide plugin daemon session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get_timeout() -> tuple[float, Optional[float]]:
+    return dify_config.PLUGIN_DAEMON_CONNECT_TIMEOUT, dify_config.PLUGIN_DAEMON_READ_TIMEOUT
+
+
+def _reset_after_fork() -> None:
+    # keep-alive connections must not be shared with the parent process
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -22,6 +22,7 @@ from core.entities.provider_entities import (
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
 from core.helper.position_helper import is_filtered
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
     ConfigurateMethod,
@@ -92,6 +93,20 @@ class ProviderManager:
         :param tenant_id:
         :return:
         """
+        provider_configurations_cache = ProviderConfigurationsCache(tenant_id)
+        if not provider_configurations_cache.enabled:
+            return self._get_configurations(tenant_id)
+
+        # read the version before loading, so a write made while loading is not hidden behind the snapshot
+        version = provider_configurations_cache.get_version()
+        provider_configurations = provider_configurations_cache.get(version)
+        if provider_configurations is None:
+            provider_configurations = self._get_configurations(tenant_id)
+            provider_configurations_cache.set(version, provider_configurations)
+
+        return provider_configurations
+
+    def _get_configurations(self, tenant_id: str) -> ProviderConfigurations:
         # Get all provider records of the workspace
         provider_name_to_provider_records_dict = self._get_all_providers(tenant_id)
 
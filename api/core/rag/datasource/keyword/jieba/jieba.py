@@ -1,8 +1,11 @@
 import json
-from collections import defaultdict
+import math
+from collections import Counter, defaultdict
 from typing import Any, Optional
 
 from pydantic import BaseModel
+from sqlalchemy import and_, case, exists, func
+from sqlalchemy.dialects.postgresql import insert
 
 from configs import dify_config
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
@@ -11,7 +14,11 @@ from core.rag.models.document import Document
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
-from models.dataset import Dataset, DatasetKeywordTable, DocumentSegment
+from models.dataset import Dataset, DatasetKeywordDocument, DatasetKeywordPosting, DatasetKeywordTable, DocumentSegment
+
+_POSTINGS_BATCH_SIZE = 1000
+_BM25_K1 = 1.2
+_BM25_B = 0.75
 
 
 class KeywordTableConfig(BaseModel):
@@ -24,58 +31,72 @@ class Jieba(BaseKeyword):
         self._config = KeywordTableConfig()
 
     def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
-        lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
-            keyword_table = self._get_dataset_keyword_table()
-            for text in texts:
-                keywords = keyword_table_handler.extract_keywords(
-                    text.page_content, self._config.max_keywords_per_chunk
-                )
-                if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
-                    keyword_table = self._add_text_to_keyword_table(
-                        keyword_table or {}, text.metadata["doc_id"], list(keywords)
-                    )
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_by_node_id = {}
+        texts_by_node_id = {}
+        for text in texts:
+            keywords = keyword_table_handler.extract_keywords(text.page_content, self._config.max_keywords_per_chunk)
+            if text.metadata is not None:
+                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                keywords_by_node_id[text.metadata["doc_id"]] = list(keywords)
+                texts_by_node_id[text.metadata["doc_id"]] = text.page_content
 
-            self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords(keywords_by_node_id, texts_by_node_id)
 
-            return self
+        return self
 
     def add_texts(self, texts: list[Document], **kwargs):
-        lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
+        keyword_table_handler = JiebaKeywordTableHandler()
 
-            keyword_table = self._get_dataset_keyword_table()
-            keywords_list = kwargs.get("keywords_list")
-            for i in range(len(texts)):
-                text = texts[i]
-                if keywords_list:
-                    keywords = keywords_list[i]
-                    if not keywords:
-                        keywords = keyword_table_handler.extract_keywords(
-                            text.page_content, self._config.max_keywords_per_chunk
-                        )
-                else:
+        keywords_by_node_id = {}
+        texts_by_node_id = {}
+        keywords_list = kwargs.get("keywords_list")
+        for i in range(len(texts)):
+            text = texts[i]
+            if keywords_list:
+                keywords = keywords_list[i]
+                if not keywords:
                     keywords = keyword_table_handler.extract_keywords(
                         text.page_content, self._config.max_keywords_per_chunk
                     )
-                if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
-                    keyword_table = self._add_text_to_keyword_table(
-                        keyword_table or {}, text.metadata["doc_id"], list(keywords)
-                    )
+            else:
+                keywords = keyword_table_handler.extract_keywords(
+                    text.page_content, self._config.max_keywords_per_chunk
+                )
+            if text.metadata is not None:
+                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                keywords_by_node_id[text.metadata["doc_id"]] = list(keywords)
+                texts_by_node_id[text.metadata["doc_id"]] = text.page_content
 
-            self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords(keywords_by_node_id, texts_by_node_id)
 
     def text_exists(self, id: str) -> bool:
+        if self._get_data_source_type() == "postings":
+            return bool(
+                db.session.query(
+                    exists().where(
+                        DatasetKeywordPosting.dataset_id == self.dataset.id,
+                        DatasetKeywordPosting.index_node_id == id,
+                    )
+                ).scalar()
+            )
+
         keyword_table = self._get_dataset_keyword_table()
-        if keyword_table is None:
+        if not keyword_table:
             return False
         return id in set.union(*keyword_table.values())
 
     def delete_by_ids(self, ids: list[str]) -> None:
+        if self._prepare_postings():
+            db.session.query(DatasetKeywordPosting).filter(
+                DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.session.query(DatasetKeywordDocument).filter(
+                DatasetKeywordDocument.dataset_id == self.dataset.id, DatasetKeywordDocument.index_node_id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            return
+
         lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
         with redis_client.lock(lock_name, timeout=600):
             keyword_table = self._get_dataset_keyword_table()
@@ -85,21 +106,29 @@ class Jieba(BaseKeyword):
             self._save_dataset_keyword_table(keyword_table)
 
     def search(self, query: str, **kwargs: Any) -> list[Document]:
-        keyword_table = self._get_dataset_keyword_table()
-
         k = kwargs.get("top_k", 4)
         document_ids_filter = kwargs.get("document_ids_filter")
-        sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table or {}, query, k)
+        if self._get_data_source_type() == "postings":
+            keyword_table_handler = JiebaKeywordTableHandler()
+            keywords = keyword_table_handler.extract_keywords(query)
+            sorted_chunk_indices = list(self._get_bm25_scores(keywords, limit=k))
+        else:
+            keyword_table = self._get_dataset_keyword_table()
+            sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table or {}, query, k)
 
-        documents = []
-        for chunk_index in sorted_chunk_indices:
-            segment_query = db.session.query(DocumentSegment).filter(
-                DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id == chunk_index
-            )
-            if document_ids_filter:
-                segment_query = segment_query.filter(DocumentSegment.document_id.in_(document_ids_filter))
-            segment = segment_query.first()
+        documents: list[Document] = []
+        if not sorted_chunk_indices:
+            return documents
+
+        segment_query = db.session.query(DocumentSegment).filter(
+            DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id.in_(sorted_chunk_indices)
+        )
+        if document_ids_filter:
+            segment_query = segment_query.filter(DocumentSegment.document_id.in_(document_ids_filter))
+        segments = {segment.index_node_id: segment for segment in segment_query.all()}
 
+        for chunk_index in sorted_chunk_indices:
+            segment = segments.get(chunk_index)
             if segment:
                 documents.append(
                     Document(
@@ -120,12 +149,220 @@ class Jieba(BaseKeyword):
         with redis_client.lock(lock_name, timeout=600):
             dataset_keyword_table = self.dataset.dataset_keyword_table
             if dataset_keyword_table:
+                db.session.query(DatasetKeywordPosting).filter(
+                    DatasetKeywordPosting.dataset_id == self.dataset.id
+                ).delete(synchronize_session=False)
+                db.session.query(DatasetKeywordDocument).filter(
+                    DatasetKeywordDocument.dataset_id == self.dataset.id
+                ).delete(synchronize_session=False)
                 db.session.delete(dataset_keyword_table)
                 db.session.commit()
-                if dataset_keyword_table.data_source_type != "database":
+                if dataset_keyword_table.data_source_type not in {"database", "postings"}:
                     file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
                     storage.delete(file_key)
 
+    def get_keyword_scores(self, query: str, node_ids: list[str]) -> Optional[dict[str, float]]:
+        """
+        Get BM25 scores of the given index nodes for the query from the keyword postings, without re-tokenizing
+        the nodes, normalized to [0, 1] by the highest score the query can reach. Nodes matching no query keyword
+        are left out.
+        Returns None when the dataset keywords are not stored as postings.
+        """
+        if self._get_data_source_type() != "postings":
+            return None
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = keyword_table_handler.extract_keywords(query, None)
+        return self._get_bm25_scores(keywords, node_ids=node_ids, normalize=True)
+
+    def _get_data_source_type(self) -> Optional[str]:
+        dataset_keyword_table = self.dataset.dataset_keyword_table
+        return dataset_keyword_table.data_source_type if dataset_keyword_table else None
+
+    def _prepare_postings(self) -> bool:
+        """
+        Check whether writes go to the keyword postings of the dataset.
+        When KEYWORD_DATA_SOURCE_TYPE is "postings", the keyword table of the dataset is created as postings, or an
+        existing keyword table is moved into postings once, so later writes only touch the affected rows.
+        """
+        if self._get_data_source_type() == "postings":
+            return True
+        if dify_config.KEYWORD_DATA_SOURCE_TYPE != "postings":
+            return False
+
+        lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
+        with redis_client.lock(lock_name, timeout=600):
+            dataset_keyword_table = self.dataset.dataset_keyword_table
+            if not dataset_keyword_table:
+                dataset_keyword_table = DatasetKeywordTable(
+                    dataset_id=self.dataset.id,
+                    keyword_table="",
+                    data_source_type="postings",
+                )
+                db.session.add(dataset_keyword_table)
+                db.session.commit()
+                return True
+            if dataset_keyword_table.data_source_type == "postings":
+                return True
+
+            previous_data_source_type = dataset_keyword_table.data_source_type
+            keyword_table = self._get_dataset_keyword_table() or {}
+            keywords_by_node_id: dict[str, list[str]] = defaultdict(list)
+            for keyword, node_ids in keyword_table.items():
+                for node_id in node_ids:
+                    keywords_by_node_id[node_id].append(keyword)
+            self._insert_postings(keywords_by_node_id)
+
+            dataset_keyword_table.data_source_type = "postings"
+            dataset_keyword_table.keyword_table = ""
+            db.session.commit()
+            if previous_data_source_type != "database":
+                file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
+                if storage.exists(file_key):
+                    storage.delete(file_key)
+
+        return True
+
+    def _add_keywords(
+        self, keywords_by_node_id: dict[str, list[str]], texts_by_node_id: Optional[dict[str, str]] = None
+    ) -> None:
+        if self._prepare_postings():
+            self._insert_postings(keywords_by_node_id, texts_by_node_id)
+            return
+
+        lock_name = "keyword_indexing_lock_{}".format(self.dataset.id)
+        with redis_client.lock(lock_name, timeout=600):
+            keyword_table = self._get_dataset_keyword_table()
+            for node_id, keywords in keywords_by_node_id.items():
+                keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
+            self._save_dataset_keyword_table(keyword_table)
+
+    def _insert_postings(
+        self, keywords_by_node_id: dict[str, list[str]], texts_by_node_id: Optional[dict[str, str]] = None
+    ) -> None:
+        texts_by_node_id = dict(texts_by_node_id or {})
+        missing_node_ids = [node_id for node_id in keywords_by_node_id if node_id not in texts_by_node_id]
+        for i in range(0, len(missing_node_ids), _POSTINGS_BATCH_SIZE):
+            segments = (
+                db.session.query(DocumentSegment.index_node_id, DocumentSegment.content)
+                .filter(
+                    DocumentSegment.dataset_id == self.dataset.id,
+                    DocumentSegment.index_node_id.in_(missing_node_ids[i : i + _POSTINGS_BATCH_SIZE]),
+                )
+                .all()
+            )
+            texts_by_node_id.update({segment.index_node_id: segment.content for segment in segments})
+
+        # term frequencies and lengths are counted over the JIEBA words of the text, so BM25 can be scored
+        # from the postings alone
+        keyword_table_handler = JiebaKeywordTableHandler()
+        postings = []
+        documents = []
+        for node_id, keywords in keywords_by_node_id.items():
+            text = texts_by_node_id.get(node_id, "")
+            words = keyword_table_handler.tokenize(text)
+            word_counts = Counter(words)
+            for keyword in set(keywords):
+                term_frequency = word_counts.get(keyword) or text.count(keyword) or 1
+                postings.append(
+                    {
+                        "dataset_id": self.dataset.id,
+                        "keyword": keyword,
+                        "index_node_id": node_id,
+                        "term_frequency": term_frequency,
+                    }
+                )
+            documents.append(
+                {"dataset_id": self.dataset.id, "index_node_id": node_id, "length": max(len(words), len(keywords), 1)}
+            )
+
+        for i in range(0, len(postings), _POSTINGS_BATCH_SIZE):
+            statement = insert(DatasetKeywordPosting).values(postings[i : i + _POSTINGS_BATCH_SIZE])
+            db.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["dataset_id", "keyword", "index_node_id"],
+                    set_={"term_frequency": statement.excluded.term_frequency},
+                )
+            )
+        for i in range(0, len(documents), _POSTINGS_BATCH_SIZE):
+            statement = insert(DatasetKeywordDocument).values(documents[i : i + _POSTINGS_BATCH_SIZE])
+            db.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["dataset_id", "index_node_id"],
+                    set_={"length": statement.excluded.length},
+                )
+            )
+        db.session.commit()
+
+    def _get_bm25_scores(
+        self,
+        keywords: set[str],
+        node_ids: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        normalize: bool = False,
+    ) -> dict[str, float]:
+        """
+        Rank index nodes by BM25 over the postings of the keywords, highest score first.
+        With normalize, scores are divided by the BM25 saturation bound of the keywords, sum of idf * (k1 + 1),
+        so they don't depend on which other nodes are scored.
+        """
+        if not keywords:
+            return {}
+
+        document_frequencies = dict(
+            db.session.query(DatasetKeywordPosting.keyword, func.count(DatasetKeywordPosting.index_node_id))
+            .filter(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.keyword.in_(keywords))
+            .group_by(DatasetKeywordPosting.keyword)
+            .all()
+        )
+        if not document_frequencies:
+            return {}
+
+        total_documents, average_length = (
+            db.session.query(func.count(DatasetKeywordDocument.index_node_id), func.avg(DatasetKeywordDocument.length))
+            .filter(DatasetKeywordDocument.dataset_id == self.dataset.id)
+            .one()
+        )
+        total_documents = max(total_documents or 0, *document_frequencies.values())
+        average_length = float(average_length or 1)
+
+        idf = {}
+        for keyword in keywords:
+            frequency = document_frequencies.get(keyword, 0)
+            idf[keyword] = math.log(1 + (total_documents - frequency + 0.5) / (frequency + 0.5))
+        term_frequency = DatasetKeywordPosting.term_frequency
+        length = func.coalesce(DatasetKeywordDocument.length, average_length)
+        score = func.sum(
+            case(idf, value=DatasetKeywordPosting.keyword, else_=0.0)
+            * term_frequency
+            * (_BM25_K1 + 1)
+            / (term_frequency + _BM25_K1 * (1 - _BM25_B + _BM25_B * length / average_length))
+        )
+        query = (
+            db.session.query(DatasetKeywordPosting.index_node_id, score)
+            .outerjoin(
+                DatasetKeywordDocument,
+                and_(
+                    DatasetKeywordDocument.dataset_id == DatasetKeywordPosting.dataset_id,
+                    DatasetKeywordDocument.index_node_id == DatasetKeywordPosting.index_node_id,
+                ),
+            )
+            .filter(
+                DatasetKeywordPosting.dataset_id == self.dataset.id,
+                DatasetKeywordPosting.keyword.in_(list(document_frequencies)),
+            )
+        )
+        if node_ids is not None:
+            query = query.filter(DatasetKeywordPosting.index_node_id.in_(node_ids))
+        query = query.group_by(DatasetKeywordPosting.index_node_id).order_by(
+            score.desc(), DatasetKeywordPosting.index_node_id
+        )
+        if limit:
+            query = query.limit(limit)
+
+        # keywords missing from the index can't match, but still count towards the highest reachable score
+        max_score = sum(idf.values()) * (_BM25_K1 + 1) if normalize else 1.0
+        return {index_node_id: float(node_score) / max_score for index_node_id, node_score in query.all()}
+
     def _save_dataset_keyword_table(self, keyword_table):
         keyword_table_dict = {
             "__type__": "keyword_table",
@@ -223,33 +460,26 @@ class Jieba(BaseKeyword):
             db.session.commit()
 
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
-        keyword_table = self._get_dataset_keyword_table()
         self._update_segment_keywords(self.dataset.id, node_id, keywords)
-        keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
-        self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords({node_id: keywords})
 
     def multi_create_segment_keywords(self, pre_segment_data_list: list):
         keyword_table_handler = JiebaKeywordTableHandler()
-        keyword_table = self._get_dataset_keyword_table()
+        keywords_by_node_id = {}
+        texts_by_node_id = {}
         for pre_segment_data in pre_segment_data_list:
             segment = pre_segment_data["segment"]
             if pre_segment_data["keywords"]:
                 segment.keywords = pre_segment_data["keywords"]
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table or {}, segment.index_node_id, pre_segment_data["keywords"]
-                )
             else:
                 keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
                 segment.keywords = list(keywords)
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table or {}, segment.index_node_id, list(keywords)
-                )
-        self._save_dataset_keyword_table(keyword_table)
+            keywords_by_node_id[segment.index_node_id] = list(segment.keywords)
+            texts_by_node_id[segment.index_node_id] = segment.content
+        self._add_keywords(keywords_by_node_id, texts_by_node_id)
 
     def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
-        keyword_table = self._get_dataset_keyword_table()
-        keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
-        self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords({node_id: keywords})
 
 
 class SetEncoder(json.JSONEncoder):
@@ -23,6 +23,14 @@ class JiebaKeywordTableHandler:
 
         return set(self._expand_tokens_with_subtokens(set(keywords)))
 
+    def tokenize(self, text: str) -> list[str]:
+        """Cut text into words with JIEBA, filtering for whitespace and stopwords."""
+        import jieba  # type: ignore
+
+        from core.rag.datasource.keyword.jieba.stopwords import STOPWORDS
+
+        return [word for word in jieba.cut(text) if word.strip() and word not in STOPWORDS]
+
     def _expand_tokens_with_subtokens(self, tokens: set[str]) -> set[str]:
         """Get subtokens from a list of tokens., filtering for stopwords."""
         from core.rag.datasource.keyword.jieba.stopwords import STOPWORDS
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 from core.rag.models.document import Document
 from models.dataset import Dataset
@@ -35,6 +35,13 @@ class BaseKeyword(ABC):
     def search(self, query: str, **kwargs: Any) -> list[Document]:
         raise NotImplementedError
 
+    def get_keyword_scores(self, query: str, node_ids: list[str]) -> Optional[dict[str, float]]:
+        """
+        Get relevance scores in [0, 1] of the given index nodes for the query from the keyword index.
+        Returns None when the index cannot score the nodes without re-tokenizing them.
+        """
+        return None
+
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
         for text in texts.copy():
             if text.metadata is None:
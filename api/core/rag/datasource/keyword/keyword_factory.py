@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from configs import dify_config
 from core.rag.datasource.keyword.keyword_base import BaseKeyword
@@ -45,6 +45,9 @@ class Keyword:
     def search(self, query: str, **kwargs: Any) -> list[Document]:
         return self._keyword_processor.search(query, **kwargs)
 
+    def get_keyword_scores(self, query: str, node_ids: list[str]) -> Optional[dict[str, float]]:
+        return self._keyword_processor.get_keyword_scores(query, node_ids)
+
     def __getattr__(self, name):
         if self._keyword_processor is not None:
             method = getattr(self._keyword_processor, name)
@@ -0,0 +1,108 @@
+import math
+from collections import Counter, defaultdict
+from typing import Optional
+
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from models.dataset import Dataset
+
+
+class KeywordScorer:
+    """
+    Scores documents by the keywords they share with a query, in [0, 1].
+
+    Documents of datasets whose keyword index can score them are scored with BM25 from the index, normalized by the
+    highest score the query can reach so they compare with the others. Other documents are scored by the TF-IDF
+    cosine similarity of their JIEBA keywords.
+    """
+
+    def score(self, query: str, documents: list[Document]) -> list[float]:
+        scores: list[Optional[float]] = [None] * len(documents)
+
+        indexes_by_dataset_id: dict[str, list[int]] = defaultdict(list)
+        for i, document in enumerate(documents):
+            if document.provider == "dify" and document.metadata and document.metadata.get("dataset_id"):
+                indexes_by_dataset_id[document.metadata["dataset_id"]].append(i)
+
+        if indexes_by_dataset_id:
+            datasets = db.session.query(Dataset).filter(Dataset.id.in_(list(indexes_by_dataset_id))).all()
+            for dataset in datasets:
+                indexes = indexes_by_dataset_id[dataset.id]
+                node_ids = [documents[i].metadata["doc_id"] for i in indexes]  # type: ignore[index]
+                keyword_scores = Keyword(dataset).get_keyword_scores(query, node_ids)
+                if keyword_scores is None:
+                    continue
+                for i, node_id in zip(indexes, node_ids):
+                    scores[i] = keyword_scores.get(node_id, 0.0)
+
+        remaining_indexes = [i for i, score in enumerate(scores) if score is None]
+        if remaining_indexes:
+            tfidf_scores = self._calculate_tfidf_scores(query, [documents[i] for i in remaining_indexes])
+            for i, tfidf_score in zip(remaining_indexes, tfidf_scores):
+                scores[i] = tfidf_score
+
+        return [score or 0.0 for score in scores]
+
+    def _calculate_tfidf_scores(self, query: str, documents: list[Document]) -> list[float]:
+        keyword_table_handler = JiebaKeywordTableHandler()
+        query_keywords = keyword_table_handler.extract_keywords(query, None)
+        documents_keywords = []
+        for document in documents:
+            # get the document keywords
+            document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
+            if document.metadata is not None:
+                document.metadata["keywords"] = document_keywords
+            documents_keywords.append(document_keywords)
+
+        # Counter query keywords(TF)
+        query_keyword_counts = Counter(query_keywords)
+
+        # total documents
+        total_documents = len(documents)
+
+        # calculate all documents' keywords IDF
+        all_keywords = set()
+        for document_keywords in documents_keywords:
+            all_keywords.update(document_keywords)
+
+        keyword_idf = {}
+        for keyword in all_keywords:
+            # calculate include query keywords' documents
+            doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
+            # IDF
+            keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
+
+        query_tfidf = {}
+
+        for keyword, count in query_keyword_counts.items():
+            tf = count
+            idf = keyword_idf.get(keyword, 0)
+            query_tfidf[keyword] = tf * idf
+
+        # calculate all documents' TF-IDF
+        documents_tfidf = []
+        for document_keywords in documents_keywords:
+            document_keyword_counts = Counter(document_keywords)
+            document_tfidf = {}
+            for keyword, count in document_keyword_counts.items():
+                tf = count
+                idf = keyword_idf.get(keyword, 0)
+                document_tfidf[keyword] = tf * idf
+            documents_tfidf.append(document_tfidf)
+
+        def cosine_similarity(vec1, vec2):
+            intersection = set(vec1.keys()) & set(vec2.keys())
+            numerator = sum(vec1[x] * vec2[x] for x in intersection)
+
+            sum1 = sum(vec1[x] ** 2 for x in vec1)
+            sum2 = sum(vec2[x] ** 2 for x in vec2)
+            denominator = math.sqrt(sum1) * math.sqrt(sum2)
+
+            if not denominator:
+                return 0.0
+            else:
+                return float(numerator) / denominator
+
+        return [cosine_similarity(query_tfidf, document_tfidf) for document_tfidf in documents_tfidf]
@@ -3,6 +3,7 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from flask import Flask, current_app
+from sqlalchemy import or_
 from sqlalchemy.orm import load_only
 
 from configs import dify_config
@@ -46,7 +47,10 @@ class RetrievalService:
         if not query:
             return []
         dataset = cls._get_dataset(dataset_id)
-        if not dataset or dataset.available_document_count == 0 or dataset.available_segment_count == 0:
+        if not dataset:
+            return []
+        available_document_count, available_segment_count = dataset.get_available_counts()
+        if available_document_count == 0 or available_segment_count == 0:
             return []
 
         all_documents: list[Document] = []
@@ -60,7 +64,7 @@ class RetrievalService:
                     executor.submit(
                         cls.keyword_search,
                         flask_app=current_app._get_current_object(),  # type: ignore
-                        dataset_id=dataset_id,
+                        dataset=dataset,
                         query=query,
                         top_k=top_k,
                         all_documents=all_documents,
@@ -73,7 +77,7 @@ class RetrievalService:
                     executor.submit(
                         cls.embedding_search,
                         flask_app=current_app._get_current_object(),  # type: ignore
-                        dataset_id=dataset_id,
+                        dataset=dataset,
                         query=query,
                         top_k=top_k,
                         score_threshold=score_threshold,
@@ -89,7 +93,7 @@ class RetrievalService:
                     executor.submit(
                         cls.full_text_index_search,
                         flask_app=current_app._get_current_object(),  # type: ignore
-                        dataset_id=dataset_id,
+                        dataset=dataset,
                         query=query,
                         top_k=top_k,
                         score_threshold=score_threshold,
@@ -136,7 +140,7 @@ class RetrievalService:
     def keyword_search(
         cls,
         flask_app: Flask,
-        dataset_id: str,
+        dataset: Dataset,
         query: str,
         top_k: int,
         all_documents: list,
@@ -145,10 +149,6 @@ class RetrievalService:
     ):
         with flask_app.app_context():
             try:
-                dataset = cls._get_dataset(dataset_id)
-                if not dataset:
-                    raise ValueError("dataset not found")
-
                 keyword = Keyword(dataset=dataset)
 
                 documents = keyword.search(
@@ -162,7 +162,7 @@ class RetrievalService:
     def embedding_search(
         cls,
         flask_app: Flask,
-        dataset_id: str,
+        dataset: Dataset,
         query: str,
         top_k: int,
         score_threshold: Optional[float],
@@ -174,10 +174,6 @@ class RetrievalService:
     ):
         with flask_app.app_context():
             try:
-                dataset = cls._get_dataset(dataset_id)
-                if not dataset:
-                    raise ValueError("dataset not found")
-
                 vector = Vector(dataset=dataset)
                 documents = vector.search_by_vector(
                     query,
@@ -215,7 +211,7 @@ class RetrievalService:
     def full_text_index_search(
         cls,
         flask_app: Flask,
-        dataset_id: str,
+        dataset: Dataset,
         query: str,
         top_k: int,
         score_threshold: Optional[float],
@@ -227,10 +223,6 @@ class RetrievalService:
     ):
         with flask_app.app_context():
             try:
-                dataset = cls._get_dataset(dataset_id)
-                if not dataset:
-                    raise ValueError("dataset not found")
-
                 vector_processor = Vector(dataset=dataset)
 
                 documents = vector_processor.search_by_full_text(
@@ -284,6 +276,49 @@ class RetrievalService:
                 .all()
             }
 
+            # Batch query child chunks of parent-child documents and all candidate segments
+            child_index_node_ids = []
+            index_node_ids = []
+            for document in documents:
+                dataset_document = dataset_documents.get(document.metadata.get("document_id"))
+                if not dataset_document or not document.metadata.get("doc_id"):
+                    continue
+                if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+                    child_index_node_ids.append(document.metadata["doc_id"])
+                else:
+                    index_node_ids.append(document.metadata["doc_id"])
+
+            child_chunks = {}
+            if child_index_node_ids:
+                child_chunks = {
+                    child_chunk.index_node_id: child_chunk
+                    for child_chunk in db.session.query(ChildChunk)
+                    .filter(ChildChunk.index_node_id.in_(child_index_node_ids))
+                    .all()
+                }
+
+            segment_ids = {child_chunk.segment_id for child_chunk in child_chunks.values()}
+            segments_by_id: dict[str, DocumentSegment] = {}
+            segments_by_index_node_id: dict[tuple[str, str], DocumentSegment] = {}
+            if segment_ids or index_node_ids:
+                for loaded_segment in (
+                    db.session.query(DocumentSegment)
+                    .filter(
+                        DocumentSegment.dataset_id.in_([doc.dataset_id for doc in dataset_documents.values()]),
+                        DocumentSegment.enabled == True,
+                        DocumentSegment.status == "completed",
+                        or_(
+                            DocumentSegment.id.in_(list(segment_ids)),
+                            DocumentSegment.index_node_id.in_(index_node_ids),
+                        ),
+                    )
+                    .all()
+                ):
+                    segments_by_id[loaded_segment.id] = loaded_segment
+                    segments_by_index_node_id[(loaded_segment.dataset_id, loaded_segment.index_node_id)] = (
+                        loaded_segment
+                    )
+
             records = []
             include_segment_ids = set()
             segment_child_map = {}
@@ -302,32 +337,12 @@ class RetrievalService:
                     # Handle parent-child documents
                     child_index_node_id = document.metadata.get("doc_id")
 
-                    child_chunk = (
-                        db.session.query(ChildChunk).filter(ChildChunk.index_node_id == child_index_node_id).first()
-                    )
-
+                    child_chunk = child_chunks.get(child_index_node_id)
                     if not child_chunk:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.id == child_chunk.segment_id,
-                        )
-                        .options(
-                            load_only(
-                                DocumentSegment.id,
-                                DocumentSegment.content,
-                                DocumentSegment.answer,
-                            )
-                        )
-                        .first()
-                    )
-
-                    if not segment:
+                    segment = segments_by_id.get(child_chunk.segment_id)
+                    if not segment or segment.dataset_id != dataset_document.dataset_id:
                         continue
 
                     if segment.id not in include_segment_ids:
@@ -364,17 +379,7 @@ class RetrievalService:
                     if not index_node_id:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.index_node_id == index_node_id,
-                        )
-                        .first()
-                    )
-
+                    segment = segments_by_index_node_id.get((dataset_document.dataset_id, index_node_id))
                     if not segment:
                         continue
 
@@ -0,0 +1,135 @@
+"""
+Process-wide vector database clients, shared by every Vector with the same backend configuration so connections
+are set up once per process instead of once per retrieval
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _PooledClient(Generic[T]):
+    def __init__(self, client: T):
+        self.client = client
+        self.checked_at = time.monotonic()
+
+
+_clients: dict[tuple[str, str], _PooledClient[Any]] = {}
+_stats: dict[str, dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def get_client(
+    backend: str,
+    config: BaseModel | dict,
+    factory: Callable[[], T],
+    health_check: Optional[Callable[[T], Any]] = None,
+) -> T:
+    """
+    Get the shared client of a backend configuration, creating it with factory on first use.
+
+    :param backend: vector type
+    :param config: configuration the client is created from, clients are shared between equal configurations
+    :param factory: creates a new client, it must be safe to use from several threads
+    :param health_check: called at most every VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL seconds, the client is
+        replaced when it raises or returns False, without closing it under the threads still using it
+    :return: the shared client
+    """
+    key = (backend, _get_config_hash(config))
+    pooled: Optional[_PooledClient[T]]
+    with _lock:
+        pooled = _clients.get(key)
+        stats = _stats.setdefault(backend, {"clients": 0, "hits": 0, "created": 0, "health_check_failures": 0})
+        if pooled is not None:
+            stats["hits"] += 1
+            if not _is_check_due(pooled, health_check):
+                return pooled.client
+            # other threads keep using the client while this one checks it
+            pooled.checked_at = time.monotonic()
+
+    if pooled is not None and health_check is not None:
+        if _is_healthy(backend, pooled.client, health_check):
+            return pooled.client
+        # other threads may still be using the client, only stop handing it out and let it close once released
+        with _lock:
+            stats["health_check_failures"] += 1
+            if _clients.get(key) is pooled:
+                del _clients[key]
+                stats["clients"] -= 1
+
+    # connecting can be slow, don't hold up lookups of other backends meanwhile
+    client = factory()
+    with _lock:
+        pooled = _clients.get(key)
+        if pooled is None:
+            _clients[key] = _PooledClient(client)
+            stats["clients"] += 1
+            stats["created"] += 1
+            return client
+    # another thread created a client first
+    _close(client)
+    return pooled.client
+
+
+def get_pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Usage of the shared clients per backend: live clients, reuses, clients created and failed health checks
+    """
+    with _lock:
+        return {backend: dict(stats) for backend, stats in _stats.items()}
+
+
+def _get_config_hash(config: BaseModel | dict) -> str:
+    # configurations hold credentials, keep only a digest of them
+    if isinstance(config, BaseModel):
+        serialized = config.model_dump_json()
+    else:
+        serialized = repr(sorted(config.items()))
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _is_check_due(pooled: _PooledClient[Any], health_check: Optional[Callable]) -> bool:
+    interval = dify_config.VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL
+    return health_check is not None and interval > 0 and time.monotonic() - pooled.checked_at >= interval
+
+
+def _is_healthy(backend: str, client: Any, health_check: Callable) -> bool:
+    try:
+        return health_check(client) is not False
+    except Exception:
+        logger.warning("Health check of the shared %s client failed, replacing it", backend, exc_info=True)
+        return False
+
+
+def _close(client: Any) -> None:
+    close = getattr(client, "closeall", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception:
+        logger.debug("Failed to close a vector database client", exc_info=True)
+
+
+def _reset_after_fork() -> None:
+    # connections must not be shared with the parent process
+    global _lock
+    _clients.clear()
+    _stats.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -9,6 +9,7 @@ from elasticsearch import Elasticsearch
 from flask import current_app
 from pydantic import BaseModel, model_validator
 
+from core.rag.datasource.vdb.client_pool import get_client
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
@@ -44,7 +45,12 @@ class ElasticSearchConfig(BaseModel):
 class ElasticSearchVector(BaseVector):
     def __init__(self, index_name: str, config: ElasticSearchConfig, attributes: list):
         super().__init__(index_name.lower())
-        self._client = self._init_client(config)
+        self._client = get_client(
+            VectorType.ELASTICSEARCH,
+            config,
+            lambda: self._init_client(config),
+            health_check=lambda client: client.ping(),
+        )
         self._version = self._get_version()
         self._check_version()
         self._attributes = attributes
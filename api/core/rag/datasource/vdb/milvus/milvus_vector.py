@@ -8,6 +8,7 @@ from pymilvus import MilvusClient, MilvusException  # type: ignore
 from pymilvus.milvus_client import IndexParams  # type: ignore
 
 from configs import dify_config
+from core.rag.datasource.vdb.client_pool import get_client
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
@@ -69,7 +70,7 @@ class MilvusVector(BaseVector):
     def __init__(self, collection_name: str, config: MilvusConfig):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = self._init_client(config)
+        self._client = get_client(VectorType.MILVUS, config, lambda: self._init_client(config))
         self._consistency_level = "Session"  # Consistency level for Milvus operations
         self._fields: list[str] = []  # List of fields in the collection
         if self._client.has_collection(collection_name):
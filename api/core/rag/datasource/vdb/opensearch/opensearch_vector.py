@@ -9,6 +9,7 @@ from opensearchpy.helpers import BulkIndexError
 from pydantic import BaseModel, model_validator
 
 from configs import dify_config
+from core.rag.datasource.vdb.client_pool import get_client
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
@@ -60,7 +61,12 @@ class OpenSearchVector(BaseVector):
     def __init__(self, collection_name: str, config: OpenSearchConfig):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = OpenSearch(**config.to_opensearch_params())
+        self._client = get_client(
+            VectorType.OPENSEARCH,
+            config,
+            lambda: OpenSearch(**config.to_opensearch_params()),
+            health_check=lambda client: client.ping(),
+        )
 
     def get_type(self) -> str:
         return VectorType.OPENSEARCH
@@ -1,5 +1,6 @@
 import json
 import logging
+import threading
 import uuid
 from contextlib import contextmanager
 from typing import Any
@@ -10,6 +11,7 @@ import psycopg2.pool  # type: ignore
 from pydantic import BaseModel, model_validator
 
 from configs import dify_config
+from core.rag.datasource.vdb.client_pool import get_client
 from core.rag.datasource.vdb.vector_base import BaseVector
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
 from core.rag.datasource.vdb.vector_type import VectorType
@@ -27,6 +29,7 @@ class PGVectorConfig(BaseModel):
     database: str
     min_connection: int
     max_connection: int
+    pool_timeout: float = 30
     pg_bigm: bool = False
 
     @model_validator(mode="before")
@@ -71,10 +74,39 @@ USING gin (text gin_bigm_ops);
 """
 
 
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread-safe pool shared by all PGVector instances of a process, waits up to timeout seconds for a free
+    connection instead of failing right away when all connections are in use.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, timeout: float, **kwargs):
+        self._semaphore = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # minconn connections are opened upfront, but keep every returned connection open for reuse
+        self.minconn = maxconn
+
+    def getconn(self, key=None):
+        if not self._semaphore.acquire(timeout=self._timeout):
+            raise psycopg2.pool.PoolError(f"no free connection in the pool after waiting {self._timeout} seconds")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._semaphore.release()
+
+
 class PGVector(BaseVector):
     def __init__(self, collection_name: str, config: PGVectorConfig):
         super().__init__(collection_name)
-        self.pool = self._create_connection_pool(config)
+        self.pool = get_client(VectorType.PGVECTOR, config, lambda: self._create_connection_pool(config))
         self.table_name = f"embedding_{collection_name}"
         self.pg_bigm = config.pg_bigm
 
@@ -82,9 +114,10 @@ class PGVector(BaseVector):
         return VectorType.PGVECTOR
 
     def _create_connection_pool(self, config: PGVectorConfig):
-        return psycopg2.pool.SimpleConnectionPool(
+        return BlockingConnectionPool(
             config.min_connection,
             config.max_connection,
+            timeout=config.pool_timeout,
             host=config.host,
             port=config.port,
             user=config.user,
@@ -95,13 +128,20 @@ class PGVector(BaseVector):
     @contextmanager
     def _get_cursor(self):
         conn = self.pool.getconn()
+        if conn.closed:
+            # dropped while idle in the shared pool, replace it
+            self.pool.putconn(conn, close=True)
+            conn = self.pool.getconn()
         cur = conn.cursor()
         try:
             yield cur
         finally:
             cur.close()
-            conn.commit()
-            self.pool.putconn(conn)
+            try:
+                conn.commit()
+            finally:
+                # a broken connection must not go back to the shared pool
+                self.pool.putconn(conn, close=bool(conn.closed))
 
     def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
         dimension = len(embeddings[0])
@@ -283,6 +323,7 @@ class PGVectorFactory(AbstractVectorFactory):
                 database=dify_config.PGVECTOR_DATABASE or "postgres",
                 min_connection=dify_config.PGVECTOR_MIN_CONNECTION,
                 max_connection=dify_config.PGVECTOR_MAX_CONNECTION,
+                pool_timeout=dify_config.PGVECTOR_POOL_TIMEOUT,
                 pg_bigm=dify_config.PGVECTOR_PG_BIGM,
             ),
         )
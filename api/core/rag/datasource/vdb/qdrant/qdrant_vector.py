@@ -20,6 +20,7 @@ from qdrant_client.http.models import (
 from qdrant_client.local.qdrant_local import QdrantLocal
 
 from configs import dify_config
+from core.rag.datasource.vdb.client_pool import get_client
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
@@ -71,7 +72,12 @@ class QdrantVector(BaseVector):
     def __init__(self, collection_name: str, group_id: str, config: QdrantConfig, distance_func: str = "Cosine"):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = qdrant_client.QdrantClient(**self._client_config.to_qdrant_params())
+        self._client = get_client(
+            VectorType.QDRANT,
+            config,
+            lambda: qdrant_client.QdrantClient(**self._client_config.to_qdrant_params()),
+            health_check=lambda client: client.get_collections(),
+        )
         self._distance_func = distance_func.upper()
         self._group_id = group_id
 
@@ -164,6 +164,10 @@ class Vector:
             embeddings = self._embeddings.embed_documents([document.page_content for document in texts])
             self._vector_processor.create(texts=texts, embeddings=embeddings, **kwargs)
 
+    def create_with_embeddings(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        if texts:
+            self._vector_processor.create(texts=texts, embeddings=embeddings, **kwargs)
+
     def add_texts(self, documents: list[Document], **kwargs):
         if kwargs.get("duplicate_check", False):
             documents = self._filter_duplicate_texts(documents)
@@ -1,5 +1,6 @@
 import datetime
 import json
+import threading
 from typing import Any, Optional
 
 import requests
@@ -7,6 +8,7 @@ import weaviate  # type: ignore
 from pydantic import BaseModel, model_validator
 
 from configs import dify_config
+from core.rag.datasource.vdb.client_pool import get_client
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
 from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
@@ -16,6 +18,8 @@ from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from models.dataset import Dataset
 
+_batch_lock = threading.Lock()
+
 
 class WeaviateConfig(BaseModel):
     endpoint: str
@@ -33,7 +37,12 @@ class WeaviateConfig(BaseModel):
 class WeaviateVector(BaseVector):
     def __init__(self, collection_name: str, config: WeaviateConfig, attributes: list):
         super().__init__(collection_name)
-        self._client = self._init_client(config)
+        self._client = get_client(
+            VectorType.WEAVIATE,
+            config,
+            lambda: self._init_client(config),
+            health_check=lambda client: client.is_ready(),
+        )
         self._attributes = attributes
 
     def _init_client(self, config: WeaviateConfig) -> weaviate.Client:
@@ -103,7 +112,8 @@ class WeaviateVector(BaseVector):
 
         ids = []
 
-        with self._client.batch as batch:
+        # the batch of the shared client is not thread-safe
+        with _batch_lock, self._client.batch as batch:
             for i, text in enumerate(texts):
                 data_properties = {Field.TEXT_KEY.value: text}
                 if metadatas is not None:
@@ -1,8 +1,11 @@
 import base64
 import logging
+import threading
 from typing import Any, Optional, cast
 
 import numpy as np
+from cachetools import TTLCache
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
 from configs import dify_config
@@ -18,6 +21,68 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# number of hashes per cache lookup query and rows per bulk insert
+EMBEDDING_CACHE_BATCH_SIZE = 1000
+
+
+class QueryEmbeddingCache:
+    """
+    Process-local LRU tier in front of the Redis query embedding cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, lock_stripes: int = 64) -> None:
+        self._cache: Optional[TTLCache] = TTLCache(maxsize=maxsize, ttl=ttl) if maxsize > 0 else None
+        self._cache_lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        vector = self.peek(key)
+        with self._cache_lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vector
+
+    def peek(self, key: str) -> Optional[np.ndarray]:
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            return cast(Optional[np.ndarray], self._cache.get(key))
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = vector
+
+    def lock(self, key: str) -> threading.Lock:
+        """Lock serializing the computation of one key, so concurrent misses embed the query only once."""
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def stats(self) -> dict[str, int]:
+        with self._cache_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache) if self._cache is not None else 0,
+            }
+
+    def clear(self) -> None:
+        with self._cache_lock:
+            if self._cache is not None:
+                self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    maxsize=dify_config.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl=dify_config.QUERY_EMBEDDING_CACHE_TTL,
+)
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
@@ -27,24 +92,25 @@ class CacheEmbedding(Embeddings):
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         """Embed search docs in batches of 10."""
         # use doc embedding cache or store if not exists
-        text_embeddings: list[Any] = [None for _ in range(len(texts))]
-        embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
-                db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
-                )
-                .first()
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
-            else:
-                embedding_queue_indices.append(i)
+        text_embeddings: list[Any] = self.get_cached_document_embeddings(texts)
+        embedding_queue_indices = [i for i, embedding in enumerate(text_embeddings) if embedding is None]
         if embedding_queue_indices:
-            embedding_queue_texts = [texts[i] for i in embedding_queue_indices]
-            embedding_queue_embeddings = []
+            embedding_queue_embeddings = self.embed_new_documents([texts[i] for i in embedding_queue_indices])
+            for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
+                text_embeddings[i] = n_embedding
+
+        return text_embeddings
+
+    def get_cached_document_embeddings(self, texts: list[str]) -> list[Optional[list[float]]]:
+        """Look up document embeddings in the cache, texts missing from it get None."""
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._get_cached_embeddings(list(dict.fromkeys(text_hashes)))
+        return [cached_embeddings.get(hash) for hash in text_hashes]
+
+    def embed_new_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents missing from the cache in provider-sized batches and store them in the cache."""
+        embedding_queue_embeddings: list[list[float]] = []
+        if texts:
             try:
                 model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
                 model_schema = model_type_instance.get_model_schema(
@@ -55,8 +121,8 @@ class CacheEmbedding(Embeddings):
                     if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
                     else 1
                 )
-                for i in range(0, len(embedding_queue_texts), max_chunks):
-                    batch_texts = embedding_queue_texts[i : i + max_chunks]
+                for i in range(0, len(texts), max_chunks):
+                    batch_texts = texts[i : i + max_chunks]
 
                     embedding_result = self._model_instance.invoke_text_embedding(
                         texts=batch_texts, user=self._user, input_type=EmbeddingInputType.DOCUMENT
@@ -76,40 +142,89 @@ class CacheEmbedding(Embeddings):
                             db.session.rollback()
                         except Exception:
                             logging.exception("Failed transform embedding")
-                cache_embeddings = []
-                try:
-                    for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = n_embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                            )
-                            embedding_cache.set_embedding(n_embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                new_embeddings: dict[str, list[float]] = {}
+                for text, n_embedding in zip(texts, embedding_queue_embeddings):
+                    new_embeddings.setdefault(helper.generate_text_hash(text), n_embedding)
+                self._save_cached_embeddings(new_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents: %s")
                 raise ex
 
-        return text_embeddings
+        return embedding_queue_embeddings
+
+    def _get_cached_embeddings(self, hashes: list[str]) -> dict[str, list[float]]:
+        """Load cached document embeddings with one IN query per batch of hashes."""
+        cached_embeddings: dict[str, list[float]] = {}
+        for i in range(0, len(hashes), EMBEDDING_CACHE_BATCH_SIZE):
+            batch_hashes = hashes[i : i + EMBEDDING_CACHE_BATCH_SIZE]
+            rows = (
+                db.session.query(Embedding.hash, Embedding.embedding)
+                .filter(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(batch_hashes),
+                )
+                .all()
+            )
+            for hash, embedding in rows:
+                cached_embeddings[hash] = Embedding.deserialize_embedding(bytes(embedding))
+        return cached_embeddings
+
+    def _save_cached_embeddings(self, embeddings: dict[str, list[float]]) -> None:
+        """Bulk insert new document embeddings, skipping rows written concurrently by other workers."""
+        if not embeddings:
+            return
+        # sorted so concurrent inserts of overlapping hashes take row locks in the same order
+        items = sorted(embeddings.items())
+        try:
+            for i in range(0, len(items), EMBEDDING_CACHE_BATCH_SIZE):
+                stmt = (
+                    insert(Embedding)
+                    .values(
+                        [
+                            {
+                                "model_name": self._model_instance.model,
+                                "hash": hash,
+                                "provider_name": self._model_instance.provider,
+                                "embedding": Embedding.serialize_embedding(embedding),
+                            }
+                            for hash, embedding in items[i : i + EMBEDDING_CACHE_BATCH_SIZE]
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=["model_name", "hash", "provider_name"])
+                )
+                db.session.execute(stmt)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
 
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
-        # use doc embedding cache or store if not exists
+        return cast(list[float], self.embed_query_vector(text).tolist())
+
+    def embed_query_vector(self, text: str) -> np.ndarray:
+        """Embed query text as a read-only float32 array, shared through the process-local cache."""
         hash = helper.generate_text_hash(text)
         embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}"
+        query_vector = query_embedding_cache.get(embedding_cache_key)
+        if query_vector is not None:
+            return query_vector
+        with query_embedding_cache.lock(embedding_cache_key):
+            # the same query may have been embedded meanwhile by another dataset of the same retrieval
+            query_vector = query_embedding_cache.peek(embedding_cache_key)
+            if query_vector is None:
+                query_vector = np.asarray(self._embed_query(text, embedding_cache_key), dtype=np.float32)
+                query_vector.setflags(write=False)
+                query_embedding_cache.put(embedding_cache_key, query_vector)
+        return query_vector
+
+    def _embed_query(self, text: str, embedding_cache_key: str) -> list[float]:
+        # use doc embedding cache or store if not exists
         embedding = redis_client.get(embedding_cache_key)
         if embedding:
             redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+            return cast(list[float], np.frombuffer(base64.b64decode(embedding), dtype="float").tolist())
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], user=self._user, input_type=EmbeddingInputType.QUERY
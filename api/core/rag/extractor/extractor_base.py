@@ -1,11 +1,18 @@
 """Abstract interface for document loader implementations."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+
+from core.rag.models.document import Document
 
 
 class BaseExtractor(ABC):
     """Interface for extract files."""
 
     @abstractmethod
-    def extract(self):
+    def extract(self) -> list[Document]:
         raise NotImplementedError
+
+    def extract_iter(self) -> Iterator[Document]:
+        """Lazily extract documents, extractors that can stream pages or sections override it."""
+        yield from self.extract()
@@ -1,14 +1,37 @@
 """Abstract interface for document loader implementations."""
 
+import concurrent.futures
+import multiprocessing
+from collections import deque
 from collections.abc import Iterator
+from itertools import islice
 from typing import Optional, cast
 
+from configs import dify_config
 from core.rag.extractor.blob.blob import Blob
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
 from extensions.ext_storage import storage
 
 
+def _extract_page_range(file_path: str, start: int, end: int) -> list[str]:
+    """Extract the text of pages [start, end) of a pdf file, run in a worker process."""
+    import pypdfium2  # type: ignore
+
+    pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
+    try:
+        texts = []
+        for page_number in range(start, end):
+            page = pdf_reader[page_number]
+            text_page = page.get_textpage()
+            texts.append(text_page.get_text_range())
+            text_page.close()
+            page.close()
+        return texts
+    finally:
+        pdf_reader.close()
+
+
 class PdfExtractor(BaseExtractor):
     """Load pdf files.
 
@@ -31,11 +54,8 @@ class PdfExtractor(BaseExtractor):
                 return [Document(page_content=text)]
             except FileNotFoundError:
                 pass
-        documents = list(self.load())
-        text_list = []
-        for document in documents:
-            text_list.append(document.page_content)
-        text = "\n\n".join(text_list)
+        documents = list(self.extract_iter())
+        text = "\n\n".join(document.page_content for document in documents)
 
         # save plaintext file for caching
         if not plaintext_file_exists and self._file_cache_key:
@@ -43,6 +63,52 @@ class PdfExtractor(BaseExtractor):
 
         return documents
 
+    def extract_iter(self) -> Iterator[Document]:
+        """
+        Lazily extract pages in order.
+        Large files are extracted by page ranges across a process pool when PDF_EXTRACT_PROCESS_WORKERS is set,
+        with a bounded number of ranges in flight.
+        """
+        max_workers = dify_config.PDF_EXTRACT_PROCESS_WORKERS
+        pages_per_task = dify_config.PDF_EXTRACT_PAGES_PER_TASK
+        if max_workers <= 0:
+            yield from self.load()
+            return
+
+        import pypdfium2  # type: ignore
+
+        pdf_reader = pypdfium2.PdfDocument(self._file_path, autoclose=True)
+        try:
+            page_count = len(pdf_reader)
+        finally:
+            pdf_reader.close()
+        if page_count <= pages_per_task:
+            yield from self.load()
+            return
+
+        source = Blob.from_path(self._file_path).source
+        page_ranges = (
+            (start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)
+        )
+        # spawn workers, forking a worker process with open connections and threads is unsafe
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            pending: deque[tuple[int, concurrent.futures.Future]] = deque(
+                (start, executor.submit(_extract_page_range, self._file_path, start, end))
+                for start, end in islice(page_ranges, max_workers * 2)
+            )
+            while pending:
+                start, future = pending.popleft()
+                texts = future.result()
+                next_page_range = next(page_ranges, None)
+                if next_page_range:
+                    pending.append(
+                        (next_page_range[0], executor.submit(_extract_page_range, self._file_path, *next_page_range))
+                    )
+                for offset, content in enumerate(texts):
+                    yield Document(page_content=content, metadata={"source": source, "page": start + offset})
+
     def load(
         self,
     ) -> Iterator[Document]:
@@ -1,11 +1,13 @@
 """Abstract interface for document loader implementations."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from typing import Optional
 
 from configs import dify_config
 from core.model_manager import ModelInstance
 from core.rag.extractor.entity.extract_setting import ExtractSetting
+from core.rag.extractor.extract_processor import ExtractProcessor
 from core.rag.models.document import Document
 from core.rag.splitter.fixed_text_splitter import (
     EnhanceRecursiveCharacterTextSplitter,
@@ -22,6 +24,18 @@ class BaseIndexProcessor(ABC):
     def extract(self, extract_setting: ExtractSetting, **kwargs) -> list[Document]:
         raise NotImplementedError
 
+    def extract_iter(self, extract_setting: ExtractSetting, **kwargs) -> Iterator[Document]:
+        """
+        Lazily extract documents, so they can be transformed in batches when the transform of a document does not
+        depend on the others.
+        """
+        yield from ExtractProcessor.extract_iter(
+            extract_setting=extract_setting,
+            is_automatic=(
+                kwargs.get("process_rule_mode") == "automatic" or kwargs.get("process_rule_mode") == "hierarchical"
+            ),
+        )
+
     @abstractmethod
     def transform(self, documents: list[Document], **kwargs) -> list[Document]:
         raise NotImplementedError
@@ -30,6 +44,12 @@ class BaseIndexProcessor(ABC):
     def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True, **kwargs):
         raise NotImplementedError
 
+    def get_vector_documents(self, documents: list[Document]) -> list[Document]:
+        """
+        Get the documents `load` embeds into the vector index for the given segment documents.
+        """
+        return documents
+
     def clean(self, dataset: Dataset, node_ids: Optional[list[str]], with_keywords: bool = True, **kwargs):
         raise NotImplementedError
 
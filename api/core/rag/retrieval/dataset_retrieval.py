@@ -1,8 +1,7 @@
 import json
-import math
 import re
 import threading
-from collections import Counter, defaultdict
+from collections import defaultdict
 from collections.abc import Generator, Mapping
 from typing import Any, Optional, Union, cast
 
@@ -10,6 +9,7 @@ from flask import Flask, current_app
 from sqlalchemy import Integer, and_, or_, text
 from sqlalchemy import cast as sqlalchemy_cast
 
+from configs import dify_config
 from core.app.app_config.entities import (
     DatasetEntity,
     DatasetRetrieveConfigEntity,
@@ -33,7 +33,7 @@ from core.prompt.advanced_prompt_transform import AdvancedPromptTransform
 from core.prompt.entities.advanced_prompt_entities import ChatModelMessage, CompletionModelPromptTemplate
 from core.prompt.simple_prompt_transform import ModelMode
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
-from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_scorer import KeywordScorer
 from core.rag.datasource.retrieval_service import RetrievalService
 from core.rag.entities.context_entities import DocumentContext
 from core.rag.entities.metadata_entities import Condition, MetadataCondition
@@ -41,6 +41,7 @@ from core.rag.index_processor.constant.index_type import IndexType
 from core.rag.models.document import Document
 from core.rag.rerank.rerank_type import RerankMode
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
+from core.rag.retrieval.retrieval_record_buffer import RetrievalRecordBuffer
 from core.rag.retrieval.router.multi_dataset_function_call_router import FunctionCallMultiDatasetRouter
 from core.rag.retrieval.router.multi_dataset_react_route import ReactMultiDatasetRouter
 from core.rag.retrieval.template_prompts import (
@@ -140,7 +141,7 @@ class DatasetRetrieval:
                 continue
 
             # pass if dataset is not available
-            if dataset and dataset.available_document_count == 0 and dataset.provider != "external":
+            if dataset and dataset.provider != "external" and dataset.get_available_counts()[0] == 0:
                 continue
 
             available_datasets.append(dataset)
@@ -503,6 +504,9 @@ class DatasetRetrieval:
     ) -> None:
         """Handle retrieval end."""
         dify_documents = [document for document in documents if document.provider == "dify"]
+        if dify_config.RETRIEVAL_WRITE_BEHIND_ENABLED:
+            RetrievalRecordBuffer.add_hits(dify_documents)
+            dify_documents = []
         for document in dify_documents:
             if document.metadata is not None:
                 dataset_document = DatasetDocument.query.filter(
@@ -553,6 +557,9 @@ class DatasetRetrieval:
         """
         if not query:
             return
+        if dify_config.RETRIEVAL_WRITE_BEHIND_ENABLED:
+            RetrievalRecordBuffer.add_queries(query, dataset_ids, app_id, user_from, user_id)
+            return
         dataset_queries = []
         for dataset_id in dataset_ids:
             dataset_query = DatasetQuery(
@@ -669,7 +676,7 @@ class DatasetRetrieval:
                 continue
 
             # pass if dataset is not available
-            if dataset and dataset.provider != "external" and dataset.available_document_count == 0:
+            if dataset and dataset.provider != "external" and dataset.get_available_counts()[0] == 0:
                 continue
 
             available_datasets.append(dataset)
@@ -739,69 +746,7 @@ class DatasetRetrieval:
 
         :return:
         """
-        keyword_table_handler = JiebaKeywordTableHandler()
-        query_keywords = keyword_table_handler.extract_keywords(query, None)
-        documents_keywords = []
-        for document in documents:
-            if document.metadata is not None:
-                # get the document keywords
-                document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
-                document.metadata["keywords"] = document_keywords
-                documents_keywords.append(document_keywords)
-
-        # Counter query keywords(TF)
-        query_keyword_counts = Counter(query_keywords)
-
-        # total documents
-        total_documents = len(documents)
-
-        # calculate all documents' keywords IDF
-        all_keywords = set()
-        for document_keywords in documents_keywords:
-            all_keywords.update(document_keywords)
-
-        keyword_idf = {}
-        for keyword in all_keywords:
-            # calculate include query keywords' documents
-            doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
-            # IDF
-            keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
-
-        query_tfidf = {}
-
-        for keyword, count in query_keyword_counts.items():
-            tf = count
-            idf = keyword_idf.get(keyword, 0)
-            query_tfidf[keyword] = tf * idf
-
-        # calculate all documents' TF-IDF
-        documents_tfidf = []
-        for document_keywords in documents_keywords:
-            document_keyword_counts = Counter(document_keywords)
-            document_tfidf = {}
-            for keyword, count in document_keyword_counts.items():
-                tf = count
-                idf = keyword_idf.get(keyword, 0)
-                document_tfidf[keyword] = tf * idf
-            documents_tfidf.append(document_tfidf)
-
-        def cosine_similarity(vec1, vec2):
-            intersection = set(vec1.keys()) & set(vec2.keys())
-            numerator = sum(vec1[x] * vec2[x] for x in intersection)
-
-            sum1 = sum(vec1[x] ** 2 for x in vec1)
-            sum2 = sum(vec2[x] ** 2 for x in vec2)
-            denominator = math.sqrt(sum1) * math.sqrt(sum2)
-
-            if not denominator:
-                return 0.0
-            else:
-                return float(numerator) / denominator
-
-        similarities = []
-        for document_tfidf in documents_tfidf:
-            similarity = cosine_similarity(query_tfidf, document_tfidf)
-            similarities.append(similarity)
+        similarities = KeywordScorer().score(query, documents)
 
         for document, score in zip(documents, similarities):
             # format document
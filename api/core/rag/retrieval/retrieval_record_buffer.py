@@ -0,0 +1,200 @@
+import json
+from collections import Counter
+from datetime import UTC, datetime
+
+import redis
+from sqlalchemy import insert, text
+from sqlalchemy.orm import load_only
+
+from core.rag.index_processor.constant.index_type import IndexType
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.dataset import ChildChunk, DatasetQuery, DocumentSegment
+from models.dataset import Document as DatasetDocument
+
+
+class RetrievalRecordBuffer:
+    """
+    Write-behind buffer for the bookkeeping done after a retrieval: segment hit counts and dataset query rows.
+
+    Records are accumulated in Redis on the request path and written to the database in batches by
+    `schedule.flush_retrieval_records_task`. A flush first renames the pending key to a processing key, and only
+    deletes the processing key after the database commit, so records survive a crash of the flushing worker and
+    are picked up again by the next flush (delivery is at-least-once).
+    """
+
+    HITS_KEY = "retrieval_record_buffer:hits"
+    PROCESSING_HITS_KEY = "retrieval_record_buffer:hits:processing"
+    QUERIES_KEY = "retrieval_record_buffer:queries"
+    PROCESSING_QUERIES_KEY = "retrieval_record_buffer:queries:processing"
+    FLUSH_LOCK_KEY = "retrieval_record_buffer:flush_lock"
+    FLUSH_BATCH_SIZE = 500
+
+    @classmethod
+    def add_hits(cls, documents: list[Document]) -> None:
+        """Accumulate one hit for the segment behind each retrieved document."""
+        fields = [
+            f"{document.metadata['document_id']}:{document.metadata['doc_id']}"
+            for document in documents
+            if document.metadata and "document_id" in document.metadata and "doc_id" in document.metadata
+        ]
+        if not fields:
+            return
+        pipeline = redis_client.pipeline(transaction=False)
+        for field, count in Counter(fields).items():
+            pipeline.hincrby(cls.HITS_KEY, field, count)
+        pipeline.execute()
+
+    @classmethod
+    def add_queries(
+        cls, query: str, dataset_ids: list[str], app_id: str, user_from: str, user_id: str, source: str = "app"
+    ) -> None:
+        """Accumulate one dataset query row per dataset."""
+        created_at = datetime.now(UTC).replace(tzinfo=None).isoformat()
+        rows = [
+            json.dumps(
+                {
+                    "dataset_id": dataset_id,
+                    "content": query,
+                    "source": source,
+                    "source_app_id": app_id,
+                    "created_by_role": user_from,
+                    "created_by": user_id,
+                    "created_at": created_at,
+                }
+            )
+            for dataset_id in dataset_ids
+        ]
+        if rows:
+            redis_client.rpush(cls.QUERIES_KEY, *rows)
+
+    @classmethod
+    def flush(cls) -> None:
+        """Write the accumulated records to the database, skipping the run if another flush is in progress."""
+        lock = redis_client.lock(cls.FLUSH_LOCK_KEY, timeout=600)
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            cls._flush_hits()
+            cls._flush_queries()
+        finally:
+            lock.release()
+
+    @classmethod
+    def _claim(cls, key: str, processing_key: str) -> bool:
+        """Move pending records to the processing key, unless a previous failed flush left records there."""
+        if redis_client.exists(processing_key):
+            return True
+        try:
+            redis_client.rename(key, processing_key)
+        except redis.exceptions.ResponseError:
+            # no pending records
+            return False
+        return True
+
+    @classmethod
+    def _flush_hits(cls) -> None:
+        if not cls._claim(cls.HITS_KEY, cls.PROCESSING_HITS_KEY):
+            return
+        hits: dict[tuple[str, str], int] = {}
+        for field, count in redis_client.hgetall(cls.PROCESSING_HITS_KEY).items():
+            document_id, _, doc_id = field.decode().partition(":")
+            hits[(document_id, doc_id)] = int(count)
+
+        segment_hits = cls._resolve_segment_hits(hits)
+        # update rows in a stable order so concurrent flushes and segment edits cannot deadlock
+        segment_ids = sorted(segment_hits)
+        try:
+            for i in range(0, len(segment_ids), cls.FLUSH_BATCH_SIZE):
+                batch = segment_ids[i : i + cls.FLUSH_BATCH_SIZE]
+                values = ", ".join(f"(CAST(:id_{j} AS uuid), :delta_{j})" for j in range(len(batch)))
+                params: dict[str, str | int] = {}
+                for j, segment_id in enumerate(batch):
+                    params[f"id_{j}"] = segment_id
+                    params[f"delta_{j}"] = segment_hits[segment_id]
+                db.session.execute(
+                    text(
+                        "UPDATE document_segments SET hit_count = document_segments.hit_count + v.delta "
+                        f"FROM (VALUES {values}) AS v(id, delta) WHERE document_segments.id = v.id"
+                    ),
+                    params,
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        redis_client.delete(cls.PROCESSING_HITS_KEY)
+
+    @classmethod
+    def _resolve_segment_hits(cls, hits: dict[tuple[str, str], int]) -> dict[str, int]:
+        """Map (document id, index node id) hits to segment id deltas with one query per table."""
+        dataset_documents = {
+            dataset_document.id: dataset_document
+            for dataset_document in db.session.query(DatasetDocument)
+            .filter(DatasetDocument.id.in_(list({document_id for document_id, _ in hits})))
+            .options(load_only(DatasetDocument.id, DatasetDocument.dataset_id, DatasetDocument.doc_form))
+            .all()
+        }
+        child_node_ids = []
+        node_ids = []
+        for document_id, doc_id in hits:
+            dataset_document = dataset_documents.get(document_id)
+            if not dataset_document:
+                continue
+            if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+                child_node_ids.append(doc_id)
+            else:
+                node_ids.append(doc_id)
+
+        segment_ids_by_node: dict[tuple[str, str], list[str]] = {}
+        if child_node_ids:
+            for document_id, index_node_id, segment_id in db.session.query(
+                ChildChunk.document_id, ChildChunk.index_node_id, ChildChunk.segment_id
+            ).filter(ChildChunk.index_node_id.in_(child_node_ids)):
+                segment_ids_by_node.setdefault((document_id, index_node_id), []).append(segment_id)
+        if node_ids:
+            dataset_ids = list({dataset_document.dataset_id for dataset_document in dataset_documents.values()})
+            segment_dataset_ids: dict[tuple[str, str], list[str]] = {}
+            for dataset_id, index_node_id, segment_id in db.session.query(
+                DocumentSegment.dataset_id, DocumentSegment.index_node_id, DocumentSegment.id
+            ).filter(DocumentSegment.dataset_id.in_(dataset_ids), DocumentSegment.index_node_id.in_(node_ids)):
+                segment_dataset_ids.setdefault((dataset_id, index_node_id), []).append(segment_id)
+            for document_id, doc_id in hits:
+                dataset_document = dataset_documents.get(document_id)
+                if dataset_document and dataset_document.doc_form != IndexType.PARENT_CHILD_INDEX:
+                    segment_ids_by_node[(document_id, doc_id)] = segment_dataset_ids.get(
+                        (dataset_document.dataset_id, doc_id), []
+                    )
+
+        segment_hits: Counter[str] = Counter()
+        for key, count in hits.items():
+            for segment_id in segment_ids_by_node.get(key, []):
+                segment_hits[str(segment_id)] += count
+        return dict(segment_hits)
+
+    @classmethod
+    def _flush_queries(cls) -> None:
+        if not cls._claim(cls.QUERIES_KEY, cls.PROCESSING_QUERIES_KEY):
+            return
+        rows = []
+        for raw_row in redis_client.lrange(cls.PROCESSING_QUERIES_KEY, 0, -1):
+            row = json.loads(raw_row)
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+            rows.append(row)
+        try:
+            for i in range(0, len(rows), cls.FLUSH_BATCH_SIZE):
+                db.session.execute(insert(DatasetQuery), rows[i : i + cls.FLUSH_BATCH_SIZE])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        redis_client.delete(cls.PROCESSING_QUERIES_KEY)
+
+    @classmethod
+    def pending_count(cls) -> dict[str, int]:
+        """Number of buffered records not yet written to the database."""
+        return {
+            "hits": redis_client.hlen(cls.HITS_KEY) + redis_client.hlen(cls.PROCESSING_HITS_KEY),
+            "queries": redis_client.llen(cls.QUERIES_KEY) + redis_client.llen(cls.PROCESSING_QUERIES_KEY),
+        }
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import logging
+import re
+from bisect import bisect_left, bisect_right
 from typing import Any, Optional
 
+from configs import dify_config
 from core.model_manager import ModelInstance
 from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
 from core.rag.splitter.text_splitter import (
@@ -16,6 +20,24 @@ from core.rag.splitter.text_splitter import (
     Union,
 )
 
+logger = logging.getLogger(__name__)
+
+
+class _TokenOffsetMap:
+    """
+    Token offsets of a text tokenized once with the local GPT-2 tokenizer, to count the tokens of any span of it.
+    """
+
+    def __init__(self, text: str):
+        self._starts = GPT2Tokenizer.get_token_offsets(text)
+        self._ends = self._starts[1:] + [len(text)]
+
+    def count(self, start: int, end: int) -> int:
+        """Count the tokens overlapping text[start:end]."""
+        if start >= end:
+            return 0
+        return bisect_left(self._starts, end) - bisect_right(self._ends, start)
+
 
 class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
     """
@@ -46,16 +68,35 @@ class EnhanceRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
                 "disallowed_special": disallowed_special,
             }
             kwargs = {**kwargs, **extra_kwargs}
+        if issubclass(cls, FixedRecursiveCharacterTextSplitter):
+            kwargs = {
+                **kwargs,
+                "recount_final_chunks": embedding_model_instance is not None
+                and dify_config.INDEXING_SPLIT_RECOUNT_ENABLED,
+            }
 
         return cls(length_function=_token_encoder, **kwargs)
 
 
 class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter):
-    def __init__(self, fixed_separator: str = "\n\n", separators: Optional[list[str]] = None, **kwargs: Any):
+    """
+    Chunk boundaries are computed from one local GPT-2 tokenization of each text instead of calling the length
+    function on every piece. With `recount_final_chunks`, the final chunks are counted once more with the length
+    function in one batch, and chunks over the size limit are split again.
+    """
+
+    def __init__(
+        self,
+        fixed_separator: str = "\n\n",
+        separators: Optional[list[str]] = None,
+        recount_final_chunks: bool = False,
+        **kwargs: Any,
+    ):
         """Create a new TextSplitter."""
         super().__init__(**kwargs)
         self._fixed_separator = fixed_separator
         self._separators = separators or ["\n\n", "\n", " ", ""]
+        self._recount_final_chunks = recount_final_chunks
 
     def split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
@@ -64,6 +105,27 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
         else:
             chunks = [text]
 
+        try:
+            token_offset_map = _TokenOffsetMap(text)
+        except Exception:
+            logger.warning("Local tokenizer is unavailable, fall back to the length function to split text")
+            return self._split_chunks_with_length_function(chunks)
+
+        final_chunks = []
+        start = 0
+        for chunk in chunks:
+            end = start + len(chunk)
+            if token_offset_map.count(start, end) > self._chunk_size:
+                final_chunks.extend(self._recursive_split_span(text, start, end, token_offset_map))
+            else:
+                final_chunks.append(chunk)
+            start = end + len(self._fixed_separator)
+
+        if self._recount_final_chunks:
+            final_chunks = self._recount_chunks(final_chunks)
+        return final_chunks
+
+    def _split_chunks_with_length_function(self, chunks: list[str]) -> list[str]:
         final_chunks = []
         chunks_lengths = self._length_function(chunks)
         for chunk, chunk_length in zip(chunks, chunks_lengths):
@@ -74,6 +136,80 @@ class FixedRecursiveCharacterTextSplitter(EnhanceRecursiveCharacterTextSplitter)
 
         return final_chunks
 
+    def _recursive_split_span(self, text: str, start: int, end: int, token_offset_map: _TokenOffsetMap) -> list[str]:
+        """Split text[start:end] the same way as `recursive_split_text`, counting tokens from the offset map."""
+        segment = text[start:end]
+        if not self._keep_separator:
+            return self.recursive_split_text(segment)
+
+        separator = self._separators[-1]
+        for _s in self._separators:
+            if _s == "" or _s in segment:
+                separator = _s
+                break
+
+        spans: list[tuple[int, int]] = []
+        if separator == " ":
+            spans = [(start + match.start(), start + match.end()) for match in re.finditer(r"\S+", segment)]
+        elif separator:
+            split_start = start
+            while (split_end := text.find(separator, split_start, end)) != -1:
+                spans.append((split_start, split_end))
+                split_start = split_end + len(separator)
+            spans.append((split_start, end))
+        else:
+            spans = [(i, i + 1) for i in range(start, end)]
+        spans = [(a, b) for a, b in spans if text[a:b] not in {"", "\n"}]
+
+        final_chunks = []
+        current_part = ""
+        current_length = 0
+        overlap_part = ""
+        overlap_part_length = 0
+        for a, b in spans:
+            s = text[a:b]
+            s_len = token_offset_map.count(a, b)
+            if current_length + s_len <= self._chunk_size - self._chunk_overlap:
+                current_part += s
+                current_length += s_len
+            elif current_length + s_len <= self._chunk_size:
+                current_part += s
+                current_length += s_len
+                overlap_part += s
+                overlap_part_length += s_len
+            else:
+                final_chunks.append(current_part)
+                current_part = overlap_part + s
+                current_length = s_len + overlap_part_length
+                overlap_part = ""
+                overlap_part_length = 0
+        if current_part:
+            final_chunks.append(current_part)
+
+        return final_chunks
+
+    def _recount_chunks(self, chunks: list[str]) -> list[str]:
+        """Count the final chunks with the length function in one batch and split the ones over the limit again."""
+        final_chunks = []
+        for chunk, chunk_length in zip(chunks, self._length_function(chunks)):
+            if chunk_length <= self._chunk_size:
+                final_chunks.append(chunk)
+                continue
+
+            # shrink the local limit by how much the local tokenizer undercounts this chunk
+            local_length = _TokenOffsetMap(chunk).count(0, len(chunk))
+            chunk_size = max(local_length * self._chunk_size // chunk_length, 1)
+            splitter = FixedRecursiveCharacterTextSplitter(
+                fixed_separator="",
+                separators=self._separators,
+                chunk_size=chunk_size,
+                chunk_overlap=min(self._chunk_overlap * chunk_size // self._chunk_size, chunk_size),
+                length_function=self._length_function,
+            )
+            final_chunks.extend(splitter.split_text(chunk))
+
+        return final_chunks
+
     def recursive_split_text(self, text: str) -> list[str]:
         """Split incoming text and return chunks."""
 
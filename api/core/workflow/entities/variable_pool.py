@@ -1,9 +1,10 @@
 import re
 from collections import defaultdict
 from collections.abc import Mapping, Sequence
-from typing import Any, Union
+from types import MappingProxyType
+from typing import Any, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from core.file import File, FileAttribute, file_manager
 from core.variables import Segment, SegmentGroup, Variable
@@ -15,6 +16,8 @@ from ..enums import SystemVariableKey
 
 VariableValue = Union[str, int, float, dict, list, File]
 
+_EMPTY_NODE_VARIABLES: Mapping[int, Segment] = MappingProxyType({})
+
 VARIABLE_PATTERN = re.compile(r"\{\{#([a-zA-Z0-9_]{1,50}(?:\.[a-zA-Z_][a-zA-Z0-9_]{0,29}){1,10})#\}\}")
 
 
@@ -42,6 +45,8 @@ class VariablePool(BaseModel):
         description="Conversation variables.",
         default_factory=list,
     )
+    # Pool this one was layered on top of, see `create_layer`.
+    _parent: Optional["VariablePool"] = PrivateAttr(default=None)
 
     def __init__(
         self,
@@ -103,7 +108,7 @@ class VariablePool(BaseModel):
             variable = variable_factory.segment_to_variable(segment=segment, selector=selector)
 
         hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]][hash_key] = variable
+        self._get_writable_node_variables(selector[0])[hash_key] = variable
 
     def get(self, selector: Sequence[str], /) -> Segment | None:
         """
@@ -122,7 +127,7 @@ class VariablePool(BaseModel):
             return None
 
         hash_key = hash(tuple(selector[1:]))
-        value = self.variable_dictionary[selector[0]].get(hash_key)
+        value = self._get_node_variables(selector[0]).get(hash_key)
 
         if value is None:
             selector, attr = selector[:-1], selector[-1]
@@ -156,7 +161,40 @@ class VariablePool(BaseModel):
             self.variable_dictionary[selector[0]] = {}
             return
         hash_key = hash(tuple(selector[1:]))
-        self.variable_dictionary[selector[0]].pop(hash_key, None)
+        self._get_writable_node_variables(selector[0]).pop(hash_key, None)
+
+    def create_layer(self) -> "VariablePool":
+        """
+        Create a copy-on-write view of the variable pool.
+
+        The layer reads through to this pool, and the variables of a node are only copied into the layer
+        the first time they are added or removed there, so writes never reach this pool. Segments are shared,
+        and this pool should not be modified while layers on top of it are in use.
+
+        Returns:
+            VariablePool: The new layer.
+        """
+        layer = VariablePool.model_construct(
+            variable_dictionary=defaultdict(dict),
+            user_inputs=self.user_inputs,
+            system_variables=self.system_variables,
+            environment_variables=self.environment_variables,
+            conversation_variables=self.conversation_variables,
+        )
+        layer._parent = self
+        return layer
+
+    def _get_node_variables(self, node_id: str) -> Mapping[int, Segment]:
+        if node_id in self.variable_dictionary:
+            return self.variable_dictionary[node_id]
+        if self._parent is not None:
+            return self._parent._get_node_variables(node_id)
+        return _EMPTY_NODE_VARIABLES
+
+    def _get_writable_node_variables(self, node_id: str) -> dict[int, Segment]:
+        if node_id not in self.variable_dictionary and self._parent is not None:
+            self.variable_dictionary[node_id] = dict(self._parent._get_node_variables(node_id))
+        return self.variable_dictionary[node_id]
 
     def convert_template(self, template: str, /):
         parts = VARIABLE_PATTERN.split(template)
@@ -1,8 +1,10 @@
+import threading
 import uuid
 from collections import defaultdict
 from collections.abc import Mapping
 from typing import Any, Optional, cast
 
+from cachetools import LRUCache  # type: ignore
 from pydantic import BaseModel, Field
 
 from configs import dify_config
@@ -52,16 +54,44 @@ class Graph(BaseModel):
     )
     answer_stream_generate_routes: AnswerStreamGenerateRoute = Field(..., description="answer stream generate routes")
     end_stream_param: EndStreamParam = Field(..., description="end stream param")
+    cache_key: Optional[str] = Field(default=None, description="compiled graph cache key, None if not cached")
 
     @classmethod
-    def init(cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None) -> "Graph":
+    def init(
+        cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None, cache_key: Optional[str] = None
+    ) -> "Graph":
         """
         Init graph
 
         :param graph_config: graph config
         :param root_node_id: root node id
+        :param cache_key: key identifying the graph config, e.g. workflow id and hash. When given, the compiled
+            topology is reused by later calls with the same key and root node id
         :return: graph
         """
+        if cache_key is None or not dify_config.WORKFLOW_GRAPH_CACHE_SIZE:
+            return cls._compile(graph_config=graph_config, root_node_id=root_node_id)
+
+        key = (cache_key, root_node_id)
+        with _compiled_graph_cache_lock:
+            graph = _compiled_graph_cache.get(key)
+        if graph is None:
+            graph = cls._compile(graph_config=graph_config, root_node_id=root_node_id)
+            graph.cache_key = cache_key
+            with _compiled_graph_cache_lock:
+                _compiled_graph_cache[key] = graph
+
+        # compiled graphs are shared between runs, hand out a shallow copy so rebinding fields stays local.
+        # The stream processors consume the answer and end dependencies while running, so those are copied deeply
+        return graph.model_copy(
+            update={
+                "answer_stream_generate_routes": graph.answer_stream_generate_routes.model_copy(deep=True),
+                "end_stream_param": graph.end_stream_param.model_copy(deep=True),
+            }
+        )
+
+    @classmethod
+    def _compile(cls, graph_config: Mapping[str, Any], root_node_id: Optional[str] = None) -> "Graph":
         # edge configs
         edge_configs = graph_config.get("edges")
         if edge_configs is None:
@@ -217,17 +247,16 @@ class Graph(BaseModel):
         if source_node_id not in self.node_ids or target_node_id not in self.node_ids:
             return
 
-        if source_node_id not in self.edge_mapping:
-            self.edge_mapping[source_node_id] = []
-
-        if target_node_id in [graph_edge.target_node_id for graph_edge in self.edge_mapping[source_node_id]]:
+        edges = self.edge_mapping.get(source_node_id, [])
+        if target_node_id in [graph_edge.target_node_id for graph_edge in edges]:
             return
 
         graph_edge = GraphEdge(
             source_node_id=source_node_id, target_node_id=target_node_id, run_condition=run_condition
         )
 
-        self.edge_mapping[source_node_id].append(graph_edge)
+        # copy on write, the edge mapping may be shared with the compiled graph cache
+        self.edge_mapping = {**self.edge_mapping, source_node_id: [*edges, graph_edge]}
 
     def get_leaf_node_ids(self) -> list[str]:
         """
@@ -717,3 +746,7 @@ class Graph(BaseModel):
                 return True
 
         return False
+
+
+_compiled_graph_cache: LRUCache = LRUCache(maxsize=max(dify_config.WORKFLOW_GRAPH_CACHE_SIZE, 1))
+_compiled_graph_cache_lock = threading.Lock()
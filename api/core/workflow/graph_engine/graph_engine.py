@@ -5,7 +5,7 @@ import time
 import uuid
 from collections.abc import Generator, Mapping
 from concurrent.futures import ThreadPoolExecutor, wait
-from copy import copy, deepcopy
+from copy import copy
 from datetime import UTC, datetime
 from typing import Any, Optional, cast
 
@@ -879,7 +879,7 @@ class GraphEngine:
         """
         new_instance = copy(self)
         new_instance.graph_runtime_state = copy(self.graph_runtime_state)
-        new_instance.graph_runtime_state.variable_pool = deepcopy(self.graph_runtime_state.variable_pool)
+        new_instance.graph_runtime_state.variable_pool = self.graph_runtime_state.variable_pool.create_layer()
         new_instance.graph_runtime_state.total_tokens = 0
         return new_instance
 
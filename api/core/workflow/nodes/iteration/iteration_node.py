@@ -108,7 +108,9 @@ class IterationNode(BaseNode[IterationNodeData]):
         root_node_id = self.node_data.start_node_id
 
         # init graph
-        iteration_graph = Graph.init(graph_config=graph_config, root_node_id=root_node_id)
+        iteration_graph = Graph.init(
+            graph_config=graph_config, root_node_id=root_node_id, cache_key=self.graph.cache_key
+        )
 
         if not iteration_graph:
             raise IterationGraphNotFoundError("iteration graph not found")
@@ -67,7 +67,9 @@ class LoopNode(BaseNode[LoopNodeData]):
             raise ValueError(f"field start_node_id in loop {self.node_id} not found")
 
         # Initialize graph
-        loop_graph = Graph.init(graph_config=self.graph_config, root_node_id=self.node_data.start_node_id)
+        loop_graph = Graph.init(
+            graph_config=self.graph_config, root_node_id=self.node_data.start_node_id, cache_key=self.graph.cache_key
+        )
         if not loop_graph:
             raise ValueError("loop graph not found")
 
@@ -1,8 +1,11 @@
 from datetime import UTC, datetime
 
+from sqlalchemy import update
+
 from configs import dify_config
 from core.app.entities.app_invoke_entities import AgentChatAppGenerateEntity, ChatAppGenerateEntity
 from core.entities.provider_entities import QuotaUnit
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.plugin.entities.plugin import ModelProviderID
 from events.message_event import message_was_created
 from extensions.ext_database import db
@@ -49,17 +52,25 @@ def handle(sender, **kwargs):
             used_quota = 1
 
     if used_quota is not None and system_configuration.current_quota_type is not None:
-        db.session.query(Provider).filter(
-            Provider.tenant_id == application_generate_entity.app_config.tenant_id,
-            # TODO: Use provider name with prefix after the data migration.
-            Provider.provider_name == ModelProviderID(model_config.provider).provider_name,
-            Provider.provider_type == ProviderType.SYSTEM.value,
-            Provider.quota_type == system_configuration.current_quota_type.value,
-            Provider.quota_limit > Provider.quota_used,
-        ).update(
-            {
-                "quota_used": Provider.quota_used + used_quota,
-                "last_used": datetime.now(tz=UTC).replace(tzinfo=None),
-            }
+        stmt = (
+            update(Provider)
+            .where(
+                Provider.tenant_id == application_generate_entity.app_config.tenant_id,
+                # TODO: Use provider name with prefix after the data migration.
+                Provider.provider_name == ModelProviderID(model_config.provider).provider_name,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == system_configuration.current_quota_type.value,
+                Provider.quota_limit > Provider.quota_used,
+            )
+            .values(
+                quota_used=Provider.quota_used + used_quota,
+                last_used=datetime.now(tz=UTC).replace(tzinfo=None),
+            )
+            .returning(Provider.quota_limit, Provider.quota_used)
         )
+        quota = db.session.execute(stmt).first()
         db.session.commit()
+        # cached configurations only change provider type once the quota runs out, so the quota usage they
+        # show is allowed to lag until they expire; the quota limit itself is enforced by the update above
+        if quota and quota.quota_used >= quota.quota_limit:
+            ProviderConfigurationsCache.invalidate(application_generate_entity.app_config.tenant_id)
@@ -99,6 +99,12 @@ def init_app(app: DifyApp) -> Celery:
             "schedule": crontab(minute="0", hour="10", day_of_week="1"),
         },
     }
+    if dify_config.RETRIEVAL_WRITE_BEHIND_ENABLED:
+        imports.append("schedule.flush_retrieval_records_task")
+        beat_schedule["flush_retrieval_records_task"] = {
+            "task": "schedule.flush_retrieval_records_task.flush_retrieval_records_task",
+            "schedule": timedelta(seconds=dify_config.RETRIEVAL_WRITE_BEHIND_FLUSH_INTERVAL),
+        }
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
 
     return celery_app
@@ -1,13 +1,23 @@
 import hashlib
+import threading
 
+from cachetools import TTLCache  # type: ignore
 from Crypto.Cipher import AES
 from Crypto.PublicKey import RSA
 from Crypto.Random import get_random_bytes
 
+from configs import dify_config
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
 from libs import gmpy2_pkcs10aep_cipher
 
+# parsed private keys and ciphers per tenant
+_decrypt_decoding_cache: TTLCache = TTLCache(
+    maxsize=dify_config.RSA_KEY_CACHE_SIZE,
+    ttl=dify_config.RSA_KEY_CACHE_TTL,
+)
+_decrypt_decoding_cache_lock = threading.Lock()
+
 
 def generate_key_pair(tenant_id):
     private_key = RSA.generate(2048)
@@ -20,6 +30,10 @@ def generate_key_pair(tenant_id):
 
     storage.save(filepath, pem_private)
 
+    redis_client.delete(_get_privkey_cache_key(filepath))
+    with _decrypt_decoding_cache_lock:
+        _decrypt_decoding_cache.pop(tenant_id, None)
+
     return pem_public.decode()
 
 
@@ -46,9 +60,14 @@ def encrypt(text, public_key):
 
 
 def get_decrypt_decoding(tenant_id):
+    with _decrypt_decoding_cache_lock:
+        decrypt_decoding = _decrypt_decoding_cache.get(tenant_id)
+    if decrypt_decoding is not None:
+        return decrypt_decoding
+
     filepath = "privkeys/{tenant_id}".format(tenant_id=tenant_id) + "/private.pem"
 
-    cache_key = "tenant_privkey:{hash}".format(hash=hashlib.sha3_256(filepath.encode()).hexdigest())
+    cache_key = _get_privkey_cache_key(filepath)
     private_key = redis_client.get(cache_key)
     if not private_key:
         try:
@@ -61,17 +80,25 @@ def get_decrypt_decoding(tenant_id):
     rsa_key = RSA.import_key(private_key)
     cipher_rsa = gmpy2_pkcs10aep_cipher.new(rsa_key)
 
+    with _decrypt_decoding_cache_lock:
+        _decrypt_decoding_cache[tenant_id] = (rsa_key, cipher_rsa)
+
     return rsa_key, cipher_rsa
 
 
+def _get_privkey_cache_key(filepath):
+    return "tenant_privkey:{hash}".format(hash=hashlib.sha3_256(filepath.encode()).hexdigest())
+
+
 def decrypt_token_with_decoding(encrypted_text, rsa_key, cipher_rsa):
     if encrypted_text.startswith(prefix_hybrid):
         encrypted_text = encrypted_text[len(prefix_hybrid) :]
 
-        enc_aes_key = encrypted_text[: rsa_key.size_in_bytes()]
-        nonce = encrypted_text[rsa_key.size_in_bytes() : rsa_key.size_in_bytes() + 16]
-        tag = encrypted_text[rsa_key.size_in_bytes() + 16 : rsa_key.size_in_bytes() + 32]
-        ciphertext = encrypted_text[rsa_key.size_in_bytes() + 32 :]
+        key_size = rsa_key.size_in_bytes()
+        enc_aes_key = encrypted_text[:key_size]
+        nonce = encrypted_text[key_size : key_size + 16]
+        tag = encrypted_text[key_size + 16 : key_size + 32]
+        ciphertext = encrypted_text[key_size + 32 :]
 
         aes_key = cipher_rsa.decrypt(enc_aes_key)
 
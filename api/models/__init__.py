@@ -13,6 +13,8 @@ from .dataset import (
     AppDatasetJoin,
     Dataset,
     DatasetCollectionBinding,
+    DatasetKeywordDocument,
+    DatasetKeywordPosting,
     DatasetKeywordTable,
     DatasetPermission,
     DatasetPermissionEnum,
@@ -117,6 +119,8 @@ __all__ = [
     "DataSourceOauthBinding",
     "Dataset",
     "DatasetCollectionBinding",
+    "DatasetKeywordDocument",
+    "DatasetKeywordPosting",
     "DatasetKeywordTable",
     "DatasetPermission",
     "DatasetPermissionEnum",
@@ -11,11 +11,13 @@ import time
 from json import JSONDecodeError
 from typing import Any, cast
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped
 
 from configs import dify_config
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.rag.index_processor.constant.built_in_field import BuiltInField, MetadataDataSource
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from extensions.ext_storage import storage
@@ -134,6 +136,19 @@ class Dataset(db.Model):  # type: ignore[name-defined]
             .scalar()
         )
 
+    def get_available_counts(self) -> tuple[int, int]:
+        """
+        Get available document and segment counts, cached briefly since they are checked on every retrieval.
+
+        :return: available document count, available segment count
+        """
+        cache = DatasetAvailabilityCache(self.id)
+        counts = cache.get()
+        if counts is None:
+            counts = (self.available_document_count, self.available_segment_count)
+            cache.set(*counts)
+        return counts
+
     @property
     def word_count(self):
         return (
@@ -337,6 +352,7 @@ class Document(db.Model):  # type: ignore[name-defined]
     # indexing
     tokens = db.Column(db.Integer, nullable=True)
     indexing_latency = db.Column(db.Float, nullable=True)
+    indexing_stage_latencies = db.Column(JSONB, nullable=True)
     completed_at = db.Column(db.DateTime, nullable=True)
 
     # pause
@@ -561,6 +577,7 @@ class Document(db.Model):  # type: ignore[name-defined]
             "splitting_completed_at": self.splitting_completed_at,
             "tokens": self.tokens,
             "indexing_latency": self.indexing_latency,
+            "indexing_stage_latencies": self.indexing_stage_latencies,
             "completed_at": self.completed_at,
             "is_paused": self.is_paused,
             "paused_by": self.paused_by,
@@ -613,6 +630,7 @@ class Document(db.Model):  # type: ignore[name-defined]
             splitting_completed_at=data.get("splitting_completed_at"),
             tokens=data.get("tokens"),
             indexing_latency=data.get("indexing_latency"),
+            indexing_stage_latencies=data.get("indexing_stage_latencies"),
             completed_at=data.get("completed_at"),
             is_paused=data.get("is_paused"),
             paused_by=data.get("paused_by"),
@@ -894,6 +912,9 @@ class DatasetKeywordTable(db.Model):  # type: ignore[name-defined]
             return None
         if self.data_source_type == "database":
             return json.loads(self.keyword_table, cls=SetDecoder) if self.keyword_table else None
+        elif self.data_source_type == "postings":
+            # keywords live in dataset_keyword_postings
+            return None
         else:
             file_key = "keyword_files/" + dataset.tenant_id + "/" + self.dataset_id + ".txt"
             try:
@@ -906,6 +927,36 @@ class DatasetKeywordTable(db.Model):  # type: ignore[name-defined]
                 return None
 
 
+class DatasetKeywordPosting(db.Model):  # type: ignore[name-defined]
+    """
+    Keyword to segment index node postings of datasets whose keyword table data source type is "postings".
+    """
+
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_pkey"),
+        db.Index("dataset_keyword_posting_index_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    dataset_id = db.Column(StringUUID, nullable=False)
+    keyword = db.Column(db.Text, nullable=False)
+    index_node_id = db.Column(db.String(255), nullable=False)
+    term_frequency = db.Column(db.Integer, nullable=False, server_default=db.text("1"))
+
+
+class DatasetKeywordDocument(db.Model):  # type: ignore[name-defined]
+    """
+    Token length of each segment index node in the keyword postings of a dataset, used for BM25 scoring.
+    """
+
+    __tablename__ = "dataset_keyword_documents"
+    __table_args__ = (db.PrimaryKeyConstraint("dataset_id", "index_node_id", name="dataset_keyword_document_pkey"),)
+
+    dataset_id = db.Column(StringUUID, nullable=False)
+    index_node_id = db.Column(db.String(255), nullable=False)
+    length = db.Column(db.Integer, nullable=False)
+
+
 class Embedding(db.Model):  # type: ignore[name-defined]
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -923,11 +974,24 @@ class Embedding(db.Model):  # type: ignore[name-defined]
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
     provider_name = db.Column(db.String(255), nullable=False, server_default=db.text("''::character varying"))
 
+    # rows written by older versions are pickled lists, which never start with this header
+    BINARY_FORMAT_HEADER = b"F32\x00"
+
+    @classmethod
+    def serialize_embedding(cls, embedding_data: list[float]) -> bytes:
+        return cls.BINARY_FORMAT_HEADER + np.asarray(embedding_data, dtype="<f4").tobytes()
+
+    @classmethod
+    def deserialize_embedding(cls, data: bytes) -> list[float]:
+        if data.startswith(cls.BINARY_FORMAT_HEADER):
+            return cast(list[float], np.frombuffer(data, dtype="<f4", offset=len(cls.BINARY_FORMAT_HEADER)).tolist())
+        return cast(list[float], pickle.loads(data))  # noqa: S301
+
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = self.serialize_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
-        return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        return self.deserialize_embedding(bytes(self.embedding))
 
 
 class DatasetCollectionBinding(db.Model):  # type: ignore[name-defined]
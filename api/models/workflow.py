@@ -1,4 +1,5 @@
 import json
+import threading
 from collections.abc import Mapping, Sequence
 from datetime import UTC, datetime
 from enum import Enum
@@ -11,10 +12,12 @@ from enum import StrEnum
 from typing import TYPE_CHECKING
 
 import sqlalchemy as sa
+from cachetools import LRUCache  # type: ignore
 from sqlalchemy import Index, PrimaryKeyConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 import contexts
+from configs import dify_config
 from constants import HIDDEN_VALUE
 from core.helper import encrypter
 from core.variables import SecretVariable, Variable
@@ -30,6 +33,10 @@ from .types import StringUUID
 if TYPE_CHECKING:
     from models.model import AppMode
 
+# materialized variables of published workflows, which never change once published
+_published_variables_cache: LRUCache = LRUCache(maxsize=max(dify_config.WORKFLOW_VARIABLES_CACHE_SIZE, 1))
+_published_variables_cache_lock = threading.Lock()
+
 
 class WorkflowType(Enum):
     """
@@ -130,6 +137,10 @@ class Workflow(Base):
         "conversation_variables", db.Text, nullable=False, server_default="{}"
     )
 
+    # materialized variables with the raw value they were built from, not mapped
+    _environment_variables_cache = None  # type: Optional[tuple[tuple, Sequence[Variable]]]
+    _conversation_variables_cache = None  # type: Optional[tuple[tuple, Sequence[Variable]]]
+
     @classmethod
     def new(
         cls,
@@ -262,25 +273,19 @@ class Workflow(Base):
 
         tenant_id = contexts.tenant_id.get()
 
-        environment_variables_dict: dict[str, Any] = json.loads(self._environment_variables)
-        results = [
-            variable_factory.build_environment_variable_from_mapping(v) for v in environment_variables_dict.values()
-        ]
+        cache_key = ("environment", tenant_id, self._environment_variables)
+        results = self._get_cached_variables(self._environment_variables_cache, cache_key)
+        if results is None:
+            results = self._set_cached_variables(cache_key, self._build_environment_variables(tenant_id))
+        self._environment_variables_cache = (cache_key, results)
 
-        # decrypt secret variables value
-        def decrypt_func(var):
-            if isinstance(var, SecretVariable):
-                return var.model_copy(update={"value": encrypter.decrypt_token(tenant_id=tenant_id, token=var.value)})
-            else:
-                return var
-
-        results = list(map(decrypt_func, results))
-        return results
+        return list(results)
 
     @environment_variables.setter
     def environment_variables(self, value: Sequence[Variable]):
         if not value:
             self._environment_variables = "{}"
+            self._environment_variables_cache = None
             return
 
         tenant_id = contexts.tenant_id.get()
@@ -309,6 +314,24 @@ class Workflow(Base):
             ensure_ascii=False,
         )
         self._environment_variables = environment_variables_json
+        self._environment_variables_cache = None
+
+    def _build_environment_variables(self, tenant_id: str) -> list[Variable]:
+        environment_variables_dict: dict[str, Any] = json.loads(self._environment_variables)
+        results = [
+            variable_factory.build_environment_variable_from_mapping(v) for v in environment_variables_dict.values()
+        ]
+
+        # decrypt secret variables value
+        secret_indexes = [index for index, var in enumerate(results) if isinstance(var, SecretVariable)]
+        if secret_indexes:
+            decrypted_values = encrypter.batch_decrypt_token(
+                tenant_id=tenant_id, tokens=[results[index].value for index in secret_indexes]
+            )
+            for index, decrypted_value in zip(secret_indexes, decrypted_values):
+                results[index] = results[index].model_copy(update={"value": decrypted_value})
+
+        return results
 
     def to_dict(self, *, include_secret: bool = False) -> Mapping[str, Any]:
         environment_variables = list(self.environment_variables)
@@ -331,9 +354,17 @@ class Workflow(Base):
         if self._conversation_variables is None:
             self._conversation_variables = "{}"
 
-        variables_dict: dict[str, Any] = json.loads(self._conversation_variables)
-        results = [variable_factory.build_conversation_variable_from_mapping(v) for v in variables_dict.values()]
-        return results
+        cache_key = ("conversation", None, self._conversation_variables)
+        results = self._get_cached_variables(self._conversation_variables_cache, cache_key)
+        if results is None:
+            variables_dict: dict[str, Any] = json.loads(self._conversation_variables)
+            results = self._set_cached_variables(
+                cache_key,
+                [variable_factory.build_conversation_variable_from_mapping(v) for v in variables_dict.values()],
+            )
+        self._conversation_variables_cache = (cache_key, results)
+
+        return list(results)
 
     @conversation_variables.setter
     def conversation_variables(self, value: Sequence[Variable]) -> None:
@@ -341,6 +372,28 @@ class Workflow(Base):
             {var.name: var.model_dump() for var in value},
             ensure_ascii=False,
         )
+        self._conversation_variables_cache = None
+
+    def _get_cached_variables(
+        self, instance_cache: Optional[tuple[tuple, Sequence[Variable]]], cache_key: tuple
+    ) -> Optional[Sequence[Variable]]:
+        """
+        Get variables materialized from the same raw value, variables are immutable and safe to share.
+        """
+        if instance_cache is not None and instance_cache[0] == cache_key:
+            return instance_cache[1]
+
+        if self.version == "draft" or not dify_config.WORKFLOW_VARIABLES_CACHE_SIZE:
+            return None
+        with _published_variables_cache_lock:
+            return _published_variables_cache.get((self.id, *cache_key))
+
+    def _set_cached_variables(self, cache_key: tuple, variables: Sequence[Variable]) -> Sequence[Variable]:
+        variables = tuple(variables)
+        if self.version != "draft" and dify_config.WORKFLOW_VARIABLES_CACHE_SIZE:
+            with _published_variables_cache_lock:
+                _published_variables_cache[(self.id, *cache_key)] = variables
+        return variables
 
 
 class WorkflowRunStatus(StrEnum):
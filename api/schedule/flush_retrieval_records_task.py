@@ -0,0 +1,19 @@
+import logging
+import time
+
+import click
+
+import app
+from core.rag.retrieval.retrieval_record_buffer import RetrievalRecordBuffer
+
+
+@app.celery.task(queue="dataset")
+def flush_retrieval_records_task():
+    start_at = time.perf_counter()
+    try:
+        RetrievalRecordBuffer.flush()
+    except Exception:
+        logging.exception("Flush retrieval records failed")
+        return
+    end_at = time.perf_counter()
+    click.echo(click.style("Flushed retrieval records latency: {}".format(end_at - start_at), fg="green"))
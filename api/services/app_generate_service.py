@@ -57,7 +57,7 @@ class AppGenerateService:
         rate_limit = RateLimit(app_model.id, max_active_request)
         request_id = RateLimit.gen_request_key()
         try:
-            request_id = rate_limit.enter(request_id)
+            request_id = rate_limit.enter(request_id, user_id=str(user.id))
             if app_model.mode == AppMode.COMPLETION.value:
                 return rate_limit.generate(
                     CompletionAppGenerator.convert_to_event_stream(
@@ -8,6 +8,7 @@ from constants import HIDDEN_VALUE
 from core.entities.provider_configuration import ProviderConfiguration
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_manager import LBModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
@@ -276,6 +277,7 @@ class ModelLoadBalancingService:
         )
         db.session.add(inherit_config)
         db.session.commit()
+        ProviderConfigurationsCache.invalidate(tenant_id)
 
         return inherit_config
 
@@ -413,6 +415,7 @@ class ModelLoadBalancingService:
 
                 db.session.add(load_balancing_model_config)
                 db.session.commit()
+                ProviderConfigurationsCache.invalidate(tenant_id)
 
         # get deleted config ids
         deleted_config_ids = set(current_load_balancing_configs_dict.keys()) - updated_config_ids
@@ -569,3 +572,4 @@ class ModelLoadBalancingService:
         )
 
         provider_model_credentials_cache.delete()
+        ProviderConfigurationsCache.invalidate(tenant_id)
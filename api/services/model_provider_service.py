@@ -2,6 +2,7 @@ import logging
 from typing import Optional
 
 from core.entities.model_entities import ModelStatus, ModelWithProviderEntity, ProviderModelWithStatusEntity
+from core.helper.plugin_model_cache import PluginModelCache
 from core.model_runtime.entities.model_entities import ModelType, ParameterRule
 from core.model_runtime.model_providers.model_provider_factory import ModelProviderFactory
 from core.provider_manager import ProviderManager
@@ -143,6 +144,7 @@ class ModelProviderService:
 
         # Add or update custom provider credentials.
         provider_configuration.add_or_update_custom_credentials(credentials)
+        PluginModelCache.invalidate(tenant_id)
 
     def remove_provider_credentials(self, tenant_id: str, provider: str) -> None:
         """
@@ -162,6 +164,7 @@ class ModelProviderService:
 
         # Remove custom provider credentials.
         provider_configuration.delete_custom_credentials()
+        PluginModelCache.invalidate(tenant_id)
 
     def get_model_credentials(self, tenant_id: str, provider: str, model_type: str, model: str) -> Optional[dict]:
         """
@@ -237,6 +240,7 @@ class ModelProviderService:
         provider_configuration.add_or_update_custom_model_credentials(
             model_type=ModelType.value_of(model_type), model=model, credentials=credentials
         )
+        PluginModelCache.invalidate(tenant_id)
 
     def remove_model_credentials(self, tenant_id: str, provider: str, model_type: str, model: str) -> None:
         """
@@ -258,6 +262,7 @@ class ModelProviderService:
 
         # Remove custom model credentials
         provider_configuration.delete_custom_model_credentials(model_type=ModelType.value_of(model_type), model=model)
+        PluginModelCache.invalidate(tenant_id)
 
     def get_models_by_model_type(self, tenant_id: str, model_type: str) -> list[ProviderWithModelsResponse]:
         """
@@ -131,6 +131,7 @@ class OpsService:
         )
         db.session.add(trace_config_data)
         db.session.commit()
+        OpsTraceManager.invalidate_app_tracing_config(app_id)
 
         return {"result": "success"}
 
@@ -173,6 +174,7 @@ class OpsService:
 
         current_trace_config.tracing_config = tracing_config
         db.session.commit()
+        OpsTraceManager.invalidate_app_tracing_config(app_id)
 
         return current_trace_config.to_dict()
 
@@ -195,5 +197,6 @@ class OpsService:
 
         db.session.delete(trace_config)
         db.session.commit()
+        OpsTraceManager.invalidate_app_tracing_config(app_id)
 
         return True
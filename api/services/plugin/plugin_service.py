@@ -9,6 +9,7 @@ from configs import dify_config
 from core.helper import marketplace
 from core.helper.download import download_with_size_limit
 from core.helper.marketplace import download_plugin_pkg
+from core.helper.plugin_model_cache import PluginModelCache
 from core.plugin.entities.bundle import PluginBundleDependency
 from core.plugin.entities.plugin import (
     GenericProviderID,
@@ -17,7 +18,12 @@ from core.plugin.entities.plugin import (
     PluginInstallation,
     PluginInstallationSource,
 )
-from core.plugin.entities.plugin_daemon import PluginInstallTask, PluginUploadResponse
+from core.plugin.entities.plugin_daemon import (
+    PluginInstallTask,
+    PluginInstallTaskStartResponse,
+    PluginInstallTaskStatus,
+    PluginUploadResponse,
+)
 from core.plugin.manager.asset import PluginAssetManager
 from core.plugin.manager.debugging import PluginDebuggingManager
 from core.plugin.manager.plugin import PluginInstallationManager
@@ -34,6 +40,8 @@ class PluginService:
 
     REDIS_KEY_PREFIX = "plugin_service:latest_plugin:"
     REDIS_TTL = 60 * 5  # 5 minutes
+    INSTALL_TASK_INVALIDATED_KEY_PREFIX = "plugin_service:install_task_invalidated:"
+    INSTALL_TASK_INVALIDATED_TTL = 60 * 60 * 24  # 1 day
 
     @staticmethod
     def fetch_latest_plugin_version(plugin_ids: Sequence[str]) -> Mapping[str, Optional[LatestPluginCache]]:
@@ -164,7 +172,16 @@ class PluginService:
     @staticmethod
     def fetch_install_task(tenant_id: str, task_id: str) -> PluginInstallTask:
         manager = PluginInstallationManager()
-        return manager.fetch_plugin_installation_task(tenant_id, task_id)
+        task = manager.fetch_plugin_installation_task(tenant_id, task_id)
+        # installed plugins may declare model providers, invalidate once when the task succeeds and not on every poll
+        if task.status == PluginInstallTaskStatus.Success and redis_client.set(
+            f"{PluginService.INSTALL_TASK_INVALIDATED_KEY_PREFIX}{tenant_id}:{task_id}",
+            1,
+            ex=PluginService.INSTALL_TASK_INVALIDATED_TTL,
+            nx=True,
+        ):
+            PluginModelCache.invalidate(tenant_id)
+        return task
 
     @staticmethod
     def delete_install_task(tenant_id: str, task_id: str) -> bool:
@@ -214,7 +231,7 @@ class PluginService:
             pkg = download_plugin_pkg(new_plugin_unique_identifier)
             manager.upload_pkg(tenant_id, pkg, verify_signature=False)
 
-        return manager.upgrade_plugin(
+        response = manager.upgrade_plugin(
             tenant_id,
             original_plugin_unique_identifier,
             new_plugin_unique_identifier,
@@ -223,6 +240,8 @@ class PluginService:
                 "plugin_unique_identifier": new_plugin_unique_identifier,
             },
         )
+        PluginService._invalidate_model_cache_if_installed(tenant_id, response)
+        return response
 
     @staticmethod
     def upgrade_plugin_with_github(
@@ -237,7 +256,7 @@ class PluginService:
         Upgrade plugin with github
         """
         manager = PluginInstallationManager()
-        return manager.upgrade_plugin(
+        response = manager.upgrade_plugin(
             tenant_id,
             original_plugin_unique_identifier,
             new_plugin_unique_identifier,
@@ -248,6 +267,8 @@ class PluginService:
                 "package": package,
             },
         )
+        PluginService._invalidate_model_cache_if_installed(tenant_id, response)
+        return response
 
     @staticmethod
     def upload_pkg(tenant_id: str, pkg: bytes, verify_signature: bool = False) -> PluginUploadResponse:
@@ -291,12 +312,14 @@ class PluginService:
     @staticmethod
     def install_from_local_pkg(tenant_id: str, plugin_unique_identifiers: Sequence[str]):
         manager = PluginInstallationManager()
-        return manager.install_from_identifiers(
+        response = manager.install_from_identifiers(
             tenant_id,
             plugin_unique_identifiers,
             PluginInstallationSource.Package,
             [{}],
         )
+        PluginService._invalidate_model_cache_if_installed(tenant_id, response)
+        return response
 
     @staticmethod
     def install_from_github(tenant_id: str, plugin_unique_identifier: str, repo: str, version: str, package: str):
@@ -305,7 +328,7 @@ class PluginService:
         returns plugin_unique_identifier
         """
         manager = PluginInstallationManager()
-        return manager.install_from_identifiers(
+        response = manager.install_from_identifiers(
             tenant_id,
             [plugin_unique_identifier],
             PluginInstallationSource.Github,
@@ -317,6 +340,8 @@ class PluginService:
                 }
             ],
         )
+        PluginService._invalidate_model_cache_if_installed(tenant_id, response)
+        return response
 
     @staticmethod
     def install_from_marketplace_pkg(
@@ -338,7 +363,7 @@ class PluginService:
                 pkg = download_plugin_pkg(plugin_unique_identifier)
                 manager.upload_pkg(tenant_id, pkg, verify_signature)
 
-        return manager.install_from_identifiers(
+        response = manager.install_from_identifiers(
             tenant_id,
             plugin_unique_identifiers,
             PluginInstallationSource.Marketplace,
@@ -349,11 +374,21 @@ class PluginService:
                 for plugin_unique_identifier in plugin_unique_identifiers
             ],
         )
+        PluginService._invalidate_model_cache_if_installed(tenant_id, response)
+        return response
+
+    @staticmethod
+    def _invalidate_model_cache_if_installed(tenant_id: str, response: PluginInstallTaskStartResponse) -> None:
+        # otherwise the daemon installs asynchronously and fetch_install_task invalidates once the task succeeds
+        if response.all_installed:
+            PluginModelCache.invalidate(tenant_id)
 
     @staticmethod
     def uninstall(tenant_id: str, plugin_installation_id: str) -> bool:
         manager = PluginInstallationManager()
-        return manager.uninstall(tenant_id, plugin_installation_id)
+        result = manager.uninstall(tenant_id, plugin_installation_id)
+        PluginModelCache.invalidate(tenant_id)
+        return result
 
     @staticmethod
     def check_tools_existence(tenant_id: str, provider_ids: Sequence[GenericProviderID]) -> Sequence[bool]:
@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task  # type: ignore
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.tools.utils.web_reader_tool import get_image_upload_file_ids
 from extensions.ext_database import db
@@ -55,6 +56,8 @@ def batch_clean_document_task(document_ids: list[str], dataset_id: str, doc_form
                 db.session.delete(segment)
 
             db.session.commit()
+        # the deleted documents no longer count as available
+        DatasetAvailabilityCache(dataset_id).delete()
         if file_ids:
             files = db.session.query(UploadFile).filter(UploadFile.id.in_(file_ids)).all()
             for file in files:
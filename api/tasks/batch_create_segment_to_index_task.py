@@ -8,6 +8,7 @@ from celery import shared_task  # type: ignore
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
 from extensions.ext_database import db
@@ -116,6 +117,7 @@ def batch_create_segment_to_index_task(
         # add index to db
         VectorService.create_segments_vector(None, document_segments, dataset, dataset_document.doc_form)
         db.session.commit()
+        DatasetAvailabilityCache(dataset_id).delete()
         redis_client.setex(indexing_cache_key, 600, "completed")
         end_at = time.perf_counter()
         logging.info(
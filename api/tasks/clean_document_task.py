@@ -5,6 +5,7 @@ from typing import Optional
 import click
 from celery import shared_task  # type: ignore
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.tools.utils.rag_web_reader import get_image_upload_file_ids
 from extensions.ext_database import db
@@ -57,6 +58,8 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
                 db.session.delete(segment)
 
             db.session.commit()
+        # the deleted documents no longer count as available
+        DatasetAvailabilityCache(dataset_id).delete()
         if file_id:
             file = db.session.query(UploadFile).filter(UploadFile.id == file_id).first()
             if file:
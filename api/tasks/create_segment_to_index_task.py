@@ -7,6 +7,7 @@ import click
 from celery import shared_task  # type: ignore
 from werkzeug.exceptions import NotFound
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -79,6 +80,7 @@ def create_segment_to_index_task(segment_id: str, keywords: Optional[list[str]]
         }
         DocumentSegment.query.filter_by(id=segment.id).update(update_params)
         db.session.commit()
+        DatasetAvailabilityCache(segment.dataset_id).delete()
 
         end_at = time.perf_counter()
         logging.info(
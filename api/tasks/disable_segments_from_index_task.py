@@ -4,6 +4,7 @@ import time
 import click
 from celery import shared_task  # type: ignore
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -73,6 +74,7 @@ def disable_segments_from_index_task(segment_ids: list, dataset_id: str, documen
         )
         db.session.commit()
     finally:
+        DatasetAvailabilityCache(dataset_id).delete()
         for segment in segments:
             indexing_cache_key = "segment_{}_indexing".format(segment.id)
             redis_client.delete(indexing_cache_key)
@@ -6,6 +6,7 @@ import click
 from celery import shared_task  # type: ignore
 from werkzeug.exceptions import NotFound
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.indexing_runner import DocumentIsPausedError, IndexingRunner
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from extensions.ext_database import db
@@ -52,6 +53,7 @@ def document_indexing_update_task(dataset_id: str, document_id: str):
             for segment in segments:
                 db.session.delete(segment)
             db.session.commit()
+            DatasetAvailabilityCache(dataset_id).delete()
         end_at = time.perf_counter()
         logging.info(
             click.style(
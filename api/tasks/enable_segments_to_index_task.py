@@ -5,6 +5,7 @@ import time
 import click
 from celery import shared_task  # type: ignore
 
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
 from core.rag.index_processor.constant.index_type import IndexType
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
 from core.rag.models.document import ChildDocument, Document
@@ -105,6 +106,7 @@ def enable_segments_to_index_task(segment_ids: list, dataset_id: str, document_i
         )
         db.session.commit()
     finally:
+        DatasetAvailabilityCache(dataset_id).delete()
         for segment in segments:
             indexing_cache_key = "segment_{}_indexing".format(segment.id)
             redis_client.delete(indexing_cache_key)
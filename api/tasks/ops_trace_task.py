@@ -1,11 +1,13 @@
+import gzip
 import json
 import logging
+from collections import defaultdict
 
 from celery import shared_task  # type: ignore
 from flask import current_app
 
 from core.ops.entities.config_entity import OPS_FILE_PATH, OPS_TRACE_FAILED_KEY
-from core.ops.entities.trace_entity import trace_info_info_map
+from core.ops.entities.trace_entity import TaskDataBatch, trace_info_info_map
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
@@ -13,11 +15,27 @@ from models.model import Message
 from models.workflow import WorkflowRun
 
 
+def _build_trace_info(trace_info_type, trace_info):
+    if trace_info.get("message_data"):
+        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
+    if trace_info.get("workflow_data"):
+        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
+    if trace_info.get("documents"):
+        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
+
+    trace_type = trace_info_info_map.get(trace_info_type)
+    if trace_type:
+        trace_info = trace_type(**trace_info)
+    return trace_info
+
+
 @shared_task(queue="ops_trace")
 def process_trace_tasks(file_info):
     """
     Async process trace tasks
     Usage: process_trace_tasks.delay(tasks_data)
+
+    Kept for single trace messages enqueued before traces were shipped in batches.
     """
     from core.ops.ops_trace_manager import OpsTraceManager
 
@@ -29,20 +47,10 @@ def process_trace_tasks(file_info):
     trace_info_type = file_data.get("trace_info_type")
     trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
 
-    if trace_info.get("message_data"):
-        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
-    if trace_info.get("workflow_data"):
-        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
-    if trace_info.get("documents"):
-        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
-
     try:
         if trace_instance:
             with current_app.app_context():
-                trace_type = trace_info_info_map.get(trace_info_type)
-                if trace_type:
-                    trace_info = trace_type(**trace_info)
-                trace_instance.trace(trace_info)
+                trace_instance.trace(_build_trace_info(trace_info_type, trace_info))
         logging.info(f"Processing trace tasks success, app_id: {app_id}")
     except Exception:
         failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
@@ -50,3 +58,50 @@ def process_trace_tasks(file_info):
         logging.info(f"Processing trace tasks failed, app_id: {app_id}")
     finally:
         storage.delete(file_path)
+
+
+@shared_task(queue="ops_trace")
+def process_trace_task_batch(file_info):
+    """
+    Async process a batch of trace tasks flushed together by one process
+    Usage: process_trace_task_batch.delay({"file_id": file_id})
+    """
+    from core.ops.ops_trace_manager import OpsTraceManager
+
+    file_id = file_info.get("file_id")
+    file_path = f"{OPS_FILE_PATH}batches/{file_id}.json.gz"
+    try:
+        batch = TaskDataBatch.model_validate_json(gzip.decompress(storage.load(file_path)))
+
+        tasks_by_app_id = defaultdict(list)
+        for task in batch.tasks:
+            tasks_by_app_id[task.app_id].append(task)
+
+        for app_id, tasks in tasks_by_app_id.items():
+            failed = 0
+            # one app's tracing provider failing must not drop the traces of the other apps in the batch
+            try:
+                trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+                if not trace_instance:
+                    continue
+
+                trace_infos = []
+                for task in tasks:
+                    try:
+                        trace_infos.append(_build_trace_info(task.trace_info_type, task.trace_info))
+                    except Exception:
+                        logging.exception(f"Invalid trace task, app_id: {app_id}")
+                        failed += 1
+                with current_app.app_context():
+                    failed += trace_instance.trace_batch(trace_infos)
+            except Exception:
+                logging.exception(f"Processing trace tasks failed, app_id: {app_id}")
+                failed = len(tasks)
+
+            if failed:
+                redis_client.incr(f"{OPS_TRACE_FAILED_KEY}_{app_id}", failed)
+                logging.info(f"Processing trace tasks failed, app_id: {app_id}, failed: {failed}/{len(tasks)}")
+            else:
+                logging.info(f"Processing trace tasks success, app_id: {app_id}, count: {len(tasks)}")
+    finally:
+        storage.delete(file_path)
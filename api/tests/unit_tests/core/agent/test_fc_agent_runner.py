@@ -0,0 +1,76 @@
+import contextvars
+import time
+from unittest.mock import MagicMock
+
+from core.agent.fc_agent_runner import FunctionCallAgentRunner
+from core.tools.entities.tool_entities import ToolInvokeMeta
+
+
+def _runner() -> FunctionCallAgentRunner:
+    runner = FunctionCallAgentRunner.__new__(FunctionCallAgentRunner)
+    runner.user_id = "user"
+    runner.tenant_id = "tenant"
+    runner.message = MagicMock()
+    runner.conversation = MagicMock()
+    runner.application_generate_entity = MagicMock()
+    runner.agent_callback = MagicMock()
+    return runner
+
+
+def _agent_invoke(tool, tool_parameters, **kwargs):
+    time.sleep(tool_parameters["sleep"])
+    return f"{tool}:{tool_parameters['sleep']}", [], ToolInvokeMeta.empty()
+
+
+def test_invoke_tool_calls_concurrently_in_call_order(mocker):
+    mocker.patch("core.agent.fc_agent_runner.dify_config.AGENT_TOOL_CALL_MAX_WORKERS", 4)
+    mocker.patch("core.agent.fc_agent_runner.dify_config.AGENT_TOOL_CALL_TIMEOUT", 0)
+    mocker.patch("core.agent.fc_agent_runner.ToolEngine.agent_invoke", side_effect=_agent_invoke)
+    tool_calls = [("1", "search", {"sleep": 0.3}), ("2", "missing", {}), ("3", "http", {"sleep": 0.1})]
+
+    started_at = time.perf_counter()
+    results = _runner()._invoke_tool_calls({"search": "search", "http": "http"}, tool_calls)
+
+    assert time.perf_counter() - started_at < 0.35
+    assert [response for response, _, _ in results] == [
+        "search:0.3",
+        "there is not a tool named missing",
+        "http:0.1",
+    ]
+
+
+def test_invoke_tool_calls_times_out_slow_calls(mocker):
+    mocker.patch("core.agent.fc_agent_runner.dify_config.AGENT_TOOL_CALL_MAX_WORKERS", 2)
+    mocker.patch("core.agent.fc_agent_runner.dify_config.AGENT_TOOL_CALL_TIMEOUT", 1)
+    mocker.patch("core.agent.fc_agent_runner.ToolEngine.agent_invoke", side_effect=_agent_invoke)
+    tool_calls = [("1", "slow", {"sleep": 2}), ("2", "fast", {"sleep": 0})]
+
+    results = _runner()._invoke_tool_calls({"slow": "slow", "fast": "fast"}, tool_calls)
+
+    assert results[0][0] == "tool invoke error: slow timed out after 1 seconds"
+    assert results[0][2].error == results[0][0]
+    assert results[1][0] == "fast:0"
+
+
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+_tool_state: contextvars.ContextVar[str] = contextvars.ContextVar("tool_state")
+
+
+def test_invoke_tool_calls_in_isolated_contexts(mocker):
+    mocker.patch("core.agent.fc_agent_runner.dify_config.AGENT_TOOL_CALL_MAX_WORKERS", 2)
+    mocker.patch("core.agent.fc_agent_runner.dify_config.AGENT_TOOL_CALL_TIMEOUT", 0)
+
+    def agent_invoke(tool, tool_parameters, **kwargs):
+        seen = f"{_request_id.get(None)}:{_tool_state.get(None)}"
+        _tool_state.set(tool)
+        return seen, [], ToolInvokeMeta.empty()
+
+    mocker.patch("core.agent.fc_agent_runner.ToolEngine.agent_invoke", side_effect=agent_invoke)
+    # more calls than workers, so some worker thread runs several of them
+    tool_calls = [(str(i), "tool", {}) for i in range(4)]
+
+    _request_id.set("request")
+    results = _runner()._invoke_tool_calls({"tool": "tool"}, tool_calls)
+
+    assert [response for response, _, _ in results] == ["request:None"] * 4
+    assert _tool_state.get(None) is None
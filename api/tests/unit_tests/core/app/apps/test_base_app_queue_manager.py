@@ -0,0 +1,51 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.apps.base_app_queue_manager import GenerateTaskStoppedError, PublishFrom
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueTextChunkEvent
+
+
+@pytest.fixture
+def redis_client(mocker):
+    redis_client = mocker.patch("core.app.apps.base_app_queue_manager.redis_client", new=MagicMock())
+    redis_client.get.return_value = None
+    return redis_client
+
+
+def _queue_manager() -> WorkflowAppQueueManager:
+    return WorkflowAppQueueManager(
+        task_id="task-1", user_id="user-1", invoke_from=InvokeFrom.SERVICE_API, app_mode="workflow"
+    )
+
+
+def test_stop_flag_is_read_at_most_once_per_interval(redis_client):
+    queue_manager = _queue_manager()
+
+    for _ in range(100):
+        queue_manager.publish(QueueTextChunkEvent(text="chunk"), PublishFrom.APPLICATION_MANAGER)
+
+    assert redis_client.get.call_count == 1
+
+
+def test_stop_flag_is_sticky_once_seen(redis_client):
+    queue_manager = _queue_manager()
+    redis_client.get.return_value = b"1"
+
+    with pytest.raises(GenerateTaskStoppedError):
+        queue_manager.publish(QueueTextChunkEvent(text="chunk"), PublishFrom.APPLICATION_MANAGER)
+    with pytest.raises(GenerateTaskStoppedError):
+        queue_manager.publish(QueueTextChunkEvent(text="chunk"), PublishFrom.APPLICATION_MANAGER)
+
+    assert redis_client.get.call_count == 1
+
+
+def test_chunk_events_skip_sqlalchemy_model_check(redis_client, mocker):
+    queue_manager = _queue_manager()
+    check = mocker.patch.object(queue_manager, "_check_for_sqlalchemy_models")
+
+    queue_manager.publish(QueueTextChunkEvent(text="chunk"), PublishFrom.TASK_PIPELINE)
+
+    check.assert_not_called()
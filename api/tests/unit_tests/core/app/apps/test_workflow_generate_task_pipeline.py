@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.app.apps.workflow.generate_task_pipeline import WorkflowAppGenerateTaskPipeline
+from core.app.entities.queue_entities import QueueErrorEvent, QueuePingEvent
+from core.app.task_pipeline.workflow_cycle_manage import WorkflowCycleManage
+from models.workflow import WorkflowNodeExecution
+
+
+@pytest.fixture
+def pipeline(mocker):
+    mocker.patch(
+        "core.app.task_pipeline.workflow_cycle_manage.dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED", True
+    )
+    mocker.patch(
+        "core.app.task_pipeline.workflow_cycle_manage.dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE", 100
+    )
+    mocker.patch("core.app.apps.workflow.generate_task_pipeline.db", new=MagicMock())
+
+    pipeline = WorkflowAppGenerateTaskPipeline.__new__(WorkflowAppGenerateTaskPipeline)
+    pipeline._application_generate_entity = MagicMock()
+    pipeline._workflow_features_dict = {}
+    pipeline._base_task_pipeline = MagicMock()
+    pipeline._workflow_cycle_manager = WorkflowCycleManage(
+        application_generate_entity=MagicMock(), workflow_system_variables={}
+    )
+    workflow_node_execution = WorkflowNodeExecution()
+    workflow_node_execution.id = "node-execution"
+    pipeline._workflow_cycle_manager._save_workflow_node_execution(
+        session=MagicMock(), workflow_node_execution=workflow_node_execution
+    )
+    return pipeline
+
+
+def test_pending_node_executions_are_flushed_on_error_event(mocker, pipeline):
+    session = mocker.patch("core.app.apps.workflow.generate_task_pipeline.Session").return_value.__enter__.return_value
+    pipeline._base_task_pipeline._queue_manager.listen.return_value = iter(
+        [MagicMock(event=QueueErrorEvent(error=ValueError("node failed")))]
+    )
+
+    responses = list(pipeline._wrapper_process_stream_response())
+
+    assert responses == [pipeline._base_task_pipeline._error_to_stream_response.return_value]
+    session.execute.assert_called_once()
+    session.commit.assert_called_once()
+    assert pipeline._workflow_cycle_manager._pending_node_executions == {}
+
+
+def test_pending_node_executions_are_flushed_on_client_disconnect(mocker, pipeline):
+    session = mocker.patch("core.app.apps.workflow.generate_task_pipeline.Session").return_value.__enter__.return_value
+    pipeline._base_task_pipeline._queue_manager.listen.return_value = iter(
+        [MagicMock(event=QueuePingEvent()), MagicMock(event=QueuePingEvent())]
+    )
+
+    responses = pipeline._wrapper_process_stream_response()
+    next(responses)
+    responses.close()
+
+    session.execute.assert_called_once()
+    session.commit.assert_called_once()
+    assert pipeline._workflow_cycle_manager._pending_node_executions == {}
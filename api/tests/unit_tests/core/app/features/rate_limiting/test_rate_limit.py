@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+
+from core.app.features.rate_limiting.rate_limit import RateLimit
+from core.errors.error import AppInvokeQuotaExceededError
+
+
+@pytest.fixture
+def admission_script(mocker):
+    redis_client = mocker.patch("core.app.features.rate_limiting.rate_limit.redis_client", new=MagicMock())
+    redis_client.exists.return_value = False
+    mocker.patch("core.app.features.rate_limiting.rate_limit.time.sleep")
+    mocker.patch.object(RateLimit, "_instance_dict", {})
+    mocker.patch.object(RateLimit, "_admission_script", None)
+    return redis_client.register_script.return_value
+
+
+def _actions(admission_script) -> list[str]:
+    return [call.kwargs["args"][0] for call in admission_script.call_args_list]
+
+
+def test_enter_waits_in_queue_until_admitted(admission_script):
+    admission_script.side_effect = [0, 0, 1]
+
+    request_id = RateLimit("app", 1).enter("request", user_id="user")
+
+    assert request_id == "request"
+    assert _actions(admission_script) == ["enter", "poll", "poll"]
+    assert admission_script.call_args_list[0].kwargs["keys"][0] == "dify:rate_limit:{app}:active_requests"
+
+
+def test_enter_rejects_when_wait_times_out(admission_script):
+    admission_script.side_effect = [0, -1]
+
+    with pytest.raises(AppInvokeQuotaExceededError):
+        RateLimit("app", 1).enter("request", user_id="user")
+
+
+def test_enter_leaves_queue_when_interrupted(admission_script):
+    admission_script.side_effect = [0, KeyboardInterrupt(), 0]
+
+    with pytest.raises(KeyboardInterrupt):
+        RateLimit("app", 1).enter("request", user_id="user")
+
+    assert _actions(admission_script) == ["enter", "poll", "leave"]
+
+
+@pytest.fixture
+def fake_redis(mocker):
+    client = fakeredis.FakeRedis()
+    mocker.patch("core.app.features.rate_limiting.rate_limit.redis_client", new=client)
+    mocker.patch.object(RateLimit, "_instance_dict", {})
+    mocker.patch.object(RateLimit, "_admission_script", None)
+    return client
+
+
+def _enter(rate_limit: RateLimit, request_id: str, user_id: str, queue_size: int = 10, deadline: float = 1e12) -> int:
+    return rate_limit._admit("enter", request_id, user_id, queue_size, deadline)
+
+
+def test_admission_script_queues_until_a_slot_is_free(fake_redis):
+    rate_limit = RateLimit("app", 1)
+
+    assert _enter(rate_limit, "first", "user") == RateLimit._ADMITTED
+    assert _enter(rate_limit, "second", "user") == RateLimit._WAITING
+    assert rate_limit._admit("poll", "second") == RateLimit._WAITING
+
+    rate_limit.exit("first")
+
+    assert rate_limit._admit("poll", "second") == RateLimit._ADMITTED
+    assert set(fake_redis.hkeys(rate_limit.active_requests_key)) == {b"second"}
+    assert fake_redis.zcard(rate_limit.admission_keys[1]) == 0
+    assert fake_redis.hlen(rate_limit.admission_keys[4]) == 0
+
+
+def test_admission_script_shares_queue_between_users(fake_redis):
+    rate_limit = RateLimit("app", 1)
+    assert _enter(rate_limit, "active", "busy") == RateLimit._ADMITTED
+    for request_id in ["busy-1", "busy-2"]:
+        assert _enter(rate_limit, request_id, "busy") == RateLimit._WAITING
+    assert _enter(rate_limit, "quiet-1", "quiet") == RateLimit._WAITING
+
+    rate_limit.exit("active")
+
+    # the second request of the busy user waits behind the first request of the quiet user
+    assert rate_limit._admit("poll", "quiet-1") == RateLimit._WAITING
+    assert rate_limit._admit("poll", "busy-1") == RateLimit._ADMITTED
+    rate_limit.exit("busy-1")
+    assert rate_limit._admit("poll", "busy-2") == RateLimit._WAITING
+    assert rate_limit._admit("poll", "quiet-1") == RateLimit._ADMITTED
+
+
+def test_admission_script_rejects_full_queue_and_expired_tickets(fake_redis):
+    rate_limit = RateLimit("app", 1)
+    assert _enter(rate_limit, "active", "user") == RateLimit._ADMITTED
+    assert _enter(rate_limit, "expired", "user", deadline=0) == RateLimit._WAITING
+    # the expired ticket no longer takes up the only place in the queue
+    assert _enter(rate_limit, "queued", "user", queue_size=1) == RateLimit._WAITING
+    assert _enter(rate_limit, "rejected", "user", queue_size=1) == -1
+
+    assert rate_limit._admit("poll", "expired") == -1
+
+    rate_limit._admit("leave", "queued")
+    assert rate_limit._admit("poll", "queued") == -1
+    assert fake_redis.hlen(rate_limit.admission_keys[4]) == 0
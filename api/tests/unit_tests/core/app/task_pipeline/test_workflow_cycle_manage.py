@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.app.task_pipeline.workflow_cycle_manage import WorkflowCycleManage
+from models.workflow import WorkflowNodeExecution, WorkflowNodeExecutionStatus
+
+
+@pytest.fixture
+def write_behind_manager(monkeypatch):
+    monkeypatch.setattr(
+        "core.app.task_pipeline.workflow_cycle_manage.dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED", True
+    )
+    monkeypatch.setattr(
+        "core.app.task_pipeline.workflow_cycle_manage.dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE", 2
+    )
+    monkeypatch.setattr(
+        "core.app.task_pipeline.workflow_cycle_manage.dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL", 3600.0
+    )
+    return WorkflowCycleManage(application_generate_entity=MagicMock(), workflow_system_variables={})
+
+
+def _node_execution(node_execution_id: str) -> WorkflowNodeExecution:
+    workflow_node_execution = WorkflowNodeExecution()
+    workflow_node_execution.id = f"id-{node_execution_id}"
+    workflow_node_execution.node_execution_id = node_execution_id
+    workflow_node_execution.status = WorkflowNodeExecutionStatus.RUNNING.value
+    return workflow_node_execution
+
+
+def test_node_executions_are_flushed_in_batches(write_behind_manager):
+    session = MagicMock()
+
+    write_behind_manager._save_workflow_node_execution(session=session, workflow_node_execution=_node_execution("1"))
+    session.execute.assert_not_called()
+    session.merge.assert_not_called()
+
+    write_behind_manager._save_workflow_node_execution(session=session, workflow_node_execution=_node_execution("2"))
+    session.execute.assert_called_once()
+    stmt = session.execute.call_args.args[0]
+    assert "ON CONFLICT (id) DO UPDATE" in str(stmt.compile(dialect=postgresql.dialect()))
+    assert write_behind_manager._pending_node_executions == {}
+
+
+def test_force_flush_writes_pending_node_executions(write_behind_manager):
+    session = MagicMock()
+    write_behind_manager._save_workflow_node_execution(session=session, workflow_node_execution=_node_execution("1"))
+
+    write_behind_manager._flush_node_executions(session=session, force=True)
+
+    session.execute.assert_called_once()
+    assert write_behind_manager._pending_node_executions == {}
+
+
+def test_new_node_executions_are_added_without_write_behind(monkeypatch):
+    monkeypatch.setattr(
+        "core.app.task_pipeline.workflow_cycle_manage.dify_config.WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED", False
+    )
+    manager = WorkflowCycleManage(application_generate_entity=MagicMock(), workflow_system_variables={})
+    session = MagicMock()
+    workflow_node_execution = _node_execution("1")
+
+    saved = manager._save_workflow_node_execution(
+        session=session, workflow_node_execution=workflow_node_execution, is_new=True
+    )
+
+    assert saved is workflow_node_execution
+    session.add.assert_called_once_with(workflow_node_execution)
+    session.merge.assert_not_called()
@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock, PropertyMock
+
+from core.helper.dataset_availability_cache import DatasetAvailabilityCache
+from models.dataset import Dataset
+
+
+def test_get_available_counts_uses_cached_counts(mocker):
+    redis_client = mocker.patch("core.helper.dataset_availability_cache.redis_client", new=MagicMock())
+    redis_client.get.return_value = b'{"document_count": 3, "segment_count": 42}'
+    document_count = mocker.patch.object(Dataset, "available_document_count", new_callable=PropertyMock)
+
+    assert Dataset(id="dataset-1").get_available_counts() == (3, 42)
+    redis_client.get.assert_called_once_with("dataset_availability:dataset_id:dataset-1")
+    document_count.assert_not_called()
+
+
+def test_get_available_counts_caches_counted_values(mocker):
+    redis_client = mocker.patch("core.helper.dataset_availability_cache.redis_client", new=MagicMock())
+    redis_client.get.return_value = None
+    mocker.patch.object(Dataset, "available_document_count", new_callable=PropertyMock, return_value=1)
+    mocker.patch.object(Dataset, "available_segment_count", new_callable=PropertyMock, return_value=0)
+
+    assert Dataset(id="dataset-1").get_available_counts() == (1, 0)
+    cache_key, ttl, _ = redis_client.setex.call_args.args
+    assert cache_key == DatasetAvailabilityCache("dataset-1").cache_key
+    assert ttl == 60
@@ -0,0 +1,29 @@
+import httpx
+
+from core.helper.http_client_pool import get_pool_stats, get_pooled_client, no_cookie_jar
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, headers={"Set-Cookie": "session=secret; Path=/"})
+
+
+def _create_client(**kwargs) -> httpx.Client:
+    return httpx.Client(transport=httpx.MockTransport(_handler), cookies=no_cookie_jar(), **kwargs)
+
+
+def test_pooled_client_is_shared_and_counts_requests():
+    client = get_pooled_client("test_pool", _create_client)
+    assert get_pooled_client("test_pool", _create_client) is client
+
+    client.get("http://example.com")
+    client.get("http://example.com")
+
+    assert get_pool_stats()["test_pool"]["requests"] == 2
+
+
+def test_pooled_client_does_not_store_cookies():
+    client = get_pooled_client("test_cookie_pool", _create_client)
+
+    client.get("http://example.com")
+
+    assert not client.cookies
@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.helper import plugin_model_cache
+from core.helper.plugin_model_cache import PluginModelCache
+from core.model_runtime.entities.common_entities import I18nObject
+from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, ModelType
+
+
+@pytest.fixture
+def redis_client(mocker):
+    store: dict[str, bytes] = {}
+    client = mocker.patch("core.helper.plugin_model_cache.redis_client", new=MagicMock())
+    client.get.side_effect = store.get
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(
+        key, value if isinstance(value, bytes) else value.encode()
+    )
+    client.incr.side_effect = lambda key: store.__setitem__(key, str(int(store.get(key, b"0")) + 1).encode())
+    plugin_model_cache._local_cache.clear()
+    return client
+
+
+def _schema() -> AIModelEntity:
+    return AIModelEntity(
+        model="gpt-4o",
+        label=I18nObject(en_US="gpt-4o"),
+        model_type=ModelType.LLM,
+        fetch_from=FetchFrom.PREDEFINED_MODEL,
+        model_properties={},
+    )
+
+
+def test_model_schema_is_shared_through_redis(redis_client):
+    PluginModelCache("tenant").set_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", {"key": "a"}, _schema())
+    plugin_model_cache._local_cache.clear()
+
+    cached = PluginModelCache("tenant").get_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", {"key": "a"})
+
+    assert cached == _schema()
+    assert (
+        PluginModelCache("tenant").get_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", {"key": "b"})
+        is None
+    )
+    assert (
+        PluginModelCache("other").get_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", {"key": "a"}) is None
+    )
+
+
+def test_invalidate_drops_tenant_entries(redis_client):
+    cache = PluginModelCache("tenant")
+    cache.set_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", None, _schema())
+    assert cache.get_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", None) is not None
+
+    PluginModelCache.invalidate("tenant")
+
+    assert cache.get_model_schema("langgenius/openai", "openai", "llm", "gpt-4o", None) is None
@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.entities.provider_configuration import ProviderConfigurations
+from core.helper import provider_configurations_cache
+from core.helper.plugin_model_cache import PluginModelCache
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+from core.provider_manager import ProviderManager
+
+
+@pytest.fixture
+def redis_client(mocker):
+    store: dict[str, bytes] = {}
+    client = mocker.patch("core.helper.provider_configurations_cache.redis_client", new=MagicMock())
+    client.mget.side_effect = lambda keys: [store.get(key) for key in keys]
+    client.incr.side_effect = lambda key: store.__setitem__(key, str(int(store.get(key, b"0")) + 1).encode())
+    provider_configurations_cache._local_cache.clear()
+    return client
+
+
+def test_get_configurations_reuses_snapshot_until_invalidated(redis_client, mocker):
+    load = mocker.patch.object(
+        ProviderManager, "_get_configurations", side_effect=lambda tenant_id: ProviderConfigurations(tenant_id)
+    )
+
+    first = ProviderManager().get_configurations("tenant")
+    assert ProviderManager().get_configurations("tenant") is first
+    assert ProviderManager().get_configurations("other") is not first
+    assert load.call_count == 2
+
+    ProviderConfigurationsCache.invalidate("tenant")
+
+    assert ProviderManager().get_configurations("tenant") is not first
+    assert load.call_count == 3
+
+
+def test_plugin_changes_invalidate_snapshot(redis_client):
+    cache = ProviderConfigurationsCache("tenant")
+    cache.set(cache.get_version(), ProviderConfigurations("tenant"))
+    assert cache.get(cache.get_version()) is not None
+
+    redis_client.incr(PluginModelCache._get_version_key("tenant"))
+
+    assert cache.get(cache.get_version()) is None
@@ -0,0 +1,36 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.memory.token_buffer_memory import TokenBufferMemory
+from core.model_runtime.entities import AssistantPromptMessage, UserPromptMessage
+from models.model import Conversation
+
+
+def _memory(token_counts: list[int]) -> TokenBufferMemory:
+    model_instance = MagicMock()
+    model_instance.get_llm_num_tokens.side_effect = lambda prompt_messages: sum(token_counts[-len(prompt_messages) :])
+    return TokenBufferMemory(conversation=Conversation(), model_instance=model_instance)
+
+
+@pytest.mark.parametrize(
+    ("token_counts", "max_token_limit"),
+    [
+        ([5, 5, 5, 5], 10),
+        ([1, 100, 1, 1, 1, 1], 3),
+        ([40, 40, 40, 40, 30, 30], 60),
+        ([50, 50], 10),
+    ],
+)
+def test_prune_index_matches_popping_oldest_messages(token_counts, max_token_limit):
+    prompt_messages = [
+        UserPromptMessage(content=str(i)) if i % 2 == 0 else AssistantPromptMessage(content=str(i))
+        for i in range(len(token_counts))
+    ]
+    expected = 0
+    while sum(token_counts[expected:]) > max_token_limit and len(token_counts) - expected > 1:
+        expected += 1
+
+    memory = _memory(token_counts)
+
+    assert memory._get_prune_index(prompt_messages, max_token_limit) == expected
@@ -0,0 +1,101 @@
+import gzip
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.ops.entities.config_entity import OPS_TRACE_FAILED_KEY
+from core.ops.entities.trace_entity import TaskData, TaskDataBatch, ToolTraceInfo
+from core.ops.ops_trace_manager import OpsTraceManager, TraceQueueManager
+from tasks.ops_trace_task import process_trace_task_batch
+
+
+@pytest.fixture
+def redis_client(mocker):
+    store: dict[str, bytes] = {}
+    client = mocker.patch("core.ops.ops_trace_manager.redis_client", new=MagicMock())
+    client.get.side_effect = store.get
+    client.incr.side_effect = lambda key: store.__setitem__(key, str(int(store.get(key, b"0")) + 1).encode())
+    OpsTraceManager.app_ops_trace_instances_cache.clear()
+    return client
+
+
+def test_get_ops_trace_instance_reuses_instance_until_invalidated(redis_client, mocker):
+    load = mocker.patch.object(OpsTraceManager, "_get_ops_trace_instance", side_effect=lambda app_id: object())
+
+    first = OpsTraceManager.get_ops_trace_instance("app")
+    assert OpsTraceManager.get_ops_trace_instance("app") is first
+    assert load.call_count == 1
+
+    OpsTraceManager.invalidate_app_tracing_config("app")
+
+    assert OpsTraceManager.get_ops_trace_instance("app") is not first
+    assert load.call_count == 2
+
+
+def _tool_trace_info(tool_name: str) -> ToolTraceInfo:
+    return ToolTraceInfo(
+        message_id="message",
+        metadata={},
+        tool_name=tool_name,
+        tool_inputs={},
+        tool_outputs="",
+        tool_config={},
+        time_cost=0,
+        tool_parameters={},
+        file_url="",
+        message_file_data=None,
+    )
+
+
+def test_send_to_celery_ships_one_compressed_batch(app, mocker):
+    storage = mocker.patch("core.ops.ops_trace_manager.storage")
+    delay = mocker.patch("core.ops.ops_trace_manager.process_trace_task_batch.delay")
+    manager = TraceQueueManager.__new__(TraceQueueManager)
+    manager.flask_app = app
+    tasks = [MagicMock(app_id="app", execute=MagicMock(return_value=_tool_trace_info(name))) for name in "ab"]
+
+    manager.send_to_celery(tasks)
+
+    file_path, data = storage.save.call_args.args
+    batch = TaskDataBatch.model_validate_json(gzip.decompress(data))
+    assert [task.trace_info["tool_name"] for task in batch.tasks] == ["a", "b"]
+    delay.assert_called_once_with({"file_id": file_path.rsplit("/", 1)[-1].removesuffix(".json.gz")})
+
+    # the worker delivers the batch of each app with one call
+    mocker.patch("tasks.ops_trace_task.storage.load", return_value=data)
+    mocker.patch("tasks.ops_trace_task.storage.delete")
+    trace_instance = MagicMock()
+    trace_instance.trace_batch.return_value = 0
+    mocker.patch.object(OpsTraceManager, "get_ops_trace_instance", return_value=trace_instance)
+
+    process_trace_task_batch({"file_id": "file"})
+
+    trace_infos = trace_instance.trace_batch.call_args.args[0]
+    assert [trace_info.tool_name for trace_info in trace_infos] == ["a", "b"]
+
+
+def test_process_trace_task_batch_continues_after_app_failure(mocker):
+    tasks = [
+        TaskData(app_id=app_id, trace_info_type="ToolTraceInfo", trace_info=_tool_trace_info(name).model_dump())
+        for app_id, name in [("broken", "a"), ("broken", "b"), ("working", "c")]
+    ]
+    data = gzip.compress(TaskDataBatch(tasks=tasks).model_dump_json().encode())
+    mocker.patch("tasks.ops_trace_task.storage.load", return_value=data)
+    delete = mocker.patch("tasks.ops_trace_task.storage.delete")
+    redis_client = mocker.patch("tasks.ops_trace_task.redis_client", new=MagicMock())
+    trace_instance = MagicMock()
+    trace_instance.trace_batch.return_value = 0
+
+    def get_ops_trace_instance(app_id):
+        if app_id == "broken":
+            raise ValueError("invalid tracing config")
+        return trace_instance
+
+    mocker.patch.object(OpsTraceManager, "get_ops_trace_instance", side_effect=get_ops_trace_instance)
+
+    process_trace_task_batch({"file_id": "file"})
+
+    trace_infos = trace_instance.trace_batch.call_args.args[0]
+    assert [trace_info.tool_name for trace_info in trace_infos] == ["c"]
+    redis_client.incr.assert_called_once_with(f"{OPS_TRACE_FAILED_KEY}_broken", 2)
+    delete.assert_called_once()
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from core.plugin.entities.plugin_daemon import PluginBasicBooleanResponse, PluginDaemonInnerError
+from core.plugin.manager.base import BasePluginManager
+
+
+def _stream(manager, mocker, lines: list[str]):
+    mocker.patch.object(manager, "_stream_request", return_value=iter(lines))
+    return manager._request_with_plugin_daemon_response_stream("POST", "path", PluginBasicBooleanResponse)
+
+
+def test_stream_response_validates_data(mocker):
+    manager = BasePluginManager()
+    lines = [json.dumps({"code": 0, "message": "", "data": {"result": True}})] * 2
+
+    results = list(_stream(manager, mocker, lines))
+
+    assert results == [PluginBasicBooleanResponse(result=True)] * 2
+
+
+def test_stream_response_raises_daemon_errors(mocker):
+    manager = BasePluginManager()
+    lines = [json.dumps({"code": -500, "message": "not json", "data": None})]
+
+    with pytest.raises(PluginDaemonInnerError):
+        list(_stream(manager, mocker, lines))
+
+
+def test_stream_response_rejects_invalid_lines(mocker):
+    manager = BasePluginManager()
+
+    with pytest.raises(ValueError, match="boom"):
+        list(_stream(manager, mocker, [json.dumps({"error": "boom"})]))
+    with pytest.raises(ValueError):
+        list(_stream(manager, mocker, [json.dumps({"code": 0, "message": "", "data": {"result": []}})]))
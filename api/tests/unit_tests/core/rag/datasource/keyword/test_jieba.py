@@ -0,0 +1,103 @@
+import math
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+
+
+@pytest.fixture
+def redis_client(mocker):
+    return mocker.patch("core.rag.datasource.keyword.jieba.jieba.redis_client", new=MagicMock())
+
+
+@pytest.fixture
+def db(mocker):
+    return mocker.patch("core.rag.datasource.keyword.jieba.jieba.db", new=MagicMock())
+
+
+@pytest.fixture
+def jieba(mocker, redis_client, db):
+    mocker.patch("core.rag.datasource.keyword.jieba.jieba.storage", new=MagicMock())
+    mocker.patch("core.rag.datasource.keyword.jieba.jieba.dify_config.KEYWORD_DATA_SOURCE_TYPE", "postings")
+    return Jieba(MagicMock(id="dataset", tenant_id="tenant"))
+
+
+def test_keyword_table_moved_into_postings_once(jieba, redis_client, mocker):
+    dataset_keyword_table = jieba.dataset.dataset_keyword_table
+    dataset_keyword_table.data_source_type = "database"
+    mocker.patch.object(jieba, "_get_dataset_keyword_table", return_value={"apple": {"n1", "n2"}, "pear": {"n2"}})
+    insert_postings = mocker.patch.object(jieba, "_insert_postings")
+
+    assert jieba._prepare_postings()
+
+    (keywords_by_node_id,) = insert_postings.call_args.args
+    assert {node_id: sorted(keywords) for node_id, keywords in keywords_by_node_id.items()} == {
+        "n1": ["apple"],
+        "n2": ["apple", "pear"],
+    }
+    assert dataset_keyword_table.data_source_type == "postings"
+    assert dataset_keyword_table.keyword_table == ""
+
+    insert_postings.reset_mock()
+    redis_client.lock.reset_mock()
+    assert jieba._prepare_postings()
+    insert_postings.assert_not_called()
+    redis_client.lock.assert_not_called()
+
+
+def test_postings_writes_only_touch_affected_nodes(jieba, redis_client, mocker):
+    jieba.dataset.dataset_keyword_table.data_source_type = "postings"
+    insert_postings = mocker.patch.object(jieba, "_insert_postings")
+    save_keyword_table = mocker.patch.object(jieba, "_save_dataset_keyword_table")
+
+    jieba.update_segment_keywords_index("n1", ["apple", "pear"])
+    jieba.delete_by_ids(["n1"])
+
+    insert_postings.assert_called_once_with({"n1": ["apple", "pear"]}, None)
+    save_keyword_table.assert_not_called()
+    redis_client.lock.assert_not_called()
+
+
+def test_database_keyword_table_kept_when_postings_disabled(jieba, mocker):
+    mocker.patch("core.rag.datasource.keyword.jieba.jieba.dify_config.KEYWORD_DATA_SOURCE_TYPE", "database")
+    jieba.dataset.dataset_keyword_table.data_source_type = "database"
+    mocker.patch.object(jieba, "_get_dataset_keyword_table", return_value={"apple": {"n1"}})
+    save_keyword_table = mocker.patch.object(jieba, "_save_dataset_keyword_table")
+
+    jieba.update_segment_keywords_index("n2", ["apple"])
+
+    save_keyword_table.assert_called_once_with({"apple": {"n1", "n2"}})
+
+
+def test_postings_store_term_frequencies_and_lengths(jieba, db):
+    executed = []
+    db.session.execute.side_effect = lambda statement: executed.append(statement.compile().params)
+
+    jieba._insert_postings({"n1": ["apple", "pie"]}, {"n1": "apple apple pie tastes good"})
+
+    postings, documents = executed
+    assert postings["term_frequency_m0"] + postings["term_frequency_m1"] == 3
+    assert documents["index_node_id_m0"] == "n1"
+    assert documents["length_m0"] == 5
+
+
+def test_keyword_scores_normalized_by_saturation_bound(jieba, db, mocker):
+    jieba.dataset.dataset_keyword_table.data_source_type = "postings"
+    mocker.patch(
+        "core.rag.datasource.keyword.jieba.jieba.JiebaKeywordTableHandler.extract_keywords",
+        return_value={"apple", "pie"},
+    )
+    document_frequencies, totals, scores = MagicMock(), MagicMock(), MagicMock()
+    db.session.query.side_effect = [document_frequencies, totals, scores]
+    # "pie" is not indexed, a node can reach at most the score of "apple"
+    document_frequencies.filter.return_value.group_by.return_value.all.return_value = [("apple", 1)]
+    totals.filter.return_value.one.return_value = (3, 4.0)
+    apple_idf = math.log(1 + 2.5 / 1.5)
+    pie_idf = math.log(1 + 3.5 / 0.5)
+    query = scores.outerjoin.return_value.filter.return_value.filter.return_value
+    query.group_by.return_value.order_by.return_value.all.return_value = [("n1", apple_idf * 2.2)]
+
+    keyword_scores = jieba.get_keyword_scores("apple pie", ["n1"])
+
+    assert keyword_scores == {"n1": pytest.approx(apple_idf / (apple_idf + pie_idf))}
@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+from core.rag.datasource.keyword import keyword_scorer
+from core.rag.datasource.keyword.keyword_scorer import KeywordScorer
+from core.rag.models.document import Document
+
+
+def test_indexed_documents_scored_from_keyword_index(mocker):
+    db = mocker.patch("core.rag.datasource.keyword.keyword_scorer.db", new=MagicMock())
+    db.session.query.return_value.filter.return_value.all.return_value = [MagicMock(id="indexed")]
+    keyword = mocker.patch.object(keyword_scorer, "Keyword")
+    keyword.return_value.get_keyword_scores.return_value = {"n1": 0.8, "n2": 0.2}
+    documents = [
+        Document(page_content="apple pie", metadata={"doc_id": "n1", "dataset_id": "indexed"}),
+        Document(page_content="apple", metadata={"doc_id": "n2", "dataset_id": "indexed"}),
+        Document(page_content="no match", metadata={"doc_id": "n3", "dataset_id": "indexed"}),
+        Document(page_content="apple pie", metadata={"doc_id": "e1"}, provider="external"),
+    ]
+
+    scores = KeywordScorer().score("apple pie", documents)
+
+    keyword.return_value.get_keyword_scores.assert_called_once_with("apple pie", ["n1", "n2", "n3"])
+    assert scores[:3] == [0.8, 0.2, 0.0]
+    assert scores[3] > 0
+    assert "keywords" not in documents[0].metadata
+    assert "keywords" in documents[3].metadata
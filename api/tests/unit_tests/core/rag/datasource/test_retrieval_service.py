@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock
+
+from core.rag.datasource.retrieval_service import RetrievalService
+from core.rag.index_processor.constant.index_type import IndexType
+from core.rag.models.document import Document
+from models.dataset import ChildChunk, DocumentSegment
+from models.dataset import Document as DatasetDocument
+
+
+def _query(rows):
+    query = MagicMock()
+    query.filter.return_value = query
+    query.options.return_value = query
+    query.all.return_value = rows
+    return query
+
+
+def test_format_retrieval_documents_batches_hydration(mocker):
+    dataset_documents = [
+        DatasetDocument(id="paragraph-doc", dataset_id="dataset", doc_form=IndexType.PARAGRAPH_INDEX),
+        DatasetDocument(id="parent-child-doc", dataset_id="dataset", doc_form=IndexType.PARENT_CHILD_INDEX),
+    ]
+    child_chunks = [
+        ChildChunk(id=f"child-{i}", index_node_id=f"child-node-{i}", segment_id="parent", content=f"c{i}", position=i)
+        for i in range(2)
+    ]
+    segments = [
+        DocumentSegment(id="parent", dataset_id="dataset", index_node_id="parent-node"),
+        DocumentSegment(id="paragraph", dataset_id="dataset", index_node_id="paragraph-node"),
+    ]
+    rows = {DatasetDocument: dataset_documents, ChildChunk: child_chunks, DocumentSegment: segments}
+    db = mocker.patch("core.rag.datasource.retrieval_service.db", new=MagicMock())
+    db.session.query.side_effect = lambda model: _query(rows[model])
+
+    documents = [
+        Document(page_content="", metadata={"document_id": "parent-child-doc", "doc_id": "child-node-0", "score": 0.4}),
+        Document(page_content="", metadata={"document_id": "paragraph-doc", "doc_id": "paragraph-node", "score": 0.6}),
+        Document(page_content="", metadata={"document_id": "parent-child-doc", "doc_id": "child-node-1", "score": 0.9}),
+        Document(page_content="", metadata={"document_id": "paragraph-doc", "doc_id": "missing-node", "score": 1.0}),
+    ]
+
+    records = RetrievalService.format_retrieval_documents(documents)
+
+    # one query per model instead of one per document
+    assert db.session.query.call_count == 3
+    assert [record.segment.id for record in records] == ["parent", "paragraph"]
+    assert [child_chunk.id for child_chunk in records[0].child_chunks or []] == ["child-0", "child-1"]
+    assert records[0].score == 0.9
+    assert records[1].score == 0.6
+    assert records[1].child_chunks is None
@@ -0,0 +1,17 @@
+import psycopg2.pool  # type: ignore
+import pytest
+
+from core.rag.datasource.vdb.pgvector.pgvector import BlockingConnectionPool
+
+
+def test_getconn_fails_when_no_connection_frees_up_in_time(mocker):
+    mocker.patch("psycopg2.connect")
+    pool = BlockingConnectionPool(1, 2, timeout=0.01)
+
+    first, second = pool.getconn(), pool.getconn()
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.getconn()
+
+    pool.putconn(first)
+    assert pool.getconn() is first
+    pool.putconn(second)
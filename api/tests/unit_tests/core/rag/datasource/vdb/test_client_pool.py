@@ -0,0 +1,78 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.rag.datasource.vdb import client_pool
+from core.rag.datasource.vdb.client_pool import get_client, get_pool_stats
+
+
+@pytest.fixture(autouse=True)
+def _reset_pool():
+    client_pool._reset_after_fork()
+    yield
+    client_pool._reset_after_fork()
+
+
+def test_clients_are_shared_per_config():
+    factory = MagicMock(side_effect=lambda: object())
+
+    client = get_client("qdrant", {"endpoint": "http://a"}, factory)
+
+    assert get_client("qdrant", {"endpoint": "http://a"}, factory) is client
+    assert get_client("qdrant", {"endpoint": "http://b"}, factory) is not client
+    assert factory.call_count == 2
+    assert get_pool_stats()["qdrant"] == {"clients": 2, "hits": 1, "created": 2, "health_check_failures": 0}
+
+
+def test_unhealthy_client_is_replaced(mocker):
+    mocker.patch.object(client_pool.dify_config, "VECTOR_STORE_CLIENT_HEALTH_CHECK_INTERVAL", 0.001)
+    mocker.patch.object(client_pool.time, "monotonic", side_effect=[0.0, 1.0, 1.0, 2.0, 2.0])
+    old_client, new_client = MagicMock(spec=["close"]), MagicMock(spec=["close"])
+    factory = MagicMock(side_effect=[old_client, new_client])
+
+    def health_check(client):
+        if client is old_client:
+            raise ConnectionError("gone")
+
+    assert get_client("elasticsearch", {"host": "es"}, factory, health_check) is old_client
+    assert get_client("elasticsearch", {"host": "es"}, factory, health_check) is new_client
+    old_client.close.assert_not_called()
+    assert get_client("elasticsearch", {"host": "es"}, factory, health_check) is new_client
+    assert get_pool_stats()["elasticsearch"]["health_check_failures"] == 1
+
+
+def test_slow_connect_does_not_block_other_backends():
+    connecting, release = threading.Event(), threading.Event()
+    slow_client = object()
+
+    def slow_factory():
+        connecting.set()
+        release.wait(5)
+        return slow_client
+
+    thread = threading.Thread(target=get_client, args=("weaviate", {"endpoint": "http://slow"}, slow_factory))
+    thread.start()
+    assert connecting.wait(5)
+    try:
+        fast_client = get_client("qdrant", {"endpoint": "http://fast"}, object)
+        assert get_client("qdrant", {"endpoint": "http://fast"}, object) is fast_client
+    finally:
+        release.set()
+        thread.join()
+    assert get_client("weaviate", {"endpoint": "http://slow"}, object) is slow_client
+
+
+def test_client_created_by_concurrent_first_use_is_closed():
+    losing_client = MagicMock(spec=["close"])
+
+    def factory():
+        # another thread registers its client while this one connects
+        get_client("milvus", {"uri": "http://milvus"}, object)
+        return losing_client
+
+    winning_client = get_client("milvus", {"uri": "http://milvus"}, factory)
+
+    assert winning_client is not losing_client
+    losing_client.close.assert_called_once()
+    assert get_pool_stats()["milvus"]["created"] == 1
@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from core.rag.embedding.cached_embedding import CacheEmbedding, QueryEmbeddingCache, query_embedding_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_query_embedding_cache():
+    query_embedding_cache.clear()
+    yield
+    query_embedding_cache.clear()
+
+
+def _mock_model_instance() -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.provider = "openai"
+    model_instance.model = "text-embedding-3-small"
+    model_instance.invoke_text_embedding.return_value = MagicMock(embeddings=[[3.0, 4.0]])
+    return model_instance
+
+
+def test_embed_query_uses_process_local_cache(mocker):
+    redis_client = mocker.patch("core.rag.embedding.cached_embedding.redis_client", new=MagicMock())
+    redis_client.get.return_value = None
+    model_instance = _mock_model_instance()
+
+    first = CacheEmbedding(model_instance).embed_query_vector("hello")
+    second = CacheEmbedding(model_instance).embed_query_vector("hello")
+
+    assert first is second
+    assert first.dtype == np.float32
+    assert not first.flags.writeable
+    assert CacheEmbedding(model_instance).embed_query("hello") == pytest.approx([0.6, 0.8])
+    model_instance.invoke_text_embedding.assert_called_once()
+    redis_client.get.assert_called_once()
+    assert query_embedding_cache.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+
+def test_query_embedding_cache_can_be_disabled():
+    cache = QueryEmbeddingCache(maxsize=0, ttl=600)
+    cache.put("key", np.zeros(2, dtype=np.float32))
+
+    assert cache.get("key") is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "size": 0}
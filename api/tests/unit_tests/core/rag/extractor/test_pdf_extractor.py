@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from core.rag.extractor import pdf_extractor
+from core.rag.extractor.pdf_extractor import PdfExtractor
+
+
+def test_extract_iter_yields_page_ranges_in_order(mocker):
+    mocker.patch.object(pdf_extractor.dify_config, "PDF_EXTRACT_PROCESS_WORKERS", 2)
+    mocker.patch.object(pdf_extractor.dify_config, "PDF_EXTRACT_PAGES_PER_TASK", 3)
+    pdf_document = MagicMock()
+    pdf_document.__len__.return_value = 10
+    mocker.patch("pypdfium2.PdfDocument", return_value=pdf_document)
+    mocker.patch.object(
+        pdf_extractor.concurrent.futures,
+        "ProcessPoolExecutor",
+        side_effect=lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    extract_page_range = mocker.patch.object(
+        pdf_extractor,
+        "_extract_page_range",
+        side_effect=lambda file_path, start, end: [f"page {i}" for i in range(start, end)],
+    )
+
+    documents = list(PdfExtractor("/tmp/file.pdf").extract_iter())
+
+    assert [document.page_content for document in documents] == [f"page {i}" for i in range(10)]
+    assert [document.metadata["page"] for document in documents] == list(range(10))
+    assert [call.args[1:] for call in extract_page_range.call_args_list] == [(0, 3), (3, 6), (6, 9), (9, 10)]
+
+
+def test_extract_iter_in_process_by_default(mocker):
+    mocker.patch.object(pdf_extractor.dify_config, "PDF_EXTRACT_PROCESS_WORKERS", 0)
+    load = mocker.patch.object(PdfExtractor, "load", return_value=iter([]))
+
+    assert list(PdfExtractor("/tmp/file.pdf").extract_iter()) == []
+    load.assert_called_once()
@@ -0,0 +1,44 @@
+import json
+from unittest.mock import MagicMock, call
+
+from core.rag.models.document import Document
+from core.rag.retrieval.retrieval_record_buffer import RetrievalRecordBuffer
+
+
+def test_add_hits_coalesces_repeated_documents(mocker):
+    redis_client = mocker.patch("core.rag.retrieval.retrieval_record_buffer.redis_client", new=MagicMock())
+    pipeline = redis_client.pipeline.return_value
+    documents = [
+        Document(page_content="a", metadata={"document_id": "doc-1", "doc_id": "node-1"}),
+        Document(page_content="a", metadata={"document_id": "doc-1", "doc_id": "node-1"}),
+        Document(page_content="b", metadata={"document_id": "doc-2", "doc_id": "node-2"}),
+        Document(page_content="c", metadata={}),
+    ]
+
+    RetrievalRecordBuffer.add_hits(documents)
+
+    assert pipeline.hincrby.call_args_list == [
+        call(RetrievalRecordBuffer.HITS_KEY, "doc-1:node-1", 2),
+        call(RetrievalRecordBuffer.HITS_KEY, "doc-2:node-2", 1),
+    ]
+    pipeline.execute.assert_called_once()
+
+
+def test_add_queries_pushes_one_row_per_dataset(mocker):
+    redis_client = mocker.patch("core.rag.retrieval.retrieval_record_buffer.redis_client", new=MagicMock())
+
+    RetrievalRecordBuffer.add_queries("hello", ["dataset-1", "dataset-2"], "app-1", "end_user", "user-1")
+
+    key, *rows = redis_client.rpush.call_args.args
+    assert key == RetrievalRecordBuffer.QUERIES_KEY
+    assert [json.loads(row)["dataset_id"] for row in rows] == ["dataset-1", "dataset-2"]
+    assert all(json.loads(row)["source"] == "app" for row in rows)
+
+
+def test_flush_is_skipped_when_another_flush_holds_the_lock(mocker):
+    redis_client = mocker.patch("core.rag.retrieval.retrieval_record_buffer.redis_client", new=MagicMock())
+    redis_client.lock.return_value.acquire.return_value = False
+
+    RetrievalRecordBuffer.flush()
+
+    redis_client.rename.assert_not_called()
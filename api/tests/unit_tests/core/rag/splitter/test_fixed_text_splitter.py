@@ -0,0 +1,64 @@
+import re
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+from core.rag.splitter.fixed_text_splitter import FixedRecursiveCharacterTextSplitter
+
+_TOKEN_PATTERN = re.compile(r" ?\S+|\s+")
+
+
+def _count_tokens(texts: list[str]) -> list[int]:
+    return [len(_TOKEN_PATTERN.findall(text)) for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def local_tokenizer(mocker):
+    return mocker.patch.object(
+        GPT2Tokenizer,
+        "get_token_offsets",
+        side_effect=lambda text: [match.start() for match in _TOKEN_PATTERN.finditer(text)],
+    )
+
+
+TEXT = (
+    "Dify is an open-source LLM app development platform. It combines workflows, RAG and agents. "
+    "Its intuitive interface lets you go from prototype to production quickly.\n\n"
+    "Short paragraph.\n\n" + "averyveryverylongwordwithoutanyseparator" * 3
+)
+
+
+def test_split_text_matches_length_function_splitting():
+    length_function = MagicMock(side_effect=_count_tokens)
+    splitter = FixedRecursiveCharacterTextSplitter(
+        fixed_separator="\n\n",
+        separators=["\n\n", "。", ". ", " ", ""],
+        chunk_size=8,
+        chunk_overlap=2,
+        length_function=length_function,
+    )
+
+    chunks = splitter.split_text(TEXT)
+
+    length_function.assert_not_called()
+    assert chunks == splitter._split_chunks_with_length_function(TEXT.split("\n\n"))
+
+
+def test_recount_splits_chunks_over_the_limit_again():
+    # the embedding model counts twice as many tokens as the local tokenizer
+    length_function = MagicMock(side_effect=lambda texts: [2 * count for count in _count_tokens(texts)])
+    splitter = FixedRecursiveCharacterTextSplitter(
+        fixed_separator="\n\n",
+        separators=[". ", " ", ""],
+        chunk_size=8,
+        chunk_overlap=0,
+        length_function=length_function,
+        recount_final_chunks=True,
+    )
+
+    chunks = splitter.split_text("one two three four five six. seven eight nine ten")
+
+    assert length_function.call_args_list[0].args == (["one two three four five six", "seven eight nine ten"],)
+    assert len(chunks) > 2
+    assert all(length <= 8 for length in length_function(chunks))
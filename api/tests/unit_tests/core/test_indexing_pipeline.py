@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from core.indexing_pipeline import PipelineStage, StagedPipeline
+
+
+def test_run_passes_items_through_all_stages(app):
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+
+    pipeline = StagedPipeline(
+        app,
+        [
+            PipelineStage("double", lambda item: item * 2, workers=3),
+            PipelineStage("drop_odd_halves", lambda item: item if item % 4 == 0 else None, workers=2),
+            PipelineStage("collect", collect),
+        ],
+        queue_size=1,
+    )
+
+    latencies = pipeline.run(range(100))
+
+    assert sorted(results) == [item * 2 for item in range(0, 100, 2)]
+    assert set(latencies) == {"double", "drop_odd_halves", "collect"}
+
+
+def test_run_stops_all_stages_on_error(app):
+    consumed = []
+
+    def fail(item):
+        if item == 3:
+            raise ValueError("embedding failed")
+        return item
+
+    pipeline = StagedPipeline(
+        app,
+        [PipelineStage("fail", fail), PipelineStage("collect", consumed.append)],
+        queue_size=1,
+    )
+
+    with pytest.raises(ValueError, match="embedding failed"):
+        pipeline.run(range(1000))
+    assert len(consumed) < 10
@@ -789,3 +789,31 @@ def test_parallels_graph6():
 
     for node_id in ["code1", "code2"]:
         assert graph.node_parallel_mapping[node_id] == child_parallel.id
+
+
+def test_init_with_cache_key_reuses_compiled_graph():
+    graph_config = {
+        "edges": [
+            {"id": "start-source-llm-target", "source": "start", "target": "llm"},
+            {"id": "llm-source-answer-target", "source": "llm", "target": "answer"},
+        ],
+        "nodes": [
+            {"data": {"type": "start"}, "id": "start"},
+            {"data": {"type": "llm"}, "id": "llm"},
+            {"data": {"type": "answer", "title": "answer", "answer": "1"}, "id": "answer"},
+        ],
+    }
+
+    graph = Graph.init(graph_config=graph_config, cache_key="workflow-id:hash")
+    cached_graph = Graph.init(graph_config={"nodes": []}, cache_key="workflow-id:hash")
+
+    assert cached_graph is not graph
+    assert cached_graph.cache_key == "workflow-id:hash"
+    assert cached_graph.node_ids == ["start", "llm", "answer"]
+    assert cached_graph.edge_mapping is graph.edge_mapping
+
+    # adding an edge to one copy must not leak into the shared compiled graph
+    graph.add_extra_edge(source_node_id="answer", target_node_id="start")
+    assert "answer" in graph.edge_mapping
+    assert "answer" not in cached_graph.edge_mapping
+    assert "answer" not in Graph.init(graph_config=graph_config, cache_key="workflow-id:hash").edge_mapping
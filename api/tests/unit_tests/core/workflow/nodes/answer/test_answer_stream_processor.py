@@ -214,3 +214,36 @@ def test_process():
         pass
 
     assert stream_contents == "c012da01b"
+
+
+def test_process_cached_graph_twice():
+    graph_config = {
+        "edges": [
+            {"id": "start-source-llm1-target", "source": "start", "target": "llm1"},
+            {"id": "llm1-source-answer-target", "source": "llm1", "target": "answer"},
+        ],
+        "nodes": [
+            {"data": {"type": "start"}, "id": "start"},
+            {"data": {"type": "llm", "error_strategy": "fail-branch"}, "id": "llm1"},
+            {"data": {"type": "answer", "title": "answer", "answer": "a{{#llm1.text#}}b"}, "id": "answer"},
+        ],
+    }
+
+    stream_contents_per_run = []
+    for _ in range(2):
+        graph = Graph.init(graph_config=graph_config, cache_key="workflow-id:stream-hash")
+        assert graph.answer_stream_generate_routes.answer_dependencies == {"answer": ["llm1"]}
+
+        variable_pool = VariablePool(system_variables={}, user_inputs={})
+        answer_stream_processor = AnswerStreamProcessor(graph=graph, variable_pool=variable_pool)
+        stream_contents = "".join(
+            event.chunk_content
+            for event in answer_stream_processor.process(_recursive_process(graph, "start"))
+            if isinstance(event, NodeRunStreamChunkEvent)
+        )
+
+        # the processor consumes the dependencies of its own copy only
+        assert graph.answer_stream_generate_routes.answer_dependencies == {"answer": []}
+        stream_contents_per_run.append(stream_contents)
+
+    assert stream_contents_per_run[0] == stream_contents_per_run[1]
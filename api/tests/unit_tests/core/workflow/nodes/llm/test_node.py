@@ -1,13 +1,22 @@
 from collections.abc import Sequence
 from typing import Optional
+from unittest.mock import MagicMock
 
 import pytest
 
 from core.app.entities.app_invoke_entities import InvokeFrom, ModelConfigWithCredentialsEntity
 from core.entities.provider_configuration import ProviderConfiguration, ProviderModelBundle
-from core.entities.provider_entities import CustomConfiguration, SystemConfiguration
+from core.entities.provider_entities import (
+    CustomConfiguration,
+    ProviderQuotaType,
+    QuotaConfiguration,
+    QuotaUnit,
+    SystemConfiguration,
+)
 from core.file import File, FileTransferMethod, FileType
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_runtime.entities.common_entities import I18nObject
+from core.model_runtime.entities.llm_entities import LLMUsage
 from core.model_runtime.entities.message_entities import (
     ImagePromptMessageContent,
     PromptMessage,
@@ -465,3 +474,31 @@ def test_handle_list_messages_basic(llm_node):
     assert len(result) == 1
     assert isinstance(result[0], UserPromptMessage)
     assert result[0].content == [TextPromptMessageContent(data="Hello, world")]
+
+
+@pytest.mark.parametrize(("quota_used", "invalidated"), [(50, False), (100, True)])
+def test_quota_deduction_invalidates_snapshot_only_when_exhausted(mocker, quota_used, invalidated):
+    db = mocker.patch("core.workflow.nodes.llm.node.db", new=MagicMock())
+    db.session.execute.return_value.first.return_value = MagicMock(quota_limit=100, quota_used=quota_used)
+    invalidate = mocker.patch.object(ProviderConfigurationsCache, "invalidate")
+    model_instance = MagicMock(provider="openai", model="gpt-4o-mini")
+    provider_configuration = model_instance.provider_model_bundle.configuration
+    provider_configuration.using_provider_type = ProviderType.SYSTEM
+    provider_configuration.system_configuration = SystemConfiguration(
+        enabled=True,
+        current_quota_type=ProviderQuotaType.TRIAL,
+        quota_configurations=[
+            QuotaConfiguration(
+                quota_type=ProviderQuotaType.TRIAL,
+                quota_unit=QuotaUnit.TOKENS,
+                quota_limit=100,
+                quota_used=0,
+                is_valid=True,
+            )
+        ],
+    )
+
+    LLMNode.deduct_llm_quota(tenant_id="tenant", model_instance=model_instance, usage=LLMUsage.empty_usage())
+
+    db.session.commit.assert_called_once()
+    assert invalidate.called is invalidated
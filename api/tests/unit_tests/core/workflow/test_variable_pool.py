@@ -44,3 +44,23 @@ def test_use_long_selector(pool):
     result = pool.get(("node_1", "part_1", "part_2"))
     assert result is not None
     assert result.value == "test_value"
+
+
+def test_layer_copies_on_write(pool):
+    pool.add(("node_1", "shared"), StringSegment(value="shared_value"))
+    pool.add(("node_2", "output"), StringSegment(value="parent_value"))
+
+    layer = pool.create_layer()
+    layer.add(("node_2", "output"), StringSegment(value="layer_value"))
+    layer.add(("node_3", "output"), StringSegment(value="new_value"))
+    layer.remove(("node_1",))
+
+    assert layer.get(("node_1", "shared")) is None
+    assert layer.get(("node_2", "output")).value == "layer_value"
+    assert layer.get(("node_3", "output")).value == "new_value"
+
+    # the parent pool is left untouched
+    assert pool.get(("node_1", "shared")).value == "shared_value"
+    assert pool.get(("node_2", "output")).value == "parent_value"
+    assert pool.get(("node_3", "output")) is None
+    assert set(layer.variable_dictionary) == {"node_1", "node_2", "node_3"}
@@ -1,7 +1,9 @@
+from unittest.mock import MagicMock
+
 import rsa as pyrsa
 from Crypto.PublicKey import RSA
 
-from libs import gmpy2_pkcs10aep_cipher
+from libs import gmpy2_pkcs10aep_cipher, rsa
 
 
 def test_gmpy2_pkcs10aep_cipher() -> None:
@@ -27,3 +29,17 @@ def test_gmpy2_pkcs10aep_cipher() -> None:
     encrypted_by_private_key = private_cipher_rsa.encrypt(message=raw_text_bytes)
     decrypted_by_private_key = private_cipher_rsa.decrypt(encrypted_by_private_key)
     assert decrypted_by_private_key == raw_text_bytes
+
+
+def test_get_decrypt_decoding_reuses_parsed_key(mocker) -> None:
+    private_key = RSA.generate(2048)
+    redis_client = mocker.patch("libs.rsa.redis_client", new=MagicMock())
+    redis_client.get.return_value = private_key.export_key()
+    rsa._decrypt_decoding_cache.clear()
+
+    rsa_key, cipher_rsa = rsa.get_decrypt_decoding("tenant_id")
+    encrypted = rsa.encrypt("raw_text", private_key.publickey().export_key())
+
+    assert rsa.get_decrypt_decoding("tenant_id") == (rsa_key, cipher_rsa)
+    assert rsa.decrypt(encrypted, "tenant_id") == "raw_text"
+    redis_client.get.assert_called_once()
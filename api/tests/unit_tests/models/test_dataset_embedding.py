@@ -0,0 +1,20 @@
+import pickle
+
+from models.dataset import Embedding
+
+
+def test_embedding_round_trip_uses_float32_binary_format():
+    embedding = Embedding(model_name="text-embedding-3-small", hash="hash", provider_name="openai")
+    embedding.set_embedding([0.5, -0.25, 1.0])
+
+    assert embedding.embedding.startswith(Embedding.BINARY_FORMAT_HEADER)
+    assert len(embedding.embedding) == len(Embedding.BINARY_FORMAT_HEADER) + 3 * 4
+    assert embedding.get_embedding() == [0.5, -0.25, 1.0]
+
+
+def test_embedding_reads_legacy_pickled_rows():
+    vector = [0.1, 0.2, 0.3]
+    embedding = Embedding(model_name="text-embedding-3-small", hash="hash", provider_name="openai")
+    embedding.embedding = pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL)
+
+    assert embedding.get_embedding() == vector
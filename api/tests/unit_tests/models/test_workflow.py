@@ -39,7 +39,10 @@ def test_environment_variables():
 
     with (
         mock.patch("core.helper.encrypter.encrypt_token", return_value="encrypted_token"),
-        mock.patch("core.helper.encrypter.decrypt_token", return_value="secret"),
+        mock.patch(
+            "core.helper.encrypter.batch_decrypt_token",
+            side_effect=lambda tenant_id, tokens: ["secret"] * len(tokens),
+        ),
     ):
         # Set the environment_variables property of the Workflow instance
         variables = [variable1, variable2, variable3, variable4]
@@ -81,7 +84,10 @@ def test_update_environment_variables():
 
     with (
         mock.patch("core.helper.encrypter.encrypt_token", return_value="encrypted_token"),
-        mock.patch("core.helper.encrypter.decrypt_token", return_value="secret"),
+        mock.patch(
+            "core.helper.encrypter.batch_decrypt_token",
+            side_effect=lambda tenant_id, tokens: ["secret"] * len(tokens),
+        ),
     ):
         variables = [variable1, variable2, variable3, variable4]
 
@@ -122,7 +128,10 @@ def test_to_dict():
 
     with (
         mock.patch("core.helper.encrypter.encrypt_token", return_value="encrypted_token"),
-        mock.patch("core.helper.encrypter.decrypt_token", return_value="secret"),
+        mock.patch(
+            "core.helper.encrypter.batch_decrypt_token",
+            side_effect=lambda tenant_id, tokens: ["secret"] * len(tokens),
+        ),
     ):
         # Set the environment_variables property of the Workflow instance
         workflow.environment_variables = [
@@ -137,3 +146,57 @@ def test_to_dict():
         workflow_dict = workflow.to_dict(include_secret=True)
         assert workflow_dict["environment_variables"][0]["value"] == "secret"
         assert workflow_dict["environment_variables"][1]["value"] == "text"
+
+
+def test_environment_variables_are_materialized_once_per_published_version():
+    contexts.tenant_id.set("tenant_id")
+
+    workflow = Workflow(
+        tenant_id="tenant_id",
+        app_id="app_id",
+        type="workflow",
+        version="2025-01-01 00:00:00",
+        graph="{}",
+        features="{}",
+        created_by="account_id",
+        environment_variables=[],
+        conversation_variables=[],
+    )
+    workflow.id = str(uuid4())
+
+    with (
+        mock.patch("core.helper.encrypter.encrypt_token", return_value="encrypted_token"),
+        mock.patch(
+            "core.helper.encrypter.batch_decrypt_token",
+            side_effect=lambda tenant_id, tokens: ["secret"] * len(tokens),
+        ) as batch_decrypt_token,
+    ):
+        workflow.environment_variables = [
+            SecretVariable.model_validate({"name": "secret", "value": "secret", "id": str(uuid4())}),
+        ]
+        batch_decrypt_token.reset_mock()
+
+        assert workflow.environment_variables[0].value == "secret"
+        assert workflow.environment_variables[0].value == "secret"
+
+        # another instance of the same published version reuses the materialized variables
+        other = Workflow(
+            tenant_id="tenant_id",
+            app_id="app_id",
+            type="workflow",
+            version=workflow.version,
+            graph="{}",
+            features="{}",
+            created_by="account_id",
+            environment_variables=[],
+            conversation_variables=[],
+        )
+        other.id = workflow.id
+        other._environment_variables = workflow._environment_variables
+        assert other.environment_variables == workflow.environment_variables
+        assert batch_decrypt_token.call_count == 1
+
+        workflow.environment_variables = [
+            StringVariable.model_validate({"name": "text", "value": "text", "id": str(uuid4())}),
+        ]
+        assert [var.value for var in workflow.environment_variables] == ["text"]
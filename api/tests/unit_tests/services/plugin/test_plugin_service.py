@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+
+from core.plugin.entities.plugin_daemon import PluginInstallTaskStartResponse, PluginInstallTaskStatus
+from services.plugin.plugin_service import PluginService
+
+
+@pytest.fixture
+def manager(mocker):
+    mocker.patch("services.plugin.plugin_service.redis_client", new=fakeredis.FakeRedis())
+    return mocker.patch("services.plugin.plugin_service.PluginInstallationManager").return_value
+
+
+def test_finished_install_task_invalidates_model_cache_once(mocker, manager):
+    invalidate = mocker.patch("services.plugin.plugin_service.PluginModelCache.invalidate")
+    manager.fetch_plugin_installation_task.return_value = MagicMock(status=PluginInstallTaskStatus.Running)
+
+    PluginService.fetch_install_task("tenant", "task")
+    invalidate.assert_not_called()
+
+    manager.fetch_plugin_installation_task.return_value = MagicMock(status=PluginInstallTaskStatus.Success)
+    for _ in range(3):
+        PluginService.fetch_install_task("tenant", "task")
+    invalidate.assert_called_once_with("tenant")
+
+
+@pytest.mark.parametrize(("all_installed", "invalidated"), [(False, False), (True, True)])
+def test_install_invalidates_model_cache_only_when_installed_synchronously(mocker, manager, all_installed, invalidated):
+    invalidate = mocker.patch("services.plugin.plugin_service.PluginModelCache.invalidate")
+    manager.install_from_identifiers.return_value = PluginInstallTaskStartResponse(
+        all_installed=all_installed, task_id="task"
+    )
+
+    PluginService.install_from_local_pkg("tenant", ["langgenius/openai:0.0.1@hash"])
+
+    assert invalidate.called is invalidated